@@ -1,49 +1,338 @@
-from flask import Flask, jsonify
-from infrastructure.database.sqlalchemy_models import db, UserORM, TaskORM 
-from infrastructure.database.sqlalchemy_repository_adapters import SQLAlchemyUserRepository, SQLAlchemyTaskRepository
-from application.user_service_impl import UserServiceImpl
-from application.task_service_impl import TaskServiceImpl
-from infrastructure.web.flask_api_adapters import api_bp 
-from dotenv import load_dotenv
+"""
+Fábrica da aplicação Flask.
+
+create_app(config) lê a configuração do ambiente (.env), aplica por cima os valores de
+`config` e monta repositórios, serviços e componentes opcionais, que ficam em
+app.extensions['api'] (ver infrastructure/web/dependencies.py). Importar este módulo
+não cria app nem conexão: cada chamada monta uma instância isolada, e os módulos
+pesados (SQLAlchemy, drivers, adaptadores) só são importados pela fábrica, conforme
+a configuração pedida.
+
+Execução:
+    flask --app app init-db      # cria/atualiza as tabelas e insere os dados iniciais
+    python app.py                # servidor de desenvolvimento
+    gunicorn "app:create_app()"  # produção (com --preload, a fábrica roda uma vez no master)
+"""
 import os
+from typing import Mapping, Optional
+from dotenv import load_dotenv
+from flask import Flask
 
 load_dotenv() # Carrega variáveis de ambiente do arquivo .env
 
-app = Flask(__name__)
 
-# Configurações do Flask e DB
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
+def _load_config(app: Flask) -> None:
+    # Configurações do Flask e DB
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
 
-db.init_app(app) # Inicializa o SQLAlchemy com o app
+    # Serialização JSON: 'orjson' (padrão se o pacote estiver instalado) ou 'default' (módulo json)
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', '').lower() or None
 
-user_repository = SQLAlchemyUserRepository()
-task_repository = SQLAlchemyTaskRepository()
+    # Armazenamento dos repositórios: 'sqlalchemy' (padrão) ou 'memory' (dicionários, sem persistência)
+    app.config['REPOSITORY_BACKEND'] = os.environ.get('REPOSITORY_BACKEND', 'sqlalchemy').lower()
 
+    # Pool de conexões do SQLAlchemy (o mesmo dimensionamento vale para cada réplica)
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
 
-user_service = UserServiceImpl(user_repository)
-task_service = TaskServiceImpl(task_repository, user_repository) 
+    # Réplicas de leitura (URLs separadas por vírgula; vazio desativa). As leituras dos
+    # repositórios SQLAlchemy vão para elas, exceto depois de uma gravação na mesma requisição.
+    # Balanceamento: 'round_robin' ou 'least_connections'. As migrações rodam só no primário.
+    app.config['DATABASE_REPLICA_URLS'] = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    app.config['DATABASE_REPLICA_BALANCING'] = os.environ.get('DATABASE_REPLICA_BALANCING', 'round_robin').lower()
 
+    # Cache de tokens já verificados (0 desativa)
+    app.config['PRINCIPAL_CACHE_SIZE'] = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 10000))
+    app.config['PRINCIPAL_CACHE_TTL'] = float(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
 
-from infrastructure.web import flask_api_adapters
-flask_api_adapters.user_service = user_service
-flask_api_adapters.task_service = task_service
-flask_api_adapters.secret_key = app.config['SECRET_KEY']
+    # Custo do hash de senhas (scrypt) e tamanho do pool que executa os hashes
+    app.config['PASSWORD_HASH_N'] = int(os.environ.get('PASSWORD_HASH_N', 2 ** 14))
+    app.config['PASSWORD_HASH_R'] = int(os.environ.get('PASSWORD_HASH_R', 8))
+    app.config['PASSWORD_HASH_P'] = int(os.environ.get('PASSWORD_HASH_P', 1))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
 
+    # Contadores materializados de tarefas por (responsável, status) para GET /tasks/stats.
+    # Ao ativar depois de um período desligado, rode "flask rebuild-task-counters".
+    app.config['TASK_STATS_COUNTERS'] = os.environ.get('TASK_STATS_COUNTERS', 'false').lower() == 'true'
 
-app.register_blueprint(api_bp)
+    # Feed de mudanças de tarefas (GET /tasks/changes). Long-poll e SSE esperam pelo aviso
+    # das gravações deste processo; com vários processos, TASK_CHANGES_POLL_INTERVAL > 0
+    # relê o feed a cada intervalo para enxergar as dos outros. O histórico mais antigo que
+    # TASK_CHANGES_RETENTION_DAYS é removido por "flask prune-task-changes" (ex.: no cron).
+    app.config['TASK_CHANGES_MAX_WAIT'] = float(os.environ.get('TASK_CHANGES_MAX_WAIT', 30))
+    app.config['TASK_CHANGES_POLL_INTERVAL'] = float(os.environ.get('TASK_CHANGES_POLL_INTERVAL', 0))
+    app.config['TASK_CHANGES_SSE_HEARTBEAT'] = float(os.environ.get('TASK_CHANGES_SSE_HEARTBEAT', 15))
+    app.config['TASK_CHANGES_SSE_MAX_SECONDS'] = float(os.environ.get('TASK_CHANGES_SSE_MAX_SECONDS', 300))
+    app.config['TASK_CHANGES_RETENTION_DAYS'] = int(os.environ.get('TASK_CHANGES_RETENTION_DAYS', 7))
 
+    # Cache read-through dos repositórios (desligado por padrão: é por processo)
+    app.config['REPOSITORY_CACHE_ENABLED'] = os.environ.get('REPOSITORY_CACHE_ENABLED', 'false').lower() == 'true'
+    app.config['REPOSITORY_CACHE_SIZE'] = int(os.environ.get('REPOSITORY_CACHE_SIZE', 10000))
+    app.config['REPOSITORY_CACHE_TTL'] = float(os.environ.get('REPOSITORY_CACHE_TTL', 30))
 
-@app.route('/')
-def home():
-    return "API está no ar!"
+    # Instrumentação por requisição (Server-Timing, /metrics e perfis das requisições lentas)
+    app.config['INSTRUMENTATION_ENABLED'] = os.environ.get('INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+    app.config['INSTRUMENTATION_SLOW_REQUEST_MS'] = float(os.environ.get('INSTRUMENTATION_SLOW_REQUEST_MS', 500))
+    app.config['INSTRUMENTATION_PROFILE_DIR'] = os.environ.get('INSTRUMENTATION_PROFILE_DIR') # vazio desativa o profiler
+    app.config['INSTRUMENTATION_PROFILE_INTERVAL_MS'] = float(os.environ.get('INSTRUMENTATION_PROFILE_INTERVAL_MS', 5))
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all() # Cria as tabelas no banco de dados se elas não existirem
+    # Compressão gzip/brotli das respostas da API (desative se um proxy à frente já comprime)
+    app.config['COMPRESSION_ENABLED'] = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    app.config['COMPRESSION_GZIP_LEVEL'] = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    app.config['COMPRESSION_BROTLI_LEVEL'] = int(os.environ.get('COMPRESSION_BROTLI_LEVEL', 4))
+
+    # Limite de requisições por cliente (usuário autenticado, ou IP no login e antes de verificar o token), por processo.
+    # Limites no formato "20/s", "600/min" ou "20/s:40" (capacidade do balde após o ":");
+    # RATE_LIMIT_DEFAULT vazio deixa sem limite as rotas que não estão em RATE_LIMIT_ROUTES.
+    # RATE_LIMIT_MAX_IN_FLIGHT limita as requisições simultâneas de um cliente (0 desativa).
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+    app.config['RATE_LIMIT_DEFAULT'] = os.environ.get('RATE_LIMIT_DEFAULT', '20/s:40')
+    app.config['RATE_LIMIT_ROUTES'] = os.environ.get('RATE_LIMIT_ROUTES', 'POST /auth/login=10/min:5')
+    app.config['RATE_LIMIT_MAX_IN_FLIGHT'] = int(os.environ.get('RATE_LIMIT_MAX_IN_FLIGHT', 8))
+    app.config['RATE_LIMIT_MAX_KEYS'] = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))
+    # Quantos proxies reversos confiáveis ficam na frente do app (0: nenhum). Com 1 ou mais,
+    # o IP do cliente (limites por IP, logs) vem de X-Forwarded-For em vez do endereço do proxy.
+    app.config['TRUSTED_PROXY_COUNT'] = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+
+    # Coalescência de leituras idênticas simultâneas (GET /users, /tasks e /tasks/stats):
+    # uma só execução e um só corpo serializado por chave (rota, query string, escopo).
+    # COALESCING_MICRO_CACHE_MS > 0 reaproveita a resposta pronta por esse tempo, com
+    # leituras até esse tanto defasadas em relação às escritas de outros processos.
+    app.config['COALESCING_ENABLED'] = os.environ.get('COALESCING_ENABLED', 'false').lower() == 'true'
+    app.config['COALESCING_MICRO_CACHE_MS'] = float(os.environ.get('COALESCING_MICRO_CACHE_MS', 0))
+    app.config['COALESCING_MAX_KEYS'] = int(os.environ.get('COALESCING_MAX_KEYS', 10000))
+
+    # Trabalhos em segundo plano publicados pelos serviços depois do commit (notificação de
+    # atribuição, auditoria): 'thread' executa em um pool deste processo, sem durabilidade;
+    # 'database' grava na tabela jobs, processada por "python worker.py"; 'none' desativa.
+    # As tentativas e o backoff (segundos, dobrando a cada falha) valem também para o worker.
+    app.config['JOB_DISPATCHER'] = os.environ.get('JOB_DISPATCHER', 'thread').lower()
+    app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 4))
+    app.config['JOB_MAX_PENDING'] = int(os.environ.get('JOB_MAX_PENDING', 1000))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+    app.config['JOB_RETRY_BACKOFF'] = float(os.environ.get('JOB_RETRY_BACKOFF', 1))
+    app.config['JOB_RETRY_BACKOFF_MAX'] = float(os.environ.get('JOB_RETRY_BACKOFF_MAX', 300))
+
+
+def database_engine_options(config: Mapping, database_uri: Optional[str] = None) -> dict:
+    """
+    Opções de create_engine para `database_uri` (padrão: o banco principal) com o
+    dimensionamento de pool da configuração.
+    """
+    from infrastructure.database.pool_metrics import build_engine_options
+    return build_engine_options(
+        database_uri or config['SQLALCHEMY_DATABASE_URI'],
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+        pool_pre_ping=config['DB_POOL_PRE_PING']
+    )
+
+
+def _build_repositories(app: Flask, change_notifier):
+    if app.config['REPOSITORY_BACKEND'] == 'memory':
+        from infrastructure.memory.in_memory_repository_adapters import InMemoryStore, InMemoryUserRepository, InMemoryTaskRepository
+        memory_store = InMemoryStore()
+        return (InMemoryUserRepository(memory_store, change_notifier),
+                InMemoryTaskRepository(memory_store, change_notifier))
+
+    if app.config['REPOSITORY_BACKEND'] == 'sqlalchemy':
+        import sqlalchemy as sa
+        from infrastructure.database.sqlalchemy_models import db
+        from infrastructure.database.read_replicas import ReadReplicaRouter
+        from infrastructure.database.sqlalchemy_repository_adapters import SQLAlchemyUserRepository, SQLAlchemyTaskRepository
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_engine_options(app.config)
+        db.init_app(app) # Inicializa o SQLAlchemy com o app
+        if app.config['DATABASE_REPLICA_URLS']:
+            app.extensions['read_replicas'] = ReadReplicaRouter(
+                [sa.create_engine(url, **database_engine_options(app.config, url)) for url in app.config['DATABASE_REPLICA_URLS']],
+                balancing=app.config['DATABASE_REPLICA_BALANCING']
+            )
+        return (SQLAlchemyUserRepository(task_counters=app.config['TASK_STATS_COUNTERS'], change_notifier=change_notifier),
+                SQLAlchemyTaskRepository(task_counters=app.config['TASK_STATS_COUNTERS'], change_notifier=change_notifier))
+
+    raise ValueError(f"REPOSITORY_BACKEND inválido: {app.config['REPOSITORY_BACKEND']}")
+
+
+def _build_job_dispatcher(app: Flask, engine):
+    if app.config['JOB_DISPATCHER'] == 'thread':
+        from infrastructure.jobs.thread_pool_dispatcher import ThreadPoolJobDispatcher
+        return ThreadPoolJobDispatcher(
+            max_workers=app.config['JOB_WORKERS'],
+            max_pending=app.config['JOB_MAX_PENDING'],
+            max_attempts=app.config['JOB_MAX_ATTEMPTS'],
+            backoff=app.config['JOB_RETRY_BACKOFF'],
+            max_backoff=app.config['JOB_RETRY_BACKOFF_MAX']
+        )
+    if app.config['JOB_DISPATCHER'] == 'database':
+        if engine is None:
+            raise ValueError("JOB_DISPATCHER=database requer REPOSITORY_BACKEND=sqlalchemy.")
+        from infrastructure.jobs.database_queue import DatabaseJobDispatcher
+        return DatabaseJobDispatcher(engine)
+    if app.config['JOB_DISPATCHER'] == 'none':
+        return None
+    raise ValueError(f"JOB_DISPATCHER inválido: {app.config['JOB_DISPATCHER']}")
+
+
+def create_app(config: Optional[Mapping] = None) -> Flask:
+    """
+    Monta uma instância da API. `config` sobrepõe a configuração lida do ambiente
+    (ex.: create_app({'REPOSITORY_BACKEND': 'memory'}) em testes e benchmarks).
+    """
+    from application.user_service_impl import UserServiceImpl
+    from application.task_service_impl import TaskServiceImpl
+    from infrastructure.cache.principal_cache import InMemoryPrincipalCache
+    from infrastructure.notifications.change_notifier import InProcessChangeNotifier
+    from infrastructure.security.password_hashers import ScryptPasswordHasher, PooledPasswordHasher
+    from infrastructure.web.dependencies import ApiDependencies
+    from infrastructure.web.flask_api_adapters import api_bp
+    from infrastructure.web.json_provider import OrjsonProvider, orjson
+
+    app = Flask(__name__)
+    _load_config(app)
+    app.config.update(config or {})
+
+    if app.config['TRUSTED_PROXY_COUNT'] > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        proxies = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
+    app.config['JSON_PROVIDER'] = app.config['JSON_PROVIDER'] or ('orjson' if orjson else 'default')
+    if app.config['JSON_PROVIDER'] == 'orjson':
+        if not orjson:
+            raise RuntimeError("JSON_PROVIDER=orjson requer o pacote orjson instalado.")
+        app.json = OrjsonProvider(app)
+
+    change_notifier = InProcessChangeNotifier()
+    user_repository, task_repository = _build_repositories(app, change_notifier)
+    engine = None
+    if app.config['REPOSITORY_BACKEND'] == 'sqlalchemy':
+        from infrastructure.database.sqlalchemy_models import db
+        with app.app_context():
+            engine = db.engine
+
+    if app.config['REPOSITORY_CACHE_ENABLED']:
+        from infrastructure.cache.backends import InMemoryCacheBackend
+        from infrastructure.cache.caching_repository_adapters import CachingUserRepository, CachingTaskRepository
+        cache_backend = InMemoryCacheBackend(
+            max_size=app.config['REPOSITORY_CACHE_SIZE'],
+            ttl=app.config['REPOSITORY_CACHE_TTL']
+        )
+        task_repository = CachingTaskRepository(task_repository, cache_backend)
+        user_repository = CachingUserRepository(user_repository, cache_backend, task_cache=task_repository)
+
+    principal_cache = None
+    if app.config['PRINCIPAL_CACHE_SIZE'] > 0:
+        principal_cache = InMemoryPrincipalCache(
+            max_size=app.config['PRINCIPAL_CACHE_SIZE'],
+            ttl=app.config['PRINCIPAL_CACHE_TTL']
+        )
 
-        if not db.session.query(UserORM).first():
+    password_hasher = PooledPasswordHasher(
+        ScryptPasswordHasher(
+            n=app.config['PASSWORD_HASH_N'],
+            r=app.config['PASSWORD_HASH_R'],
+            p=app.config['PASSWORD_HASH_P']
+        ),
+        max_workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING']
+    )
+
+    job_dispatcher = _build_job_dispatcher(app, engine)
+
+    user_service = UserServiceImpl(user_repository, principal_cache, password_hasher)
+    task_service = TaskServiceImpl(task_repository, user_repository, job_dispatcher, change_notifier,
+                                   changes_poll_interval=app.config['TASK_CHANGES_POLL_INTERVAL'])
+
+    request_metrics = None
+    if app.config['INSTRUMENTATION_ENABLED']:
+        from infrastructure.web.instrumentation import RequestInstrumentation, SlowRequestProfiler, TimedService
+        profiler = None
+        if app.config['INSTRUMENTATION_PROFILE_DIR']:
+            profiler = SlowRequestProfiler(
+                app.config['INSTRUMENTATION_PROFILE_DIR'],
+                interval=app.config['INSTRUMENTATION_PROFILE_INTERVAL_MS'] / 1000
+            )
+        request_metrics = RequestInstrumentation(app.config['INSTRUMENTATION_SLOW_REQUEST_MS'], profiler)
+        # As leituras desviadas para as réplicas também contam no tempo de SQL da requisição
+        engines = [engine] if engine is not None else []
+        if 'read_replicas' in app.extensions:
+            engines += app.extensions['read_replicas'].engines
+        request_metrics.init_app(app, engines)
+        user_service = TimedService(user_service, 'user_service')
+        task_service = TimedService(task_service, 'task_service')
+
+    compressor = None
+    if app.config['COMPRESSION_ENABLED']:
+        from infrastructure.web.compression import ResponseCompressor
+        compressor = ResponseCompressor(
+            min_size=app.config['COMPRESSION_MIN_SIZE'],
+            gzip_level=app.config['COMPRESSION_GZIP_LEVEL'],
+            brotli_level=app.config['COMPRESSION_BROTLI_LEVEL']
+        )
+
+    rate_limiter = None
+    if app.config['RATE_LIMIT_ENABLED']:
+        from infrastructure.web.rate_limit import InMemoryRateLimitStore, RateLimiter, parse_limit, parse_route_limits
+        rate_limiter = RateLimiter(
+            InMemoryRateLimitStore(max_keys=app.config['RATE_LIMIT_MAX_KEYS']),
+            default_limit=parse_limit(app.config['RATE_LIMIT_DEFAULT']) if app.config['RATE_LIMIT_DEFAULT'] else None,
+            route_limits=parse_route_limits(app.config['RATE_LIMIT_ROUTES']),
+            max_in_flight=app.config['RATE_LIMIT_MAX_IN_FLIGHT']
+        )
+
+    coalescer = None
+    if app.config['COALESCING_ENABLED']:
+        from infrastructure.web.coalescing import RequestCoalescer
+        coalescer = RequestCoalescer(
+            micro_cache_ttl=app.config['COALESCING_MICRO_CACHE_MS'] / 1000,
+            max_keys=app.config['COALESCING_MAX_KEYS']
+        )
+
+    pool_status_provider = None
+    if engine is not None:
+        from infrastructure.database.pool_metrics import pool_status
+
+        def pool_status_provider() -> dict:
+            status = pool_status(engine)
+            if 'read_replicas' in app.extensions:
+                status['read_replicas'] = app.extensions['read_replicas'].stats()
+            return status
+
+    ApiDependencies(
+        user_service, task_service, app.config['SECRET_KEY'],
+        principal_cache=principal_cache,
+        password_hasher=password_hasher,
+        job_dispatcher=job_dispatcher,
+        request_metrics=request_metrics,
+        compressor=compressor,
+        rate_limiter=rate_limiter,
+        coalescer=coalescer,
+        pool_status_provider=pool_status_provider
+    ).init_app(app, api_bp)
+
+    @app.route('/')
+    def home():
+        return "API está no ar!"
+
+    _register_commands(app, engine)
+    return app
+
+
+def seed(app: Flask) -> None:
+    """Insere os usuários e a tarefa iniciais, se ainda não existirem."""
+    api = app.extensions['api']
+    user_service, task_service = api.user_service, api.task_service
+    with app.app_context():
+        if not user_service.get_all_users(limit=1):
             print("Adicionando usuários iniciais...")
 
             try:
@@ -52,8 +341,8 @@ if __name__ == '__main__':
                 print("Usuários iniciais adicionados.")
             except Exception as e:
                 print(f"Erro ao adicionar usuários iniciais: {e}")
-        
-        if db.session.query(UserORM).first() and not db.session.query(TaskORM).first():
+
+        if user_service.get_all_users(limit=1) and not task_service.get_all_tasks(limit=1):
             print("Adicionando tarefas iniciais...")
             vasco_user = user_service.get_user_by_username("vasco")
             if vasco_user:
@@ -68,4 +357,46 @@ if __name__ == '__main__':
                 except Exception as e:
                     print(f"Erro ao adicionar tarefas iniciais: {e}")
 
-    app.run(debug=True)
\ No newline at end of file
+
+def _register_commands(app: Flask, engine) -> None:
+    if engine is None:
+        return # Sem banco (REPOSITORY_BACKEND=memory) não há o que migrar
+
+    def apply_migrations():
+        from infrastructure.database.migrations import upgrade
+        for migration in upgrade(engine):
+            print(f"Migração {migration.version:04d} aplicada: {migration.description}")
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        """Aplica as migrações pendentes do banco."""
+        apply_migrations()
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Aplica as migrações pendentes e insere os dados iniciais."""
+        apply_migrations()
+        seed(app)
+
+    @app.cli.command('rebuild-task-counters')
+    def rebuild_task_counters():
+        """Recalcula a tabela task_counters a partir das tarefas."""
+        from infrastructure.database.sqlalchemy_repository_adapters import SQLAlchemyTaskRepository
+        SQLAlchemyTaskRepository().rebuild_counters()
+        print("Contadores de tarefas recalculados.")
+
+    @app.cli.command('prune-task-changes')
+    def prune_task_changes():
+        """Remove o histórico do feed de mudanças mais antigo que TASK_CHANGES_RETENTION_DAYS."""
+        import datetime
+        from infrastructure.database.sqlalchemy_repository_adapters import SQLAlchemyTaskRepository
+        older_than = datetime.datetime.utcnow() - datetime.timedelta(days=app.config['TASK_CHANGES_RETENTION_DAYS'])
+        removed = SQLAlchemyTaskRepository().prune_changes(older_than)
+        print(f"{removed} mudanças de tarefas removidas do histórico.")
+
+
+if __name__ == '__main__':
+    app = create_app()
+    if app.config['REPOSITORY_BACKEND'] == 'memory':
+        seed(app) # Os dados em memória são deste processo; com banco, use "flask --app app init-db"
+    app.run(debug=True)
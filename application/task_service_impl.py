@@ -1,26 +1,114 @@
-from typing import List, Optional
-from core.domain.entities import Task, User 
+import datetime
+import json
+import logging
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from core.domain.entities import Task, TaskChange, User 
+from core.domain.task_query import TaskQuery
 from core.ports.task_repository import TaskRepository
 from core.ports.user_repository import UserRepository 
+from core.ports.job_dispatcher import JobDispatcher
+from core.ports.change_notifier import ChangeNotifier
+from core.domain.exceptions import TaskNotFoundException, ConcurrentModificationException
+
+logger = logging.getLogger('jobs')
+
+MAX_SEARCH_LENGTH = 200
+MAX_SEARCH_TERMS = 8
+
+
+def _is_id(value) -> bool:
+    # bool é subclasse de int no Python, mas true/false do JSON não são ids
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _assignee_id(value) -> int:
+    if not _is_id(value):
+        raise ValueError(f"Usuário atribuído com ID {value} não encontrado.")
+    return value
+
 
 class TaskServiceImpl:
-    def __init__(self, task_repository: TaskRepository, user_repository: UserRepository):
+    def __init__(self, task_repository: TaskRepository, user_repository: UserRepository,
+                 job_dispatcher: Optional[JobDispatcher] = None, change_notifier: Optional[ChangeNotifier] = None,
+                 changes_poll_interval: float = 0):
         self.task_repository = task_repository
         self.user_repository = user_repository 
+        self.job_dispatcher = job_dispatcher
+        # Espera do feed de mudanças: o notificador acorda quem espera quando este processo
+        # grava; com changes_poll_interval > 0 o feed também é relido a cada intervalo,
+        # para enxergar as gravações de outros processos
+        self.change_notifier = change_notifier
+        self.changes_poll_interval = changes_poll_interval
+
+    def _task_event(self, task: Task, **extra) -> dict:
+        return dict(
+            task_id=task.id,
+            title=task.title,
+            status=task.status,
+            assigned_to_id=task.assigned_to_id,
+            version=task.version,
+            occurred_at=datetime.datetime.utcnow().isoformat(),
+            **extra
+        )
+
+    def _publish(self, events: List[Tuple[str, dict]]) -> None:
+        # Chamado só depois que o repositório confirmou a gravação: os efeitos colaterais
+        # (notificação, auditoria) rodam em segundo plano, fora do tempo da requisição.
+        # Uma falha ao enfileirar não desfaz nem reprova a gravação já confirmada: os
+        # eventos ficam no log (JSON), de onde podem ser reenfileirados.
+        if not self.job_dispatcher or not events:
+            return
+        try:
+            self.job_dispatcher.enqueue_many(events)
+        except Exception:
+            logger.exception("Falha ao enfileirar %s evento(s) de trabalhos: %s",
+                             len(events), json.dumps(events, ensure_ascii=False, default=str))
+
+    def _validate_new_task(self, task_data: dict) -> None:
+        if not task_data.get('title') or not task_data.get('assigned_to_id') or not task_data.get('status'):
+            raise ValueError("Título, assigned_to_id e status são obrigatórios.")
+        self._validate_text_fields(task_data)
+        _assignee_id(task_data['assigned_to_id'])
+
+    def _validate_text_fields(self, task_data: dict) -> None:
+        # Valores vindos do JSON: um número ou lista no lugar de um texto é erro do item, não 500
+        for field, label in (('title', 'Título'), ('status', 'Status')):
+            if field in task_data:
+                if not isinstance(task_data[field], str):
+                    raise ValueError(f"{label} deve ser um texto.")
+                if not task_data[field].strip():
+                    raise ValueError(f"{label} não pode ser vazio.")
+        description = task_data.get('description')
+        if description is not None and not isinstance(description, str):
+            raise ValueError("Descrição deve ser um texto.")
+
+    def _task_changes(self, task_data: dict) -> dict:
+        """
+        Valida e separa os campos de uma atualização parcial (exceto o responsável).
+        """
+        self._validate_text_fields(task_data)
+        return {field: task_data[field] for field in ('title', 'description', 'status') if field in task_data}
+
+    def _apply_task_fields(self, task: Task, task_data: dict) -> None:
+        for field, value in self._task_changes(task_data).items():
+            setattr(task, field, value)
+
+    def _find_assignees(self, user_ids: Iterable) -> Dict[int, User]:
+        """
+        Busca de uma vez (um único IN) todos os usuários referenciados por um lote.
+        """
+        ids = {user_id for user_id in user_ids if _is_id(user_id)}
+        if not ids:
+            return {}
+        return {user.id: user for user in self.user_repository.find_by_ids(list(ids))}
 
     def create_task(self, task_data: dict) -> Task:
         """
         Cria uma nova tarefa com a lógica de negócio necessária.
         """
-        if not task_data.get('title') or not task_data.get('assigned_to_id') or not task_data.get('status'):
-            raise ValueError("Título, assigned_to_id e status são obrigatórios.")
-
-        if not task_data['title'].strip():
-            raise ValueError("Título não pode ser vazio.")
-        if not task_data['status'].strip():
-            raise ValueError("Status não pode ser vazio.")
+        self._validate_new_task(task_data)
 
-        
         assignee_id = task_data['assigned_to_id']
         assignee = self.user_repository.find_by_id(assignee_id)
         if not assignee:
@@ -34,6 +122,8 @@ class TaskServiceImpl:
         )
         saved_task = self.task_repository.save(task)
         saved_task.assignee_name = assignee.nome 
+        event = self._task_event(saved_task)
+        self._publish([('task_created', event), ('task_assigned', event)])
         return saved_task
 
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
@@ -45,65 +135,300 @@ class TaskServiceImpl:
             assignee = self.user_repository.find_by_id(task.assigned_to_id)
             if assignee:
                 task.assignee_name = assignee.nome
+                # O nome do responsável faz parte da tarefa: renomeá-lo também a modifica (Last-Modified)
+                if task.updated_at and assignee.updated_at and assignee.updated_at > task.updated_at:
+                    task.updated_at = assignee.updated_at
         return task
 
-    def get_all_tasks(self, assigned_to_username: Optional[str] = None) -> List[Task]:
+    def build_task_query(self, assigned_to_username: Optional[str] = None, statuses: Sequence[str] = (),
+                         min_id: Optional[int] = None, max_id: Optional[int] = None, search: Optional[str] = None,
+                         sort: Sequence[tuple] = TaskQuery.DEFAULT_SORT,
+                         after: Optional[Sequence] = None) -> Optional[TaskQuery]:
         """
-        Lista todas as tarefas, opcionalmente filtrando por username do usuário atribuído.
+        Valida os critérios de uma listagem e monta o TaskQuery correspondente.
+        `sort` é uma sequência de (campo, decrescente) e `after` os valores do cursor
+        da página anterior. Retorna None se o responsável informado não existe
+        (a listagem é vazia). Lança ValueError se algum critério for inválido.
         """
+        sort_fields = [field for field, _ in sort]
+        invalid = [field for field in sort_fields if field not in TaskQuery.SORT_FIELDS]
+        if invalid:
+            raise ValueError(f"sort inválido: {', '.join(invalid)}. Permitidos: {', '.join(TaskQuery.SORT_FIELDS)}.")
+        if len(set(sort_fields)) != len(sort_fields):
+            raise ValueError("sort não pode repetir campos.")
+        if min_id is not None and max_id is not None and min_id > max_id:
+            raise ValueError("minId não pode ser maior que maxId.")
+        if search and len(search) > MAX_SEARCH_LENGTH:
+            raise ValueError(f"A busca deve ter no máximo {MAX_SEARCH_LENGTH} caracteres.")
+        search_terms = search.split() if search else []
+        if len(search_terms) > MAX_SEARCH_TERMS:
+            raise ValueError(f"A busca aceita no máximo {MAX_SEARCH_TERMS} termos.")
+
         assigned_to_id = None
         if assigned_to_username:
             user = self.user_repository.find_by_username(assigned_to_username)
             if not user:
-                
-                return []
+                return None
             assigned_to_id = user.id
 
-        tasks = self.task_repository.find_all(assigned_to_id=assigned_to_id)
-        
-        
-        for task in tasks:
-            if task.assigned_to_id:
-                assignee = self.user_repository.find_by_id(task.assigned_to_id)
-                if assignee:
-                    task.assignee_name = assignee.nome
-        return tasks
+        query = TaskQuery(assigned_to_id, statuses, min_id, max_id, search_terms, sort or TaskQuery.DEFAULT_SORT)
+        if after is not None:
+            query.after = self._parse_keyset(query, after)
+        return query
+
+    def _parse_keyset(self, query: TaskQuery, after: Sequence) -> tuple:
+        # O cursor vem do cliente: confere se há um valor do tipo certo para cada chave de ordenação
+        if len(after) != len(query.sort_keys):
+            raise ValueError("cursor inválido.")
+        values = []
+        for (field, _), value in zip(query.sort_keys, after):
+            if field in ('id', 'assigned_to_id'):
+                valid = isinstance(value, int) and not isinstance(value, bool)
+            elif field == 'updated_at':
+                try:
+                    value = datetime.datetime.fromisoformat(value)
+                    valid = True
+                except (TypeError, ValueError):
+                    valid = False
+            else:
+                valid = isinstance(value, str)
+            if not valid:
+                raise ValueError("cursor inválido.")
+            values.append(value)
+        return tuple(values)
 
-    def update_task(self, task_id: int, task_data: dict) -> Optional[Task]:
+    def get_all_tasks(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                      fields: Optional[Sequence[str]] = None) -> List[Task]:
         """
-        Atualiza uma tarefa existente.
+        Lista as tarefas que atendem a `query` (montado por build_task_query), filtradas,
+        buscadas e ordenadas pelo banco. Suporta paginação por cursor e projeção de campos.
         """
-        task = self.task_repository.find_by_id(task_id)
-        if not task:
-            return None 
-
-        if 'title' in task_data:
-            if not task_data['title'].strip(): raise ValueError("Título não pode ser vazio.")
-            task.title = task_data['title']
-        if 'description' in task_data:
-            task.description = task_data['description']
-        if 'status' in task_data:
-            if not task_data['status'].strip(): raise ValueError("Status não pode ser vazio.")
-            task.status = task_data['status']
+        return self.task_repository.find_all_with_assignees(query=query, limit=limit, fields=fields)
+
+    def get_tasks_fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        """
+        Resumo do estado da listagem que get_all_tasks devolveria com os mesmos argumentos
+        (muda sempre que ela mudar), sem carregar as tarefas. Base das ETags das listagens.
+        """
+        return self.task_repository.fingerprint(query=query, limit=limit)
+
+    def get_task_stats(self) -> dict:
+        """
+        Contagens de tarefas no total, por status e por responsável (com o detalhe por
+        status), montadas a partir de uma única contagem agrupada por (responsável,
+        status) no repositório, mais uma consulta pelos nomes dos responsáveis.
+        """
+        counts = self.task_repository.count_by_assignee_and_status()
+        assignees = self._find_assignees(assigned_to_id for assigned_to_id, _ in counts)
+        by_status: Dict[str, int] = {}
+        by_assignee: Dict[int, dict] = {}
+        for (assigned_to_id, status), count in sorted(counts.items()):
+            by_status[status] = by_status.get(status, 0) + count
+            assignee = by_assignee.setdefault(assigned_to_id, {
+                'assigned_to_id': assigned_to_id,
+                'assigned_to_name': assignees[assigned_to_id].nome if assigned_to_id in assignees else None,
+                'total': 0,
+                'by_status': {}
+            })
+            assignee['total'] += count
+            assignee['by_status'][status] = count
+        return {
+            'total': sum(by_status.values()),
+            'by_status': by_status,
+            'by_assignee': list(by_assignee.values())
+        }
+
+    def iter_all_tasks(self, query: Optional[TaskQuery] = None) -> Iterator[Task]:
+        """
+        Percorre as tarefas que atendem a `query` sem carregá-las todas em memória (usado na exportação).
+        """
+        yield from self.task_repository.iter_all(query=query)
+
+    def get_task_changes(self, since: Optional[int], limit: int,
+                         wait: float = 0) -> Tuple[List[TaskChange], int, bool]:
+        """
+        Mudanças de tarefas depois do cursor `since` (ver TaskRepository.find_changes),
+        o cursor da próxima chamada e se há mais mudanças além de `limit`. Sem `since`
+        devolve só o cursor atual, para quem acabou de ler a listagem completa.
+
+        Com `wait` > 0 e nada novo, espera até `wait` segundos pela próxima mudança
+        (long-poll). A espera é no notificador, sem consultar o banco.
+        """
+        if since is None:
+            return [], self.task_repository.last_change_seq(), False
+
+        changes = self.task_repository.find_changes(since, limit + 1)
+        if not changes and wait > 0 and self.change_notifier is not None:
+            deadline = time.monotonic() + wait
+            horizon = since
+            while not changes and time.monotonic() < deadline:
+                timeout = deadline - time.monotonic()
+                if self.changes_poll_interval:
+                    timeout = min(timeout, self.changes_poll_interval)
+                notified = self.change_notifier.wait(horizon, timeout)
+                if not notified and not self.changes_poll_interval:
+                    break
+                changes = self.task_repository.find_changes(since, limit + 1)
+                if notified and not changes:
+                    # Aviso de uma mudança que o feed não mostra depois de since: espera a próxima
+                    horizon = max(horizon, self.task_repository.last_change_seq())
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return changes, changes[-1].seq if changes else since, has_more
+
+    def update_task(self, task_id: int, task_data: dict, expected_version: Optional[int] = None) -> Optional[Task]:
+        """
+        Atualiza parcialmente uma tarefa existente com um único comando no repositório
+        (patch), sem lê-la antes; o responsável é conferido no mesmo comando.
+        Retorna None se a tarefa não existe.
+        Com expected_version, lança ConcurrentModificationException se a tarefa
+        não estiver mais nessa versão (concorrência otimista).
+        """
+        changes = self._task_changes(task_data)
         if 'assigned_to_id' in task_data:
-            assignee_id = task_data['assigned_to_id']
-            assignee = self.user_repository.find_by_id(assignee_id)
-            if not assignee:
-                raise ValueError(f"Usuário atribuído com ID {assignee_id} não encontrado.")
-            task.assigned_to_id = assignee_id
-            task.assignee_name = assignee.nome 
-
-        updated_task = self.task_repository.save(task)
-        
-        if updated_task.assigned_to_id and not updated_task.assignee_name:
-            assignee = self.user_repository.find_by_id(updated_task.assigned_to_id)
-            if assignee:
-                updated_task.assignee_name = assignee.nome
-        
-        return updated_task
+            changes['assigned_to_id'] = _assignee_id(task_data['assigned_to_id'])
+
+        if not changes:
+            task = self.get_task_by_id(task_id)
+            if task and expected_version is not None and task.version != expected_version:
+                raise ConcurrentModificationException(f"A tarefa {task_id} foi alterada desde a última leitura.")
+            return task
+        task = self.task_repository.patch(task_id, changes, expected_version)
+        if task:
+            self._publish(self._update_events(task, changes))
+        return task
+
+    def _update_events(self, task: Task, changes: dict) -> List[Tuple[str, dict]]:
+        event = self._task_event(task, changes=sorted(changes))
+        events = [('task_updated', event)]
+        if 'assigned_to_id' in changes:
+            events.append(('task_assigned', event))
+        return events
 
     def delete_task(self, task_id: int) -> bool:
         """
         Deleta uma tarefa pelo seu ID.
         """
-        return self.task_repository.delete_by_id(task_id)
\ No newline at end of file
+        deleted = self.task_repository.delete_by_id(task_id)
+        if deleted:
+            self._publish([('task_deleted', self._deleted_event(task_id))])
+        return deleted
+
+    def _deleted_event(self, task_id: int) -> dict:
+        return {'task_id': task_id, 'occurred_at': datetime.datetime.utcnow().isoformat()}
+
+    def create_tasks(self, tasks_data: List[dict]) -> List[Union[Task, Exception]]:
+        """
+        Cria várias tarefas em lote: valida todos os responsáveis com uma única consulta
+        e grava as tarefas válidas em uma única transação.
+        Retorna, na ordem da entrada, a Task criada ou a exceção que invalidou o item.
+        """
+        assignees = self._find_assignees(
+            task_data.get('assigned_to_id') for task_data in tasks_data if isinstance(task_data, dict)
+        )
+        results: List[Union[Task, Exception]] = [None] * len(tasks_data)
+        pending = []
+        for index, task_data in enumerate(tasks_data):
+            try:
+                if not isinstance(task_data, dict):
+                    raise ValueError("Cada item do lote deve ser um objeto.")
+                self._validate_new_task(task_data)
+                assignee_id = task_data['assigned_to_id']
+                if assignee_id not in assignees:
+                    raise ValueError(f"Usuário atribuído com ID {assignee_id} não encontrado.")
+                pending.append((index, Task(
+                    title=task_data['title'],
+                    description=task_data.get('description'),
+                    status=task_data['status'],
+                    assigned_to_id=assignee_id
+                )))
+            except ValueError as e:
+                results[index] = e
+
+        saved_tasks = self.task_repository.save_many([task for _, task in pending]) if pending else []
+        events = []
+        for (index, _), saved_task in zip(pending, saved_tasks):
+            saved_task.assignee_name = assignees[saved_task.assigned_to_id].nome
+            results[index] = saved_task
+            event = self._task_event(saved_task)
+            events += [('task_created', event), ('task_assigned', event)]
+        self._publish(events)
+        return results
+
+    def update_tasks(self, tasks_data: List[dict]) -> List[Union[Task, Exception]]:
+        """
+        Atualiza parcialmente várias tarefas em lote (cada item precisa do id).
+        Carrega as tarefas e os responsáveis com uma consulta cada e grava tudo
+        em uma única transação.
+        Retorna, na ordem da entrada, a Task atualizada ou a exceção que invalidou o item.
+        """
+        items = [task_data for task_data in tasks_data if isinstance(task_data, dict)]
+        task_ids = [task_data.get('id') for task_data in items if _is_id(task_data.get('id'))]
+        existing = {task.id: task for task in self.task_repository.find_by_ids(task_ids)} if task_ids else {}
+        assignees = self._find_assignees(
+            task_data['assigned_to_id'] for task_data in items if 'assigned_to_id' in task_data
+        )
+
+        results: List[Union[Task, Exception]] = [None] * len(tasks_data)
+        pending = []
+        seen_ids = set()
+        for index, task_data in enumerate(tasks_data):
+            try:
+                if not isinstance(task_data, dict) or not _is_id(task_data.get('id')):
+                    raise ValueError("Cada item do lote deve ser um objeto com o id inteiro da tarefa.")
+                task_id = task_data['id']
+                if task_id in seen_ids:
+                    raise ValueError(f"Tarefa {task_id} repetida no lote.")
+                seen_ids.add(task_id)
+
+                task = existing.get(task_id)
+                if not task:
+                    raise TaskNotFoundException(f"Tarefa {task_id} não encontrada.")
+
+                self._apply_task_fields(task, task_data)
+                if 'assigned_to_id' in task_data:
+                    assignee_id = _assignee_id(task_data['assigned_to_id'])
+                    if assignee_id not in assignees:
+                        raise ValueError(f"Usuário atribuído com ID {assignee_id} não encontrado.")
+                    task.assigned_to_id = assignee_id
+                    task.assignee_name = assignees[assignee_id].nome
+                pending.append((index, task))
+            except (ValueError, TaskNotFoundException) as e:
+                results[index] = e
+
+        saved_tasks = self.task_repository.save_many([task for _, task in pending]) if pending else []
+        events = []
+        for (index, task), saved_task in zip(pending, saved_tasks):
+            saved_task.assignee_name = task.assignee_name
+            results[index] = saved_task
+            changes = {field for field in ('title', 'description', 'status', 'assigned_to_id') if field in tasks_data[index]}
+            events += self._update_events(saved_task, changes)
+        self._publish(events)
+        return results
+
+    def delete_tasks(self, task_ids: List[int]) -> List[Union[bool, Exception]]:
+        """
+        Deleta várias tarefas com um único comando.
+        Retorna, na ordem da entrada, True para cada tarefa removida ou a exceção do
+        item: ValueError para um id que não é inteiro, TaskNotFoundException para uma
+        tarefa inexistente ou repetida no lote (a primeira ocorrência já a removeu).
+        """
+        valid_ids = list(dict.fromkeys(task_id for task_id in task_ids if _is_id(task_id)))
+        deleted = set(self.task_repository.delete_many(valid_ids)) if valid_ids else set()
+        self._publish([('task_deleted', self._deleted_event(task_id)) for task_id in sorted(deleted)])
+
+        results: List[Union[bool, Exception]] = []
+        seen_ids = set()
+        for task_id in task_ids:
+            if not _is_id(task_id):
+                results.append(ValueError(f"ID de tarefa inválido: {task_id!r} (use um número inteiro)."))
+            elif task_id in seen_ids:
+                results.append(TaskNotFoundException(f"Tarefa {task_id} repetida no lote; já removida."))
+            elif task_id not in deleted:
+                results.append(TaskNotFoundException(f"Tarefa {task_id} não encontrada."))
+            else:
+                results.append(True)
+            if _is_id(task_id):
+                seen_ids.add(task_id)
+        return results
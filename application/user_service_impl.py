@@ -1,11 +1,25 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from core.domain.entities import User
 from core.ports.user_repository import UserRepository
+from core.ports.principal_cache import PrincipalCache
+from core.ports.password_hasher import PasswordHasher
 
 
 class UserServiceImpl:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, principal_cache: Optional[PrincipalCache] = None,
+                 password_hasher: Optional[PasswordHasher] = None):
         self.user_repository = user_repository
+        self.principal_cache = principal_cache
+        self.password_hasher = password_hasher
+        self._dummy_hash = None
+
+    def _hash_password(self, password: str) -> str:
+        # Sem hasher configurado a senha é guardada como veio (comportamento legado)
+        return self.password_hasher.hash(password) if self.password_hasher else password
+
+    def _invalidate_principal(self, user_id: int) -> None:
+        if self.principal_cache:
+            self.principal_cache.invalidate_user(user_id)
 
     def create_user(self, user_data: dict) -> User:
 
@@ -17,38 +31,76 @@ class UserServiceImpl:
         user = User(
             nome=user_data['nome'],
             username=user_data['username'],
-            password=user_data['password'] 
+            password=self._hash_password(user_data['password'])
         )
         return self.user_repository.save(user)
 
+    def authenticate(self, username: str, password: str) -> Optional[User]:
+        """
+        Retorna o usuário se username e senha conferem, None caso contrário.
+        Se o hash armazenado usa parâmetros de custo antigos (ou é texto puro legado),
+        ele é refeito com os parâmetros atuais de forma transparente.
+        """
+        user = self.user_repository.find_by_username(username)
+        if not self.password_hasher:
+            return user if user and user.password == password else None
+
+        if not user:
+            # Verifica contra um hash fictício para que usuários inexistentes
+            # levem o mesmo tempo que senhas erradas.
+            if self._dummy_hash is None:
+                self._dummy_hash = self.password_hasher.hash('')
+            self.password_hasher.verify(password, self._dummy_hash)
+            return None
+
+        if not self.password_hasher.verify(password, user.password):
+            return None
+
+        if self.password_hasher.needs_rehash(user.password):
+            # Só a senha: uma edição concorrente do usuário não deve fazer o login falhar
+            user = self.user_repository.patch(user.id, {'password': self.password_hasher.hash(password)}) or user
+        return user
+
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         return self.user_repository.find_by_id(user_id)
 
     def get_user_by_username(self, username: str) -> Optional[User]:
         return self.user_repository.find_by_username(username)
 
-    def get_all_users(self) -> List[User]:
-        return self.user_repository.find_all()
+    def get_all_users(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                      fields: Optional[Sequence[str]] = None) -> List[User]:
+        return self.user_repository.find_all(limit=limit, after_id=after_id, fields=fields)
 
-    def update_user(self, user_id: int, user_data: dict) -> Optional[User]:
-        user = self.user_repository.find_by_id(user_id)
-        if not user:
-            return None
+    def get_users_fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        """
+        Resumo do estado da listagem que get_all_users devolveria com a mesma paginação.
+        """
+        return self.user_repository.fingerprint(limit=limit, after_id=after_id)
 
+    def update_user(self, user_id: int, user_data: dict) -> Optional[User]:
+        """
+        Atualiza parcialmente um usuário com um único comando no repositório (patch).
+        A unicidade do username é garantida pelo repositório no próprio UPDATE.
+        """
+        changes = {}
         if 'nome' in user_data:
             if not user_data['nome'].strip(): raise ValueError("Nome não pode ser vazio.")
-            user.nome = user_data['nome']
+            changes['nome'] = user_data['nome']
         if 'username' in user_data:
             if not user_data['username'].strip(): raise ValueError("Username não pode ser vazio.")
-            existing_user = self.user_repository.find_by_username(user_data['username'])
-            if existing_user and existing_user.id != user_id:
-                raise ValueError("Username já existe.")
-            user.username = user_data['username']
+            changes['username'] = user_data['username']
         if 'password' in user_data:
             if not user_data['password'].strip(): raise ValueError("Password não pode ser vazio.")
-            user.password = user_data['password'] 
+            changes['password'] = self._hash_password(user_data['password'])
 
-        return self.user_repository.save(user)
+        if not changes:
+            return self.user_repository.find_by_id(user_id)
+        updated_user = self.user_repository.patch(user_id, changes)
+        if updated_user:
+            self._invalidate_principal(user_id)
+        return updated_user
 
     def delete_user(self, user_id: int) -> bool:
-        return self.user_repository.delete_by_id(user_id)
\ No newline at end of file
+        deleted = self.user_repository.delete_by_id(user_id)
+        self._invalidate_principal(user_id)
+        return deleted
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Modo de execução assíncrono (ASGI), opcional.
+
+Reaproveita a configuração de app.py e os mesmos UserServiceImpl/TaskServiceImpl, mas
+com repositórios sobre SQLAlchemy assíncrono (asyncpg / aiosqlite) e handlers Quart,
+de modo que uma requisição esperando o banco não ocupa um worker.
+
+Requer as dependências de requirements-async.txt. Execução:
+    uvicorn asgi:app --workers 4
+    uvicorn --factory asgi:create_asgi_app --workers 4   # equivalente, pela fábrica
+
+Importar este módulo não monta o app: asgi.app é criado no primeiro acesso (é o que o
+uvicorn faz ao carregar "asgi:app"), não no import.
+"""
+import asyncio
+from typing import Mapping, Optional
+from quart import Quart
+from app import create_app, database_engine_options
+from infrastructure.web.dependencies import ApiDependencies
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_url(database_url: str) -> str:
+    scheme, separator, rest = database_url.partition('://')
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+def create_asgi_app(config: Optional[Mapping] = None) -> Quart:
+    """
+    Monta o app Quart a partir de create_app(config), com a mesma configuração e os
+    mesmos cache de tokens, hasher de senhas e despachante de trabalhos.
+    """
+    from sqlalchemy.ext.asyncio import async_scoped_session, async_sessionmaker, create_async_engine
+    from application.user_service_impl import UserServiceImpl
+    from application.task_service_impl import TaskServiceImpl
+    from infrastructure.async_bridge import (
+        AwaitingChangeNotifier, AwaitingPasswordHasher, AwaitingTaskRepository, AwaitingUserRepository,
+    )
+    from infrastructure.notifications.change_notifier import InProcessChangeNotifier
+    from infrastructure.database.sqlalchemy_async_repository_adapters import AsyncSQLAlchemyUserRepository, AsyncSQLAlchemyTaskRepository
+    from infrastructure.web.quart_api_adapters import async_api_bp
+
+    wsgi_app = create_app(config)
+    wsgi_api: ApiDependencies = wsgi_app.extensions['api']
+
+    engine_options = database_engine_options(wsgi_app.config)
+    engine_options.pop('poolclass', None) # InstrumentedQueuePool é síncrono; o engine async usa o seu próprio pool
+    engine = create_async_engine(async_database_url(wsgi_app.config['SQLALCHEMY_DATABASE_URI']), **engine_options)
+
+    # Uma AsyncSession por requisição (cada requisição roda na sua própria task)
+    session_registry = async_scoped_session(
+        async_sessionmaker(engine, expire_on_commit=False),
+        scopefunc=asyncio.current_task
+    )
+
+    # As gravações deste app acordam as esperas do feed de mudanças (long-poll / SSE)
+    change_notifier = InProcessChangeNotifier()
+    task_counters = wsgi_app.config['TASK_STATS_COUNTERS']
+    user_repository = AwaitingUserRepository(AsyncSQLAlchemyUserRepository(
+        session_registry, task_counters=task_counters, change_notifier=change_notifier))
+    task_repository = AwaitingTaskRepository(AsyncSQLAlchemyTaskRepository(
+        session_registry, task_counters=task_counters, change_notifier=change_notifier))
+
+    if wsgi_app.config['REPOSITORY_CACHE_ENABLED']:
+        from infrastructure.cache.backends import InMemoryCacheBackend
+        from infrastructure.cache.caching_repository_adapters import CachingUserRepository, CachingTaskRepository
+        cache_backend = InMemoryCacheBackend(
+            max_size=wsgi_app.config['REPOSITORY_CACHE_SIZE'],
+            ttl=wsgi_app.config['REPOSITORY_CACHE_TTL']
+        )
+        task_repository = CachingTaskRepository(task_repository, cache_backend)
+        user_repository = CachingUserRepository(user_repository, cache_backend, task_cache=task_repository)
+
+    user_service = UserServiceImpl(user_repository, wsgi_api.principal_cache, AwaitingPasswordHasher(wsgi_api.password_hasher))
+    # O mesmo despachante da API síncrona. Com JOB_DISPATCHER=database o INSERT na fila é
+    # síncrono e ocupa o event loop por alguns milissegundos a cada gravação de tarefa.
+    task_service = TaskServiceImpl(task_repository, user_repository, wsgi_api.job_dispatcher,
+                                   AwaitingChangeNotifier(change_notifier),
+                                   changes_poll_interval=wsgi_app.config['TASK_CHANGES_POLL_INTERVAL'])
+
+    app = Quart(__name__)
+    app.config['SECRET_KEY'] = wsgi_app.config['SECRET_KEY']
+    for key in ('TASK_CHANGES_MAX_WAIT', 'TASK_CHANGES_SSE_HEARTBEAT', 'TASK_CHANGES_SSE_MAX_SECONDS'):
+        app.config[key] = wsgi_app.config[key]
+    ApiDependencies(
+        user_service, task_service, app.config['SECRET_KEY'],
+        principal_cache=wsgi_api.principal_cache,
+        password_hasher=wsgi_api.password_hasher,
+        job_dispatcher=wsgi_api.job_dispatcher
+    ).init_app(app, async_api_bp)
+
+    @app.teardown_request
+    async def remove_session(exception=None):
+        await session_registry.remove()
+
+    @app.route('/')
+    async def home():
+        return "API está no ar!"
+
+    return app
+
+
+def __getattr__(name: str):
+    # "uvicorn asgi:app" / "from asgi import app": monta o app só quando pedido
+    if name == 'app':
+        globals()['app'] = create_asgi_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
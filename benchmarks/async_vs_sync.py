@@ -0,0 +1,151 @@
+"""
+Compara requisições por segundo do caminho síncrono (app.py, servidor WSGI com threads)
+com o modo ASGI (asgi.py sob uvicorn) em alta concorrência, para GET /tasks.
+
+Uso:
+    python benchmarks/async_vs_sync.py --concurrency 200 --requests 4000
+    python benchmarks/async_vs_sync.py --database-url postgresql://.../bench_db
+
+Requer requirements-async.txt. Sem --database-url usa um arquivo SQLite temporário; com
+um banco de rede (Postgres) a diferença entre os modos fica mais visível, pois é na
+espera pelo banco que o modo assíncrono deixa de prender workers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def serve(mode: str, port: int):
+    if mode == 'sync':
+        from werkzeug.serving import run_simple
+        from app import create_app
+        run_simple('127.0.0.1', port, create_app(), threaded=True)
+    else:
+        import uvicorn
+        uvicorn.run('asgi:app', host='127.0.0.1', port=port, log_level='warning')
+
+
+def seed(tasks: int) -> None:
+    from app import create_app
+    app = create_app()
+    user_service, task_service = app.extensions['api'].user_service, app.extensions['api'].task_service
+    from infrastructure.database.sqlalchemy_models import db
+    from infrastructure.database.migrations import upgrade
+
+    with app.app_context():
+        upgrade(db.engine)
+        user = user_service.create_user({'nome': 'Bench', 'username': 'bench', 'password': 'senha123'})
+        task_service.create_tasks([
+            {'title': f'Tarefa {i}', 'status': 'pending', 'assigned_to_id': user.id} for i in range(tasks)
+        ])
+
+
+async def http_request(port: int, method: str, path: str, headers: dict = None, body: bytes = b''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f'{method} {path} HTTP/1.1', f'Host: 127.0.0.1:{port}', 'Connection: close',
+             f'Content-Length: {len(body)}']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, rest = response.partition(b'\r\n')
+    return int(status_line.split()[1]), rest.partition(b'\r\n\r\n')[2]
+
+
+def wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'servidor não subiu na porta {port}')
+
+
+async def load(port: int, path: str, token: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                status, _ = await http_request(port, 'GET', path, {'x-access-token': token})
+                if status != 200:
+                    errors += 1
+            except OSError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--path', default='/tasks?limit=50')
+    parser.add_argument('--serve', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=5100)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    db_file = None
+    if not args.database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        args.database_url = f'sqlite:///{db_file}'
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes')
+    seed(args.tasks)
+
+    print(f'{args.requests} x GET {args.path} | concorrência {args.concurrency}')
+    print(f'{"modo":>6} {"req/s":>9} {"p50 ms":>9} {"p99 ms":>9} {"erros":>6}')
+    for port, mode in enumerate(['sync', 'async'], start=args.port):
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port)],
+                                  env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            status, body = asyncio.run(http_request(
+                port, 'POST', '/auth/login', {'Content-Type': 'application/json'},
+                b'{"username": "bench", "password": "senha123"}'
+            ))
+            token = json.loads(body)['token']
+            result = asyncio.run(load(port, args.path, token, args.concurrency, args.requests))
+            print(f'{mode:>6} {result["rps"]:>9.1f} {result["p50"]:>9.1f} {result["p99"]:>9.1f} {result["errors"]:>6}')
+        finally:
+            server.terminate()
+            server.wait()
+
+    if db_file:
+        os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Mede, por algoritmo e nível, quantos bytes uma listagem de tarefas (ex.: 2000
+linhas) ocupa no fio e quanto CPU a compressão custa, para escolher
+COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_LEVEL:
+
+  - corpo inteiro: a resposta JSON de GET /tasks, comprimida de uma vez
+  - streaming:     o mesmo conteúdo em NDJSON (como /tasks/export), comprimido
+                   linha a linha com flush a cada --flush-size bytes
+
+brotli só é medido se o pacote opcional `brotli` estiver instalado.
+
+Uso:
+    python benchmarks/compression_benchmark.py --rows 2000 --repetitions 5
+    python benchmarks/compression_benchmark.py --rows 10000 --flush-size 65536
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.domain.entities import Task  # noqa: E402
+from infrastructure.web.compression import ResponseCompressor, brotli  # noqa: E402
+from infrastructure.web.json_provider import orjson  # noqa: E402
+
+
+def build_tasks(rows: int):
+    statuses = ('pending', 'in_progress', 'done')
+    return [
+        Task(i, f'Tarefa {i}', f'Descrição da tarefa {i}', statuses[i % 3], i % 50 + 1, f'Usuário {i % 50 + 1}')
+        for i in range(1, rows + 1)
+    ]
+
+
+def dumps(value) -> bytes:
+    return orjson.dumps(value) if orjson else json.dumps(value, ensure_ascii=False).encode()
+
+
+def measure(compress, repetitions: int):
+    # CPU do processo (não tempo de parede): é o que a compressão tira dos workers
+    compressed = compress()
+    timings = []
+    for _ in range(repetitions):
+        start = time.process_time()
+        compress()
+        timings.append(time.process_time() - start)
+    return len(compressed), statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--flush-size', type=int, default=16384)
+    args = parser.parse_args()
+
+    tasks = build_tasks(args.rows)
+    body = dumps([task.to_dict() for task in tasks])
+    lines = [dumps(task.to_dict()) + b'\n' for task in tasks]
+
+    levels = [('gzip', level) for level in range(1, 10)]
+    if brotli is not None:
+        levels += [('br', level) for level in range(0, 12)]
+    else:
+        print('Pacote brotli não instalado: medindo só gzip.')
+
+    print(f'Listagem: {args.rows} tarefas, {len(body)} bytes sem compressão\n')
+    print(f'{"modo":<10} {"algoritmo":<9} {"nível":>5} {"bytes":>10} {"razão":>7} {"CPU ms":>9} {"MB/s":>8}')
+    for mode, raw_size in (('corpo', len(body)), ('streaming', sum(map(len, lines)))):
+        for encoding, level in levels:
+            compressor = ResponseCompressor(gzip_level=level, brotli_level=level, flush_size=args.flush_size)
+            if mode == 'corpo':
+                def compress():
+                    stream = compressor._stream(encoding)
+                    return stream.compress(body) + stream.finish()
+            else:
+                def compress():
+                    return b''.join(compressor._compress_iter(iter(lines), encoding))
+
+            size, cpu_ms = measure(compress, args.repetitions)
+            throughput = raw_size / 1024 / 1024 / (cpu_ms / 1000) if cpu_ms else float('inf')
+            print(f'{mode:<10} {encoding:<9} {level:>5} {size:>10} {raw_size / size:>7.1f} {cpu_ms:>9.2f} {throughput:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
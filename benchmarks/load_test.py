@@ -0,0 +1,495 @@
+"""
+Teste de carga da API por HTTP, como clientes reais: sobe o servidor com N workers
+sobre SQLite ou um Postgres local, faz login por /auth/login e dispara, de vários
+processos, uma mistura configurável de requisições:
+
+  list           GET /tasks?limit=50
+  list_assignee  GET /tasks?assignedTo=<username>&limit=50
+  create         POST /tasks
+  update         PUT /tasks/<id>     (tarefas do seed ou criadas pela própria conexão)
+  delete         DELETE /tasks/<id>  (só tarefas criadas pela própria conexão; sem
+                                      nenhuma, a conexão cria uma no lugar)
+
+Cada estágio de --concurrency roda --warmup segundos descartados e depois --duration
+segundos medidos, com conexões keep-alive em laço fechado: cada conexão envia a
+próxima requisição quando a anterior responde. Com vários estágios (ex.: 8,32,128) a
+vazão para de subir e a latência dispara onde o servidor satura. Para cada estágio e
+operação mostra req/s, p50/p90/p99/máx e a taxa de erros (status fora de 2xx ou falha
+de conexão, com a contagem por status no JSON).
+
+Uso:
+    python benchmarks/load_test.py --workers 4 --concurrency 8,32,64 --duration 20
+    python benchmarks/load_test.py --mix list=60,list_assignee=20,create=10,update=8,delete=2
+    python benchmarks/load_test.py --database-url postgresql://localhost/carga_db --server gunicorn
+    python benchmarks/load_test.py --output carga.json
+    python benchmarks/load_test.py --baseline carga.json   # compara req/s e p99 com uma rodada anterior
+
+Servidores (--server):
+  - prefork (padrão; Linux/macOS): o master abre o socket e cria os workers com fork;
+    cada um monta o app com create_app() e atende com o servidor WSGI com threads do werkzeug;
+  - gunicorn: "app:create_app()" com --threads threads por worker;
+  - uvicorn: asgi.py (requer requirements-async.txt).
+
+Sem --database-url usa um arquivo SQLite temporário, que serializa as escritas: para
+medir escritas concorrentes use um Postgres dedicado (o seed cria usuários e tarefas
+nele a cada rodada). O custo do scrypt é reduzido (PASSWORD_HASH_N) para que os logins
+não dominem a rodada; as demais variáveis de ambiente (DB_POOL_SIZE, RATE_LIMIT_*, ...)
+passam para o servidor.
+"""
+import argparse
+import collections
+import datetime
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ('list', 'list_assignee', 'create', 'update', 'delete')
+DEFAULT_MIX = 'list=50,list_assignee=20,create=15,update=10,delete=5'
+SERVERS = ('prefork', 'gunicorn', 'uvicorn')
+STATUSES = ('pending', 'in_progress', 'done')
+PASSWORD = 'senha123'
+PAGE_SIZE = 50
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f'operação desconhecida em --mix: {name!r} (use {", ".join(OPERATIONS)})')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f'peso inválido em --mix: {item!r}')
+        if mix[name] < 0:
+            raise ValueError(f'peso negativo em --mix: {item!r}')
+    if not any(mix.values()):
+        raise ValueError('--mix precisa de ao menos uma operação com peso positivo')
+    return mix
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_port(port: int, server: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'o servidor terminou ao subir (código {server.returncode})')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'servidor não subiu na porta {port}')
+
+
+# Servidor
+
+def serve_prefork(port: int, workers: int) -> None:
+    import logging
+    from werkzeug.serving import make_server
+
+    listener = socket.create_server(('127.0.0.1', port), backlog=2048)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            sys.path.insert(0, ROOT)
+            from app import create_app
+            logging.getLogger('werkzeug').setLevel(logging.WARNING) # Sem uma linha de log por requisição
+            make_server('127.0.0.1', port, create_app(), threaded=True, fd=listener.fileno()).serve_forever()
+            os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            os.waitpid(pid, 0)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def server_command(server: str, port: int, workers: int, threads: int) -> list:
+    if server == 'prefork':
+        return [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port), '--workers', str(workers)]
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+                '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:create_app()']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(workers), '--port', str(port),
+            '--log-level', 'warning']
+
+
+def seed(users: int, tasks: int) -> dict:
+    """
+    Cria (ou reaproveita) os usuários carga0..cargaN-1 e cria as tarefas desta rodada.
+    Retorna os usernames, os ids dos usuários e os ids das tarefas criadas.
+    """
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    app = create_app()
+    user_service, task_service = app.extensions['api'].user_service, app.extensions['api'].task_service
+    from infrastructure.database.sqlalchemy_models import db
+    from infrastructure.database.migrations import upgrade
+
+    rng = random.Random(42)
+    with app.app_context():
+        upgrade(db.engine)
+        accounts = []
+        for i in range(users):
+            username = f'carga{i}'
+            user = user_service.get_user_by_username(username) or user_service.create_user(
+                {'nome': f'Carga {i}', 'username': username, 'password': PASSWORD})
+            accounts.append(user)
+        created = task_service.create_tasks([
+            {'title': f'Tarefa {i}', 'status': rng.choice(STATUSES), 'assigned_to_id': rng.choice(accounts).id}
+            for i in range(tasks)
+        ])
+    return {
+        'usernames': [user.username for user in accounts],
+        'user_ids': [user.id for user in accounts],
+        'task_ids': [task.id for task in created]
+    }
+
+
+# Clientes
+
+class Connection:
+    """Conexão keep-alive de um cliente, com o token do usuário com que fez login."""
+
+    def __init__(self, port: int, username: str):
+        self.port = port
+        self.http = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        self.token = None
+        status, body = self.request('POST', '/auth/login', {'username': username, 'password': PASSWORD})
+        if status != 200:
+            raise RuntimeError(f'login de {username} falhou: {status} {body[:200]!r}')
+        self.token = json.loads(body)['token']
+
+    def request(self, method: str, path: str, payload=None):
+        # Retorna (status, corpo); status 0 é falha de conexão, e a conexão é refeita
+        headers = {'x-access-token': self.token} if self.token else {}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.http.request(method, path, body=body, headers=headers)
+            response = self.http.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.http.close()
+            self.http = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            return 0, b''
+
+
+def run_connection(connection: Connection, rng: random.Random, mix: dict, seeded: dict,
+                   measure_from: float, measure_until: float, samples: dict, statuses: dict) -> None:
+    operations, weights = list(mix), list(mix.values())
+    own_ids = []
+    while True:
+        operation = rng.choices(operations, weights)[0]
+        if operation == 'delete' and not own_ids:
+            operation = 'create'
+
+        if operation == 'list':
+            method, path, payload = 'GET', f'/tasks?limit={PAGE_SIZE}', None
+        elif operation == 'list_assignee':
+            method, path, payload = 'GET', f'/tasks?assignedTo={rng.choice(seeded["usernames"])}&limit={PAGE_SIZE}', None
+        elif operation == 'create':
+            method, path, payload = 'POST', '/tasks', {
+                'title': f'Carga {rng.getrandbits(32):08x}', 'description': 'Criada pelo teste de carga',
+                'status': 'pending', 'assigned_to_id': rng.choice(seeded['user_ids'])}
+        elif operation == 'update':
+            task_id = rng.choice(own_ids) if own_ids and rng.random() < 0.5 else rng.choice(seeded['task_ids'])
+            method, path, payload = 'PUT', f'/tasks/{task_id}', {'status': rng.choice(STATUSES)}
+        else:
+            method, path, payload = 'DELETE', f'/tasks/{own_ids.pop(rng.randrange(len(own_ids)))}', None
+
+        start = time.perf_counter()
+        if start >= measure_until:
+            return
+        status, body = connection.request(method, path, payload)
+        elapsed = time.perf_counter() - start
+        if operation == 'create' and status == 201:
+            own_ids.append(json.loads(body)['id'])
+        if start >= measure_from:
+            samples[operation].append(elapsed)
+            statuses[operation][status] += 1
+
+
+def run_client(port: int, connections: int, client_index: int, mix: dict, seed_file: str,
+               warmup: float, duration: float) -> dict:
+    """
+    Processo cliente: faz login com `connections` conexões, avisa que está pronto (linha
+    "ready" no stdout), espera a largada (uma linha no stdin) e roda a carga.
+    """
+    with open(seed_file) as file:
+        seeded = json.load(file)
+    usernames = seeded['usernames']
+    login_samples = []
+    opened = []
+    for index in range(connections):
+        start = time.perf_counter()
+        opened.append(Connection(port, usernames[(client_index * connections + index) % len(usernames)]))
+        login_samples.append(time.perf_counter() - start)
+
+    print('ready', flush=True)
+    sys.stdin.readline()
+    start = time.perf_counter()
+    measure_from, measure_until = start + warmup, start + warmup + duration
+
+    # Amostras separadas por conexão, juntadas no fim
+    per_connection = [(collections.defaultdict(list), collections.defaultdict(collections.Counter)) for _ in opened]
+    threads = [
+        threading.Thread(target=run_connection, args=(
+            connection, random.Random(f'{client_index}:{index}'), mix, seeded,
+            measure_from, measure_until, *per_connection[index]))
+        for index, connection in enumerate(opened)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = collections.defaultdict(list)
+    statuses = collections.defaultdict(collections.Counter)
+    for connection_samples, connection_statuses in per_connection:
+        for operation, values in connection_samples.items():
+            samples[operation] += values
+        for operation, counts in connection_statuses.items():
+            statuses[operation].update(counts)
+    return {
+        'login': login_samples,
+        'samples': {operation: values for operation, values in samples.items()},
+        'statuses': {operation: dict(counts) for operation, counts in statuses.items()}
+    }
+
+
+# Estágios
+
+def summarize(samples, statuses: dict, duration: float) -> dict:
+    requests = sum(statuses.values())
+    errors = sum(count for status, count in statuses.items() if not 200 <= int(status) < 300)
+    result = {
+        'requests': requests,
+        'requests_per_second': requests / duration,
+        'errors': errors,
+        'error_rate': errors / requests if requests else 0.0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=lambda item: int(item[0]))}
+    }
+    if samples:
+        result.update({
+            'mean_ms': statistics.fmean(samples) * 1000,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p90_ms': percentile(samples, 0.90) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+            'max_ms': max(samples) * 1000
+        })
+    return result
+
+
+def run_stage(port: int, concurrency: int, processes: int, mix: dict, seed_file: str,
+              warmup: float, duration: float) -> dict:
+    processes = max(1, min(processes, concurrency))
+    shares = [concurrency // processes + (1 if index < concurrency % processes else 0) for index in range(processes)]
+    mix_arg = ','.join(f'{name}={weight}' for name, weight in mix.items())
+    clients = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--client', '--port', str(port), '--concurrency', str(share),
+             '--client-index', str(index), '--mix', mix_arg, '--seed-file', seed_file,
+             '--warmup', str(warmup), '--duration', str(duration)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for index, share in enumerate(shares)
+    ]
+    try:
+        # Largada conjunta: só depois que todos os processos fizeram login
+        for client in clients:
+            if client.stdout.readline().strip() != 'ready':
+                raise RuntimeError('um processo cliente falhou antes da largada')
+        for client in clients:
+            client.stdin.write('\n')
+            client.stdin.flush()
+        outputs = [json.loads(client.communicate()[0].strip().splitlines()[-1]) for client in clients]
+    finally:
+        for client in clients:
+            if client.poll() is None:
+                client.kill()
+
+    samples = collections.defaultdict(list)
+    statuses = collections.defaultdict(collections.Counter)
+    logins = []
+    for output in outputs:
+        logins += output['login']
+        for operation, values in output['samples'].items():
+            samples[operation] += values
+        for operation, counts in output['statuses'].items():
+            statuses[operation].update({int(status): count for status, count in counts.items()})
+
+    all_samples = [value for values in samples.values() for value in values]
+    all_statuses = collections.Counter()
+    for counts in statuses.values():
+        all_statuses.update(counts)
+    return dict(
+        concurrency=concurrency,
+        client_processes=processes,
+        **summarize(all_samples, all_statuses, duration),
+        operations={operation: summarize(samples[operation], statuses[operation], duration)
+                    for operation in OPERATIONS if statuses[operation]},
+        login=summarize(logins, {200: len(logins)}, duration) | {'requests_per_second': None}
+    )
+
+
+def print_stage(stage: dict, baseline_stage=None) -> None:
+    print(f'\n== concorrência {stage["concurrency"]} ({stage["client_processes"]} processos cliente): '
+          f'{stage["requests_per_second"]:.1f} req/s, erros {stage["error_rate"] * 100:.2f}%, '
+          f'login p50 {stage["login"].get("p50_ms", 0):.1f} ms')
+    header = f'{"operação":<15} {"req/s":>9} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"máx ms":>8} {"erros":>7}'
+    print(header + (f' {"req/s vs base":>14} {"p99 vs base":>12}' if baseline_stage else ''))
+    rows = list(stage['operations'].items()) + [('total', stage)]
+    for name, result in rows:
+        line = (f'{name:<15} {result["requests_per_second"]:>9.1f} {result.get("p50_ms", 0):>8.2f} '
+                f'{result.get("p90_ms", 0):>8.2f} {result.get("p99_ms", 0):>8.2f} {result.get("max_ms", 0):>8.2f} '
+                f'{result["error_rate"] * 100:>6.2f}%')
+        base = None
+        if baseline_stage:
+            base = baseline_stage if name == 'total' else baseline_stage['operations'].get(name)
+        if base and base.get('requests_per_second') and base.get('p99_ms'):
+            line += (f' {(result["requests_per_second"] / base["requests_per_second"] - 1) * 100:>+13.1f}%'
+                     f' {(result.get("p99_ms", 0) / base["p99_ms"] - 1) * 100:>+11.1f}%')
+        print(line)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--server', choices=SERVERS, default='prefork')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processos do servidor')
+    parser.add_argument('--threads', type=int, default=8, help='threads por worker (só gunicorn)')
+    parser.add_argument('--concurrency', default='8,32,64', help='conexões simultâneas de cada estágio')
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='processos cliente (as conexões de um estágio são divididas entre eles)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='pesos das operações (operação=peso,...)')
+    parser.add_argument('--duration', type=float, default=20, help='segundos medidos por estágio')
+    parser.add_argument('--warmup', type=float, default=3, help='segundos descartados no início de cada estágio')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=2000, help='tarefas criadas antes da carga')
+    parser.add_argument('--port', type=int, default=0, help='porta do servidor (padrão: uma livre)')
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    parser.add_argument('--baseline', help='JSON de uma rodada anterior para comparar req/s e p99')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--client', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--client-index', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--seed-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        stages = [int(value) for value in args.concurrency.split(',')]
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.serve:
+        serve_prefork(args.port, args.workers)
+        return
+    if args.client:
+        print(json.dumps(run_client(args.port, stages[0], args.client_index, mix, args.seed_file,
+                                    args.warmup, args.duration)))
+        return
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    db_file = None
+    if not args.database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        args.database_url = f'sqlite:///{db_file}'
+    os.environ.update(
+        DATABASE_URL=args.database_url,
+        REPOSITORY_BACKEND='sqlalchemy',
+        SECRET_KEY=os.environ.get('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes'),
+        PASSWORD_HASH_N=os.environ.get('PASSWORD_HASH_N', '1024')
+    )
+    seed_file = tempfile.NamedTemporaryFile(suffix='.json', delete=False, mode='w')
+    with seed_file:
+        json.dump(seed(args.users, args.tasks), seed_file)
+
+    port = args.port or free_port()
+    server = subprocess.Popen(server_command(args.server, port, args.workers, args.threads), cwd=ROOT,
+                              env=os.environ.copy(), stdout=subprocess.DEVNULL)
+    results = {
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'config': {
+            'server': args.server,
+            'workers': args.workers,
+            'threads': args.threads if args.server == 'gunicorn' else None,
+            'database': args.database_url.split(':', 1)[0],
+            'mix': mix,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'users': args.users,
+            'tasks': args.tasks,
+            'cpu_count': os.cpu_count()
+        },
+        'stages': []
+    }
+    print(f'{args.server} com {args.workers} workers, banco {results["config"]["database"]}, '
+          f'mistura {args.mix}, {args.duration:g} s por estágio')
+    try:
+        wait_for_port(port, server)
+        for concurrency in stages:
+            stage = run_stage(port, concurrency, args.processes, mix, seed_file.name, args.warmup, args.duration)
+            results['stages'].append(stage)
+            baseline_stage = next((previous for previous in (baseline or {}).get('stages', [])
+                                   if previous['concurrency'] == concurrency), None)
+            print_stage(stage, baseline_stage)
+    finally:
+        server.terminate()
+        server.wait()
+        os.unlink(seed_file.name)
+        if db_file:
+            os.unlink(db_file)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark de logins por segundo (POST /auth/login) para cada custo do scrypt.
+
+Uso:
+    python benchmarks/password_hashing.py --costs 12,13,14,15 --logins 40 --concurrency 4
+
+Cada custo é o expoente de n (n = 2 ** custo). Roda contra um SQLite temporário.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ.setdefault('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes')
+
+from app import create_app  # noqa: E402
+from infrastructure.database.sqlalchemy_models import db  # noqa: E402
+from infrastructure.database.migrations import upgrade  # noqa: E402
+from infrastructure.security.password_hashers import ScryptPasswordHasher  # noqa: E402
+
+app = create_app()
+user_service = app.extensions['api'].user_service
+
+
+def run_logins(username: str, password: str, logins: int, concurrency: int) -> float:
+    per_thread = [logins // concurrency + (1 if i < logins % concurrency else 0) for i in range(concurrency)]
+    errors = []
+
+    def worker(count):
+        client = app.test_client()
+        for _ in range(count):
+            response = client.post('/auth/login', json={'username': username, 'password': password})
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        print(f'  {len(errors)} logins falharam: {sorted(set(errors))}')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--costs', default='12,13,14,15', help='expoentes de n separados por vírgula')
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    with app.app_context():
+        upgrade(db.engine)
+
+    pool = user_service.password_hasher
+    print(f'pool: {pool.max_workers} threads | {args.logins} logins | concorrência {args.concurrency}')
+    print(f'{"n":>8} {"hash ms":>9} {"logins/s":>9}')
+    for cost in [int(c) for c in args.costs.split(',')]:
+        pool.inner = ScryptPasswordHasher(n=2 ** cost)
+        username = f'bench{cost}'
+        with app.app_context():
+            user_service.create_user({'nome': username, 'username': username, 'password': 'senha123'})
+
+        start = time.perf_counter()
+        pool.inner.hash('senha123')
+        hash_ms = (time.perf_counter() - start) * 1000
+
+        elapsed = run_logins(username, 'senha123', args.logins, args.concurrency)
+        print(f'{2 ** cost:>8} {hash_ms:>9.1f} {args.logins / elapsed:>9.1f}')
+
+    pool.shutdown()
+    os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Teste de carga do pool de conexões: mede a vazão de GET /tasks com várias
+configurações de pool (DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT) e mostra
+os gauges de /metrics/db-pool ao final de cada rodada.
+
+Uso:
+    python benchmarks/pool_load_test.py --configs 1:0,5:0,10:10 --concurrency 16 --requests 50
+    python benchmarks/pool_load_test.py --database-url postgresql://... --configs 5:5,20:10
+
+Cada configuração roda em um processo separado, pois create_app lê a configuração do ambiente.
+Sem --database-url usa um arquivo SQLite temporário.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(concurrency: int, requests_per_thread: int, tasks: int) -> dict:
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    app = create_app()
+    user_service, task_service = app.extensions['api'].user_service, app.extensions['api'].task_service
+    from infrastructure.database.sqlalchemy_models import db, UserORM
+    from infrastructure.database.migrations import upgrade
+
+    with app.app_context():
+        upgrade(db.engine)
+        if not db.session.query(UserORM).filter_by(username='loadtest').first():
+            user = user_service.create_user({'nome': 'Load', 'username': 'loadtest', 'password': 'senha123'})
+            task_service.create_tasks([
+                {'title': f'Tarefa {i}', 'status': 'pending', 'assigned_to_id': user.id} for i in range(tasks)
+            ])
+
+    client = app.test_client()
+    token = client.post('/auth/login', json={'username': 'loadtest', 'password': 'senha123'}).get_json()['token']
+    headers = {'x-access-token': token}
+    errors = []
+
+    def worker():
+        thread_client = app.test_client()
+        for _ in range(requests_per_thread):
+            response = thread_client.get('/tasks?limit=50', headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = concurrency * requests_per_thread
+    return {
+        'requests': total,
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_second': total / elapsed,
+        'pool': client.get('/metrics/db-pool', headers=headers).get_json()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--configs', default='1:0,5:0,10:10', help='lista de pool_size:max_overflow')
+    parser.add_argument('--pool-timeout', default='10')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50, help='requisições por thread')
+    parser.add_argument('--tasks', type=int, default=500, help='tarefas criadas antes da carga')
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_once(args.concurrency, args.requests, args.tasks)))
+        return
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{db_file}'
+
+    print(f'{"size:overflow":>14} {"req/s":>9} {"erros":>6} {"espera média ms":>16} {"espera máx ms":>14} {"timeouts":>9}')
+    for config in args.configs.split(','):
+        pool_size, max_overflow = config.split(':')
+        env = dict(
+            os.environ,
+            DATABASE_URL=database_url,
+            SECRET_KEY=os.environ.get('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes'),
+            DB_POOL_SIZE=pool_size,
+            DB_MAX_OVERFLOW=max_overflow,
+            DB_POOL_TIMEOUT=args.pool_timeout
+        )
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', '--concurrency', str(args.concurrency),
+             '--requests', str(args.requests), '--tasks', str(args.tasks)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        pool = result['pool']
+        print(f'{config:>14} {result["requests_per_second"]:>9.1f} {result["errors"]:>6} '
+              f'{pool.get("wait_seconds_avg", 0) * 1000:>16.2f} {pool.get("wait_seconds_max", 0) * 1000:>14.2f} '
+              f'{pool.get("timeouts", 0):>9}')
+
+    if db_file:
+        os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
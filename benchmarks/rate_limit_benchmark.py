@@ -0,0 +1,114 @@
+"""
+Custo do limite de requisições (infrastructure/web/rate_limit.py).
+
+Mede:
+  - InMemoryRateLimitStore.take sozinho, com 1 e com várias threads disputando o lock;
+  - o acréscimo por requisição em GET /tasks/<id> (repositórios em memória, para que
+    o banco não esconda a diferença), com o limitador desligado, ligado sem rejeitar
+    (limites altos) e rejeitando todas as requisições (429).
+
+Uso:
+    python benchmarks/rate_limit_benchmark.py --requests 5000 --threads 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['REPOSITORY_BACKEND'] = 'memory'
+os.environ['RATE_LIMIT_ENABLED'] = 'true'
+os.environ['RATE_LIMIT_MAX_IN_FLIGHT'] = '64'
+os.environ.setdefault('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes')
+
+from flask.testing import FlaskClient  # noqa: E402
+from app import create_app  # noqa: E402
+from infrastructure.web.rate_limit import InMemoryRateLimitStore, Limit  # noqa: E402
+
+
+class BufferedClient(FlaskClient):
+    # Lê e fecha cada resposta, como um servidor WSGI: só então a vaga de concorrência é liberada
+    def open(self, *args, **kwargs):
+        kwargs.setdefault('buffered', True)
+        return super().open(*args, **kwargs)
+
+
+def time_store(operations: int, threads: int) -> float:
+    store = InMemoryRateLimitStore()
+    limit = Limit(rate=1e9, burst=10 ** 9)
+    per_thread = operations // threads
+
+    def worker(index):
+        key = f'user:{index}'
+        for _ in range(per_thread):
+            store.take(key, limit)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+def time_requests(client, headers: dict, requests: int, expected_status: int) -> float:
+    client.get('/tasks/1', headers=headers)  # aquece o cache de principals
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/tasks/1', headers=headers)
+        if response.status_code != expected_status:
+            raise RuntimeError(f'status inesperado {response.status_code}: {response.get_json()}')
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--operations', type=int, default=400000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    print('InMemoryRateLimitStore.take')
+    for threads in sorted({1, args.threads}):
+        print(f'  {threads:>2} thread(s): {time_store(args.operations, threads):8.0f} ns/chamada')
+
+    app = create_app()
+    api = app.extensions['api']
+    rate_limiter = api.rate_limiter
+    user_service, task_service = api.user_service, api.task_service
+    with app.app_context():
+        user = user_service.create_user({'nome': 'Bench', 'username': 'bench', 'password': 'bench'})
+        task_service.create_task({'title': 'Tarefa', 'status': 'pending', 'assigned_to_id': user.id})
+
+    app.test_client_class = BufferedClient
+    client = app.test_client()
+    token = client.post('/auth/login', json={'username': 'bench', 'password': 'bench'}).get_json()['token']
+    headers = {'x-access-token': token}
+
+    # O limitador criado por create_app recebe o limite de cada cenário; "desligado"
+    # tira o limitador das dependências do app, como RATE_LIMIT_ENABLED=false
+    scenarios = [
+        ('desligado', None, 200),
+        ('ligado, aceitando', Limit(1e9, 10 ** 9), 200),
+        ('ligado, rejeitando (429)', Limit(1e-9, 1), 429),
+    ]
+    print(f'\nGET /tasks/<id> ({args.requests} requisições, repositórios em memória)')
+    baseline = None
+    for name, limit, expected_status in scenarios:
+        api.rate_limiter = rate_limiter if limit else None
+        rate_limiter.default_limit = limit
+        rate_limiter.store = InMemoryRateLimitStore()
+        if expected_status == 429:
+            client.get('/tasks/1', headers=headers)  # gasta a única ficha do balde
+        micros = time_requests(client, headers, args.requests, expected_status)
+        baseline = baseline or micros
+        print(f'  {name:<26} {micros:8.1f} µs/requisição ({micros - baseline:+.1f} µs)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Réplicas de leitura (infrastructure/database/read_replicas.py): mede a vazão de
+GET /tasks só com o primário e com as leituras distribuídas entre réplicas
+('round_robin' e 'least_connections'), mostra quantas sessões cada réplica atendeu e
+confere o read-your-writes: o PATCH responde com a tarefa relida depois da gravação,
+que tem de vir do primário mesmo com as réplicas desatualizadas.
+
+Uso:
+    python benchmarks/read_replica_benchmark.py --replicas 2 --concurrency 8 --requests 100
+    python benchmarks/read_replica_benchmark.py --database-url postgresql://.../primario \\
+        --replica-urls postgresql://.../replica1,postgresql://.../replica2
+
+Sem --database-url usa arquivos SQLite temporários: o primário é populado e copiado
+para cada réplica, e depois disso as réplicas não recebem mais gravações (como uma
+réplica atrasada). Com Postgres a replicação entre os bancos fica por sua conta.
+Cada configuração roda em um processo separado, pois create_app lê a configuração do ambiente.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(concurrency: int, requests_per_thread: int, tasks: int) -> dict:
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    app = create_app()
+    user_service, task_service = app.extensions['api'].user_service, app.extensions['api'].task_service
+    from infrastructure.database.sqlalchemy_models import db, UserORM
+    from infrastructure.database.migrations import upgrade
+
+    with app.app_context():
+        upgrade(db.engine)
+        if not db.session.query(UserORM).filter_by(username='loadtest').first():
+            user = user_service.create_user({'nome': 'Load', 'username': 'loadtest', 'password': 'senha123'})
+            task_service.create_tasks([
+                {'title': f'Tarefa {i}', 'status': 'pending', 'assigned_to_id': user.id} for i in range(tasks)
+            ])
+
+    client = app.test_client()
+    token = client.post('/auth/login', json={'username': 'loadtest', 'password': 'senha123'}).get_json()['token']
+    headers = {'x-access-token': token}
+    errors = []
+
+    def worker():
+        thread_client = app.test_client()
+        for _ in range(requests_per_thread):
+            response = thread_client.get('/tasks?limit=50', headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Gravação e leitura na mesma requisição: o título devolvido é o que acabou de ser gravado
+    title = f'Gravada {time.time_ns()}'
+    patched = client.patch('/tasks/1', headers=headers, json={'title': title}).get_json()
+
+    total = concurrency * requests_per_thread
+    return {
+        'requests': total,
+        'errors': len(errors),
+        'requests_per_second': total / elapsed,
+        'read_your_writes': patched.get('title') == title,
+        'read_replicas': client.get('/metrics/db-pool', headers=headers).get_json().get('read_replicas')
+    }
+
+
+def copy_sqlite(source_url: str, target_url: str) -> None:
+    source = sqlite3.connect(source_url.removeprefix('sqlite:///'))
+    target = sqlite3.connect(target_url.removeprefix('sqlite:///'))
+    source.backup(target)
+    source.close()
+    target.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--replica-urls', help='URLs das réplicas separadas por vírgula (com --database-url)')
+    parser.add_argument('--replicas', type=int, default=2, help='réplicas SQLite criadas sem --database-url')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help='requisições por thread')
+    parser.add_argument('--tasks', type=int, default=500, help='tarefas criadas antes da carga')
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_once(args.concurrency, args.requests, args.tasks)))
+        return
+
+    db_files = []
+    database_url, replica_urls = args.database_url, (args.replica_urls or '').split(',')
+    if not database_url:
+        db_files = [tempfile.NamedTemporaryFile(suffix='.db', delete=False).name for _ in range(args.replicas + 1)]
+        database_url, *replica_urls = [f'sqlite:///{db_file}' for db_file in db_files]
+
+    configs = [('só primário', '', 'round_robin'), ('round_robin', ','.join(replica_urls), 'round_robin'),
+               ('least_connections', ','.join(replica_urls), 'least_connections')]
+    print(f'{"configuração":>18} {"req/s":>9} {"erros":>6} {"read-your-writes":>17}  sessões por réplica')
+    for name, urls, balancing in configs:
+        env = dict(
+            os.environ,
+            DATABASE_URL=database_url,
+            DATABASE_REPLICA_URLS=urls,
+            DATABASE_REPLICA_BALANCING=balancing,
+            SECRET_KEY=os.environ.get('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes')
+        )
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', '--concurrency', str(args.concurrency),
+             '--requests', str(args.requests), '--tasks', str(args.tasks)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        picks = [replica['picks'] for replica in (result['read_replicas'] or {}).get('replicas', [])]
+        print(f'{name:>18} {result["requests_per_second"]:>9.1f} {result["errors"]:>6} '
+              f'{"ok" if result["read_your_writes"] else "FALHOU":>17}  {picks or "-"}')
+        if db_files and not urls:
+            # A primeira rodada criou e populou o primário; as réplicas partem de uma cópia dele
+            for replica_url in replica_urls:
+                copy_sqlite(database_url, replica_url)
+
+    for db_file in db_files:
+        os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Mede tempo e memória de pico para montar uma resposta de listagem de tarefas
+(ex.: 10 mil linhas) por caminhos diferentes:
+
+  - ORM:    TaskORM + joinedload → Task → to_dict
+  - tuplas: SELECT de colunas → Task(*row) → to_dict (caminho atual do repositório)
+  - tuplas com uma entidade com __dict__ (como a Task antes dos __slots__)
+
+cada um serializado pelo DefaultJSONProvider (módulo json) e pelo OrjsonProvider.
+
+Uso:
+    python benchmarks/serialization_benchmark.py --rows 10000 --repetitions 10
+    python benchmarks/serialization_benchmark.py --database-url postgresql://.../bench_db
+
+Atenção: com --database-url as tabelas users/tasks/schema_migrations do banco são recriadas.
+Sem --database-url usa um arquivo SQLite temporário.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import sqlalchemy as sa
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import joinedload
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.domain.entities import Task  # noqa: E402
+from core.domain.task_query import TaskQuery  # noqa: E402
+from infrastructure.database.migrations import upgrade  # noqa: E402
+from infrastructure.database.sqlalchemy_models import db, TaskORM  # noqa: E402
+from infrastructure.database.sqlalchemy_repository_adapters import _task_rows_statement  # noqa: E402
+from infrastructure.web.json_provider import OrjsonProvider, orjson  # noqa: E402
+
+
+class DictTask:
+    """Cópia da Task com __dict__ por instância, para comparar com a versão com __slots__."""
+
+    def __init__(self, id=None, title=None, description=None, status='pending', assigned_to_id=None,
+                 assignee_name=None, version=None, updated_at=None):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.status = status
+        self.assigned_to_id = assigned_to_id
+        self.assignee_name = assignee_name
+        self.version = version
+        self.updated_at = updated_at
+
+    to_dict = Task.to_dict
+
+
+def load_orm(limit):
+    query = TaskORM.query.options(joinedload(TaskORM.assignee)).order_by(TaskORM.id).limit(limit)
+    tasks = [task_orm.to_domain_entity() for task_orm in query.all()]
+    db.session.expunge_all()
+    return tasks
+
+
+def load_rows(limit, entity=Task):
+    statement = _task_rows_statement(TaskQuery(), limit)
+    return [entity(*row) for row in db.session.execute(statement)]
+
+
+def seed(engine, rows: int):
+    metadata = sa.MetaData()
+    users_table = sa.Table('users', metadata, autoload_with=engine)
+    tasks_table = sa.Table('tasks', metadata, autoload_with=engine)
+    with engine.begin() as connection:
+        connection.execute(users_table.insert(), [
+            {'id': i, 'nome': f'Usuário {i}', 'username': f'user{i}', 'password': 'x'} for i in range(1, 51)
+        ])
+        connection.execute(tasks_table.insert(), [
+            {'title': f'Tarefa {i}', 'description': f'Descrição da tarefa {i}', 'status': 'pending',
+             'assigned_to_id': i % 50 + 1} for i in range(rows)
+        ])
+
+
+def entities_kb(loader, rows: int) -> float:
+    # Memória ocupada pela lista de entidades carregada (sem os dicionários e o JSON)
+    tracemalloc.start()
+    tasks = loader(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return current / 1024
+
+
+def measure(build_response, repetitions: int):
+    build_response()  # aquecimento
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        build_response()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    build_response()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repetitions', type=int, default=10)
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{db_file}'
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(app)
+
+    providers = [('json', DefaultJSONProvider(app))]
+    if orjson:
+        providers.append(('orjson', OrjsonProvider(app)))
+    loaders = [
+        ('ORM', load_orm),
+        ('tuplas + __dict__', lambda limit: load_rows(limit, DictTask)),
+        ('tuplas + __slots__', load_rows),
+    ]
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for table in ('schema_migrations', 'tasks', 'users'):
+                connection.execute(sa.text(f'DROP TABLE IF EXISTS {table}'))
+        upgrade(db.engine)
+        print(f'Populando {args.rows} tarefas...')
+        seed(db.engine, args.rows)
+
+        print(f'\n{"caminho":<20} {"json":<7} {"ms/resposta":>12} {"pico KB":>10} {"entidades KB":>13} {"linhas/s":>11}')
+        for loader_name, loader in loaders:
+            loaded_kb = entities_kb(loader, args.rows)
+            for provider_name, provider in providers:
+                def build_response():
+                    return provider.response([task.to_dict() for task in loader(args.rows)])
+
+                ms, peak_kb = measure(build_response, args.repetitions)
+                print(f'{loader_name:<20} {provider_name:<7} {ms:>12.2f} {peak_kb:>10.0f} {loaded_kb:>13.0f} {args.rows / ms * 1000:>11.0f}')
+
+        db.session.remove()
+        db.engine.dispose()
+
+    if db_file:
+        os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark reprodutível da API pelo test client do Flask, com os repositórios em
+SQLite e em memória (REPOSITORY_BACKEND=sqlalchemy|memory). Para cada endpoint
+mostra p50/p99 e vazão sequencial; a diferença entre os backends é o custo do
+banco, e o que sobra no backend em memória é o custo de serviços, rotas e JSON.
+
+Uso:
+    python benchmarks/service_benchmark.py --requests 500 --tasks 2000
+    python benchmarks/service_benchmark.py --output resultados.json
+    python benchmarks/service_benchmark.py --baseline resultados.json   # compara p50 com uma rodada anterior
+
+Cada backend roda em um processo separado, pois create_app lê a configuração do ambiente.
+O SQLite usa um arquivo temporário; o custo do scrypt é reduzido (PASSWORD_HASH_N)
+para que o login não domine a rodada.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BACKENDS = ('sqlalchemy', 'memory')
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples, elapsed: float) -> dict:
+    return {
+        'requests': len(samples),
+        'p50_ms': percentile(samples, 0.50) * 1000,
+        'p99_ms': percentile(samples, 0.99) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'requests_per_second': len(samples) / elapsed
+    }
+
+
+def run_once(requests: int, tasks: int, users: int) -> dict:
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    app = create_app()
+    user_service, task_service = app.extensions['api'].user_service, app.extensions['api'].task_service
+    from infrastructure.database.sqlalchemy_models import db
+    from infrastructure.database.migrations import upgrade
+
+    random.seed(42)
+    with app.app_context():
+        if app.config['REPOSITORY_BACKEND'] == 'sqlalchemy':
+            upgrade(db.engine)
+        user_ids = [
+            user_service.create_user({'nome': f'Usuário {i}', 'username': f'user{i}', 'password': 'senha123'}).id
+            for i in range(users)
+        ]
+        task_ids = [task.id for task in task_service.create_tasks([
+            {'title': f'Tarefa {i}', 'status': random.choice(['pending', 'done']),
+             'assigned_to_id': random.choice(user_ids)} for i in range(tasks)
+        ])]
+
+    client = app.test_client()
+    token = client.post('/auth/login', json={'username': 'user0', 'password': 'senha123'}).get_json()['token']
+    headers = {'x-access-token': token}
+    created_ids = []
+
+    def create_task(i):
+        response = client.post('/tasks', headers=headers, json={
+            'title': f'Nova {i}', 'status': 'pending', 'assigned_to_id': random.choice(user_ids)})
+        created_ids.append(response.get_json()['id'])
+        return response
+
+    # (nome, número de requisições, função que faz a i-ésima requisição)
+    scenarios = [
+        ('POST /auth/login', max(1, requests // 10),
+         lambda i: client.post('/auth/login', json={'username': 'user0', 'password': 'senha123'})),
+        ('GET /tasks?limit=50', requests, lambda i: client.get('/tasks?limit=50', headers=headers)),
+        ('GET /tasks?assignedTo', requests,
+         lambda i: client.get(f'/tasks?assignedTo=user{random.randrange(users)}&limit=50', headers=headers)),
+        ('GET /tasks/<id>', requests, lambda i: client.get(f'/tasks/{random.choice(task_ids)}', headers=headers)),
+        ('GET /users?limit=50', requests, lambda i: client.get('/users?limit=50', headers=headers)),
+        ('POST /tasks', requests, create_task),
+        ('PUT /tasks/<id>', requests,
+         lambda i: client.put(f'/tasks/{random.choice(task_ids)}', headers=headers, json={'status': 'done'})),
+        ('PATCH /tasks/<id>', requests,
+         lambda i: client.patch(f'/tasks/{random.choice(task_ids)}', headers=headers,
+                                json={'status': 'pending', 'assigned_to_id': random.choice(user_ids)})),
+        ('DELETE /tasks/<id>', requests, lambda i: client.delete(f'/tasks/{created_ids[i]}', headers=headers)),
+    ]
+
+    results = {}
+    for name, count, request in scenarios:
+        samples = []
+        start = time.perf_counter()
+        for i in range(count):
+            request_start = time.perf_counter()
+            response = request(i)
+            samples.append(time.perf_counter() - request_start)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{name}: resposta {response.status_code} {response.get_data(as_text=True)}')
+        results[name] = summarize(samples, time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--requests', type=int, default=500, help='requisições por endpoint')
+    parser.add_argument('--tasks', type=int, default=2000, help='tarefas criadas antes da rodada')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    parser.add_argument('--baseline', help='JSON de uma rodada anterior para comparar o p50')
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_once(args.requests, args.tasks, args.users)))
+        return
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    all_results = {}
+    for backend in args.backends.split(','):
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        env = dict(
+            os.environ,
+            REPOSITORY_BACKEND=backend,
+            DATABASE_URL=f'sqlite:///{db_file}',
+            SECRET_KEY=os.environ.get('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes'),
+            PASSWORD_HASH_N=os.environ.get('PASSWORD_HASH_N', '1024')
+        )
+        try:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run', '--requests', str(args.requests),
+                 '--tasks', str(args.tasks), '--users', str(args.users)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+        finally:
+            os.unlink(db_file)
+        results = json.loads(output.strip().splitlines()[-1])
+        all_results[backend] = results
+
+        print(f'\n== {backend}')
+        header = f'{"endpoint":<24} {"p50 ms":>8} {"p99 ms":>8} {"req/s":>9}'
+        print(header + (f' {"p50 vs base":>12}' if baseline else ''))
+        for name, result in results.items():
+            line = f'{name:<24} {result["p50_ms"]:>8.3f} {result["p99_ms"]:>8.3f} {result["requests_per_second"]:>9.1f}'
+            base = (baseline or {}).get(backend, {}).get(name)
+            if base:
+                line += f' {(result["p50_ms"] / base["p50_ms"] - 1) * 100:>+11.1f}%'
+            print(line)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(all_results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
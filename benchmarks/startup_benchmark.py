@@ -0,0 +1,181 @@
+"""
+Partida a frio e memória por worker com um servidor preforking (como o gunicorn):
+o master cria N workers com fork, e cada um responde à primeira requisição
+(GET /tasks autenticado). Compara:
+
+  - por worker:      o master não importa o app; cada worker importa app.py e chama
+                     create_app() (gunicorn "app:create_app()");
+  - preload:         o master importa e chama create_app() antes do fork, e os
+                     workers herdam o app já montado (gunicorn --preload);
+  - preload+freeze:  como preload, com gc.freeze() antes do fork, para que a coleta
+                     de lixo dos workers não escreva nos objetos herdados do master
+                     (o que desfaz o compartilhamento copy-on-write das páginas).
+
+Para cada cenário mostra o tempo de import e de create_app, o da primeira resposta,
+o tempo do fork até o último worker estar pronto e a memória de cada worker lida de
+/proc/<pid>/smaps_rollup: RSS, PSS (páginas compartilhadas divididas entre os
+processos que as usam) e USS (páginas só do worker, o que cada worker a mais custa).
+O PSS total soma o master e os workers.
+
+Uso:
+    python benchmarks/startup_benchmark.py --workers 4
+    python benchmarks/startup_benchmark.py --backends memory --workers 8
+
+Só Linux (fork e /proc). Cada cenário roda em um processo novo, para que o import seja
+mesmo a frio; com o backend sqlalchemy o banco SQLite temporário é criado antes por
+"flask --app app init-db".
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ('por worker', 'preload', 'preload+freeze')
+
+
+def memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            name, _, value = line.partition(':')
+            if value.strip().endswith('kB'):
+                fields[name] = int(value.split()[0])
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)}
+
+
+def build_app(timings: dict):
+    start = time.perf_counter()
+    from app import create_app, seed
+    timings['import_ms'] = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    app = create_app()
+    timings['create_app_ms'] = (time.perf_counter() - start) * 1000
+    if app.config['REPOSITORY_BACKEND'] == 'memory':
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed(app) # Os dados em memória são de cada processo; fora da medição
+    return app
+
+
+def first_response(app, timings: dict) -> None:
+    import datetime
+    import jwt
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)
+    token = jwt.encode({'user_id': 1, 'exp': expires}, app.config['SECRET_KEY'], algorithm='HS256')
+    start = time.perf_counter()
+    response = app.test_client().get('/tasks', headers={'x-access-token': token})
+    timings['first_response_ms'] = (time.perf_counter() - start) * 1000
+    timings['status'] = response.status_code
+
+
+def worker(app, forked_at: float, report, release) -> None:
+    timings = {}
+    if app is None:
+        app = build_app(timings)
+    first_response(app, timings)
+    timings['ready_ms'] = (time.perf_counter() - forked_at) * 1000
+    os.write(report, (json.dumps(timings) + '\n').encode())
+    os.read(release, 1) # Fica vivo até o master ler a memória
+    os._exit(0)
+
+
+def run_once(mode: str, workers: int) -> dict:
+    sys.path.insert(0, ROOT)
+    master = {}
+    app = None
+    if mode != 'por worker':
+        app = build_app(master)
+        if mode == 'preload+freeze':
+            gc.freeze()
+
+    report_read, report_write = os.pipe()
+    release_read, release_write = os.pipe()
+    forked_at = time.perf_counter()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(report_read)
+            os.close(release_write)
+            worker(app, forked_at, report_write, release_read)
+        pids.append(pid)
+    os.close(report_write)
+    os.close(release_read)
+
+    with os.fdopen(report_read) as reports:
+        results = [json.loads(reports.readline()) for _ in range(workers)]
+    memory = [memory_kb(pid) for pid in pids]
+    master_memory = memory_kb(os.getpid())
+    os.write(release_write, b'x' * workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    def mean(key, rows):
+        values = [row[key] for row in rows if key in row]
+        return statistics.fmean(values) if values else None
+
+    builders = [master] if app is not None else results
+    return {
+        'import_ms': mean('import_ms', builders),
+        'create_app_ms': mean('create_app_ms', builders),
+        'first_response_ms': mean('first_response_ms', results),
+        'ready_ms': max(row['ready_ms'] for row in results),
+        'statuses': sorted({row['status'] for row in results}),
+        'worker_rss_mb': mean('rss', memory) / 1024,
+        'worker_pss_mb': mean('pss', memory) / 1024,
+        'worker_uss_mb': mean('uss', memory) / 1024,
+        'total_pss_mb': (master_memory['pss'] + sum(row['pss'] for row in memory)) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--backends', default='memory,sqlalchemy', help='REPOSITORY_BACKENDs separados por vírgula')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_once(args.mode, args.workers)))
+        return
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    base_env = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{db_file}',
+        SECRET_KEY=os.environ.get('SECRET_KEY', 'chave-de-benchmark-com-pelo-menos-32-bytes'),
+        PASSWORD_HASH_N='1024' # Só o seed cria senhas; o custo do hash não é o que se mede aqui
+    )
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'],
+                   cwd=ROOT, env=base_env, capture_output=True, check=True)
+
+    print(f'{args.workers} workers; tempos em ms, memória em MB (média por worker; PSS total com o master)')
+    print(f'{"backend":<11} {"cenário":<15} {"import":>7} {"create":>7} {"1ª resp":>8} {"pronto":>7} '
+          f'{"RSS":>6} {"PSS":>6} {"USS":>6} {"PSS total":>10}')
+    for backend in args.backends.split(','):
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--mode', mode, '--workers', str(args.workers)],
+                env=dict(base_env, REPOSITORY_BACKEND=backend), capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            if result['statuses'] != [200]:
+                print(f'  respostas inesperadas: {result["statuses"]}')
+            print(f'{backend:<11} {mode:<15} {result["import_ms"]:>7.1f} {result["create_app_ms"]:>7.1f} '
+                  f'{result["first_response_ms"]:>8.1f} {result["ready_ms"]:>7.1f} {result["worker_rss_mb"]:>6.1f} '
+                  f'{result["worker_pss_mb"]:>6.1f} {result["worker_uss_mb"]:>6.1f} {result["total_pss_mb"]:>10.1f}')
+
+    os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Compara planos de consulta e tempos dos filtros de tarefas antes e depois da
+migração 2 (índices (assigned_to_id, status) e (assigned_to_id, id)).
+
+Uso:
+    python benchmarks/task_index_benchmark.py --tasks 200000 --users 500
+    python benchmarks/task_index_benchmark.py --database-url postgresql://.../bench_db
+
+Atenção: com --database-url as tabelas users/tasks/schema_migrations do banco são recriadas.
+Sem --database-url usa um arquivo SQLite temporário.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import sqlalchemy as sa
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from infrastructure.database.migrations import upgrade  # noqa: E402
+
+STATUSES = ['pending', 'in_progress', 'done', 'blocked']
+
+QUERIES = [
+    ('assignedTo + status',
+     'SELECT id, title, status FROM tasks WHERE assigned_to_id = :user_id AND status = :status ORDER BY id'),
+    ('assignedTo paginado',
+     'SELECT id, title, status FROM tasks WHERE assigned_to_id = :user_id AND id > :after_id ORDER BY id LIMIT 50'),
+]
+
+
+def seed(engine, users: int, tasks: int):
+    metadata = sa.MetaData()
+    users_table = sa.Table('users', metadata, autoload_with=engine)
+    tasks_table = sa.Table('tasks', metadata, autoload_with=engine)
+    with engine.begin() as connection:
+        connection.execute(users_table.insert(), [
+            {'id': i, 'nome': f'Usuário {i}', 'username': f'user{i}', 'password': 'x'} for i in range(1, users + 1)
+        ])
+        batch = []
+        for i in range(tasks):
+            batch.append({'title': f'Tarefa {i}', 'status': random.choice(STATUSES),
+                          'assigned_to_id': random.randint(1, users)})
+            if len(batch) == 10000:
+                connection.execute(tasks_table.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(tasks_table.insert(), batch)
+
+
+def explain(connection, sql: str, params: dict) -> str:
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = connection.execute(sa.text(prefix + sql), params).fetchall()
+    return '\n'.join('    ' + ' '.join(str(column) for column in row) for row in rows)
+
+
+def measure(engine, users: int, repetitions: int):
+    results = {}
+    with engine.connect() as connection:
+        for name, sql in QUERIES:
+            params_list = [{'user_id': random.randint(1, users), 'status': random.choice(STATUSES), 'after_id': 0}
+                           for _ in range(repetitions)]
+            plan = explain(connection, sql, params_list[0])
+            start = time.perf_counter()
+            for params in params_list:
+                connection.execute(sa.text(sql), params).fetchall()
+            results[name] = (plan, (time.perf_counter() - start) / repetitions * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--repetitions', type=int, default=200)
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{db_file}'
+
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        for table in ('schema_migrations', 'tasks', 'users'):
+            connection.execute(sa.text(f'DROP TABLE IF EXISTS {table}'))
+
+    random.seed(42)
+    upgrade(engine, target=1)
+    print(f'Populando {args.tasks} tarefas para {args.users} usuários...')
+    seed(engine, args.users, args.tasks)
+    with engine.begin() as connection:
+        connection.execute(sa.text('ANALYZE'))
+    before = measure(engine, args.users, args.repetitions)
+
+    upgrade(engine)
+    with engine.begin() as connection:
+        connection.execute(sa.text('ANALYZE'))
+    after = measure(engine, args.users, args.repetitions)
+
+    for name, _ in QUERIES:
+        print(f'\n== {name}')
+        print(f'  antes  ({before[name][1]:.3f} ms/consulta):\n{before[name][0]}')
+        print(f'  depois ({after[name][1]:.3f} ms/consulta):\n{after[name][0]}')
+        print(f'  ganho: {before[name][1] / after[name][1]:.1f}x')
+
+    engine.dispose()
+    if db_file:
+        os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
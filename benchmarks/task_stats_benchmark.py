@@ -0,0 +1,126 @@
+"""
+Compara GET /tasks/stats calculado com GROUP BY sobre tasks e lido da tabela
+materializada task_counters (migração 5), para tabelas de tamanhos crescentes, e o
+custo extra que os contadores acrescentam a cada inserção de tarefa.
+
+Uso:
+    python benchmarks/task_stats_benchmark.py --tasks 10000,100000,1000000 --users 500
+    python benchmarks/task_stats_benchmark.py --database-url postgresql://.../bench_db
+
+Atenção: com --database-url as tabelas users/tasks/task_counters/schema_migrations do
+banco são recriadas. Sem --database-url usa um arquivo SQLite temporário.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+import sqlalchemy as sa
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from infrastructure.database.migrations import upgrade  # noqa: E402
+from infrastructure.database.sqlalchemy_models import TaskORM  # noqa: E402
+from infrastructure.database.sqlalchemy_repository_adapters import (  # noqa: E402
+    _task_counter_statement, _task_counter_stats_statement, _task_rebuild_counter_statements, _task_stats_statement,
+)
+
+STATUSES = ['pending', 'in_progress', 'done', 'blocked']
+TABLES = ('schema_migrations', 'task_counters', 'tasks', 'users')
+
+
+def reset(engine, users: int):
+    with engine.begin() as connection:
+        for table in TABLES:
+            connection.execute(sa.text(f'DROP TABLE IF EXISTS {table}'))
+    upgrade(engine)
+    users_table = sa.Table('users', sa.MetaData(), autoload_with=engine)
+    with engine.begin() as connection:
+        connection.execute(users_table.insert(), [
+            {'id': i, 'nome': f'Usuário {i}', 'username': f'user{i}', 'password': 'x'} for i in range(1, users + 1)
+        ])
+
+
+def grow(engine, users: int, count: int):
+    # Insere direto em tasks e recalcula os contadores no fim, como a migração 5 faz
+    now = datetime.datetime.utcnow()
+    with engine.begin() as connection:
+        for start in range(0, count, 10000):
+            connection.execute(sa.insert(TaskORM.__table__), [
+                {'title': f'Tarefa {i}', 'status': random.choice(STATUSES), 'assigned_to_id': random.randint(1, users),
+                 'version': 1, 'updated_at': now}
+                for i in range(start, min(start + 10000, count))
+            ])
+        for statement in _task_rebuild_counter_statements():
+            connection.execute(statement)
+        connection.execute(sa.text('ANALYZE'))
+
+
+def time_read(engine, statement, repetitions: int) -> float:
+    with engine.connect() as connection:
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            connection.execute(statement).all()
+        return (time.perf_counter() - start) / repetitions * 1000
+
+
+def time_inserts(engine, users: int, repetitions: int, counters: bool) -> float:
+    # Uma transação por tarefa, como em SQLAlchemyTaskRepository.save
+    tasks_table = TaskORM.__table__
+    start = time.perf_counter()
+    for i in range(repetitions):
+        assigned_to_id, status = random.randint(1, users), random.choice(STATUSES)
+        with engine.begin() as connection:
+            connection.execute(sa.insert(tasks_table).values(
+                title=f'Nova {i}', status=status, assigned_to_id=assigned_to_id, version=1,
+                updated_at=datetime.datetime.utcnow()
+            ))
+            if counters:
+                connection.execute(_task_counter_statement(engine.dialect.name, added=[(assigned_to_id, status)]))
+    return (time.perf_counter() - start) / repetitions * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--tasks', default='10000,100000,500000',
+                        help='tamanhos da tabela tasks, separados por vírgula')
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--repetitions', type=int, default=20)
+    parser.add_argument('--inserts', type=int, default=500)
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{db_file}'
+
+    engine = sa.create_engine(database_url)
+    random.seed(42)
+    reset(engine, args.users)
+
+    print(f"{'tarefas':>10} {'GROUP BY ms':>12} {'contadores ms':>14} {'ganho':>8}")
+    current = 0
+    for size in sorted(int(value) for value in args.tasks.split(',')):
+        grow(engine, args.users, size - current)
+        current = size
+        group_by = time_read(engine, _task_stats_statement(), args.repetitions)
+        counters = time_read(engine, _task_counter_stats_statement(), args.repetitions)
+        print(f'{size:>10} {group_by:>12.3f} {counters:>14.3f} {group_by / counters:>7.1f}x')
+
+    plain = time_inserts(engine, args.users, args.inserts, counters=False)
+    counted = time_inserts(engine, args.users, args.inserts, counters=True)
+    print(f'\nInserção de uma tarefa: {plain:.3f} ms sem contadores, {counted:.3f} ms com '
+          f'(+{(counted / plain - 1) * 100:.0f}%)')
+
+    engine.dispose()
+    if db_file:
+        os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    main()
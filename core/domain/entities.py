@@ -1,32 +1,75 @@
 class User:
-    def __init__(self, id: int = None, nome: str = None, username: str = None, password: str = None):
+    # __slots__ dispensa o __dict__ por instância: entidades menores e mais rápidas
+    # de criar, o que pesa nas listagens grandes.
+    __slots__ = ('id', 'nome', 'username', 'password', 'version', 'updated_at')
+    FIELDS = ('id', 'nome', 'username')
+
+    def __init__(self, id: int = None, nome: str = None, username: str = None, password: str = None,
+                 version: int = None, updated_at=None):
         self.id = id
         self.nome = nome
         self.username = username
         self.password = password 
+        # Mantidos pelo repositório: version cresce a cada gravação (concorrência otimista e ETags)
+        self.version = version
+        self.updated_at = updated_at
 
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        data = {
             'id': self.id,
             'nome': self.nome,
             'username': self.username
         }
+        if fields is not None:
+            return {key: data[key] for key in fields}
+        return data
 
 class Task:
-    def __init__(self, id: int = None, title: str = None, description: str = None, status: str = 'pending', assigned_to_id: int = None):
+    __slots__ = ('id', 'title', 'description', 'status', 'assigned_to_id', 'assignee_name', 'version', 'updated_at')
+    FIELDS = ('id', 'title', 'description', 'status', 'assigned_to_id', 'assigned_to_name')
+
+    def __init__(self, id: int = None, title: str = None, description: str = None, status: str = 'pending', assigned_to_id: int = None,
+                 assignee_name: str = None, version: int = None, updated_at=None):
         self.id = id
         self.title = title
         self.description = description
         self.status = status
         self.assigned_to_id = assigned_to_id
-        self.assignee_name = None 
+        self.assignee_name = assignee_name
+        self.version = version
+        self.updated_at = updated_at
 
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        data = {
             'id': self.id,
             'title': self.title,
             'description': self.description,
             'status': self.status,
             'assigned_to_id': self.assigned_to_id,
             'assigned_to_name': self.assignee_name 
-        }
\ No newline at end of file
+        }
+        if fields is not None:
+            return {key: data[key] for key in fields}
+        return data
+
+class TaskChange:
+    # Última mudança de uma tarefa no feed de GET /tasks/changes. task é o estado atual
+    # da tarefa, ou None se ela foi removida.
+    __slots__ = ('seq', 'task_id', 'task')
+
+    def __init__(self, seq: int, task_id: int, task: Task = None):
+        self.seq = seq
+        self.task_id = task_id
+        self.task = task
+
+    @property
+    def deleted(self) -> bool:
+        return self.task is None
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'task_id': self.task_id,
+            'op': 'deleted' if self.deleted else 'upserted',
+            'task': None if self.deleted else self.task.to_dict()
+        }
@@ -16,4 +16,16 @@ class TaskNotFoundException(DomainError):
 
 class InvalidCredentialsException(DomainError):
     """Raised when authentication credentials are invalid."""
-    pass
\ No newline at end of file
+    pass
+
+class PasswordHasherBusyException(DomainError):
+    """Raised when the password hashing pool is saturated."""
+    pass
+
+class ConcurrentModificationException(DomainError):
+    """Raised when an entity was modified by someone else since it was read."""
+    pass
+
+class ChangesExpiredException(DomainError):
+    """Raised when a change feed cursor is older than the retained changelog."""
+    pass
@@ -0,0 +1,43 @@
+class TaskQuery:
+    """
+    Critérios de uma listagem de tarefas: filtros, busca textual, ordenação e a
+    posição (keyset) a partir da qual a página continua.
+
+    `sort` é uma sequência de (campo, decrescente); o id é sempre acrescentado como
+    desempate, para que a ordem seja total. `after` traz os valores de sort_keys da
+    última tarefa da página anterior (na ordenação padrão, só o id).
+    """
+    __slots__ = ('assigned_to_id', 'statuses', 'min_id', 'max_id', 'search_terms', 'sort', 'after')
+    SORT_FIELDS = ('id', 'title', 'status', 'assigned_to_id', 'updated_at')
+    DEFAULT_SORT = (('id', False),)
+
+    def __init__(self, assigned_to_id: int = None, statuses=(), min_id: int = None, max_id: int = None,
+                 search_terms=(), sort=DEFAULT_SORT, after: tuple = None):
+        self.assigned_to_id = assigned_to_id
+        self.statuses = tuple(statuses)
+        self.min_id = min_id
+        self.max_id = max_id
+        # Cada termo precisa aparecer no título ou na descrição
+        self.search_terms = tuple(search_terms)
+        self.sort = tuple(sort)
+        self.after = after
+
+    @property
+    def sort_keys(self) -> tuple:
+        if any(field == 'id' for field, _ in self.sort):
+            return self.sort
+        return self.sort + (('id', False),)
+
+    @property
+    def is_default_sort(self) -> bool:
+        return self.sort_keys == self.DEFAULT_SORT
+
+    def keyset(self, task) -> tuple:
+        """
+        Valores de sort_keys de uma tarefa: o `after` da página seguinte.
+        """
+        return tuple(getattr(task, field) for field, _ in self.sort_keys)
+
+    def after_keyset(self, after: tuple) -> 'TaskQuery':
+        return TaskQuery(self.assigned_to_id, self.statuses, self.min_id, self.max_id,
+                         self.search_terms, self.sort, after)
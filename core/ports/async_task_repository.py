@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional, List, Sequence, Tuple
+from core.domain.entities import Task, TaskChange
+from core.domain.task_query import TaskQuery
+
+
+class AsyncTaskRepository(ABC):
+    """
+    Variante assíncrona de TaskRepository, com a mesma semântica em cada método.
+    """
+
+    @abstractmethod
+    async def save(self, task: Task) -> Task:
+        pass
+
+    @abstractmethod
+    async def patch(self, task_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def find_by_id(self, task_id: int) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def find_by_ids(self, task_ids: List[int]) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                       fields: Optional[Sequence[str]] = None) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                      fields: Optional[Sequence[str]] = None) -> List[Task]:
+        pass
+
+    @abstractmethod
+    def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> AsyncIterator[Task]:
+        """
+        Gerador assíncrono das tarefas que atendem a `query`, lidas em lotes de `batch_size`.
+        """
+        pass
+
+    @abstractmethod
+    async def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        pass
+
+    @abstractmethod
+    async def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        pass
+
+    @abstractmethod
+    async def delete_by_id(self, task_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    async def save_many(self, tasks: List[Task]) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def delete_many(self, task_ids: List[int]) -> List[int]:
+        pass
+
+    @abstractmethod
+    async def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        pass
+
+    @abstractmethod
+    async def last_change_seq(self) -> int:
+        pass
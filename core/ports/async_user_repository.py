@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List, Sequence
+from core.domain.entities import User
+
+
+class AsyncUserRepository(ABC):
+    """
+    Variante assíncrona de UserRepository, com a mesma semântica em cada método.
+    """
+
+    @abstractmethod
+    async def save(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    async def patch(self, user_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def find_by_id(self, user_id: int) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def find_by_ids(self, user_ids: List[int]) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def find_by_username(self, username: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                       fields: Optional[Sequence[str]] = None) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        pass
+
+    @abstractmethod
+    async def delete_by_id(self, user_id: int) -> bool:
+        pass
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+
+
+class ChangeNotifier(ABC):
+    """
+    Avisa quem espera no feed de mudanças de tarefas (long-poll / SSE) que uma nova
+    mudança foi confirmada, para que a espera não precise consultar o banco.
+    """
+
+    @abstractmethod
+    def notify(self, seq: int) -> None:
+        """
+        Registra que as mudanças até a sequência `seq` foram confirmadas e acorda quem
+        espera por elas. Chamado pelos repositórios depois do commit.
+        """
+        pass
+
+    @abstractmethod
+    def wait(self, since: int, timeout: float) -> bool:
+        """
+        Espera até `timeout` segundos por uma mudança posterior a `since`.
+        Retorna True se ela foi avisada (ou já tinha sido), False no fim do prazo.
+        """
+        pass
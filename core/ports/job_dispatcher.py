@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
+
+
+class JobDispatcher(ABC):
+    """
+    Despacha para fora da requisição os efeitos colaterais lentos de uma gravação
+    (notificações, auditoria...). Os serviços publicam eventos depois que o
+    repositório confirmou a gravação; cada evento vira um trabalho por handler
+    inscrito nele, executado em segundo plano com novas tentativas em caso de falha.
+    """
+
+    @abstractmethod
+    def enqueue(self, event: str, payload: dict) -> None:
+        """
+        Agenda os trabalhos inscritos em `event`. O payload precisa ser serializável em JSON.
+        Não espera a execução nem lança exceção por falha dos handlers.
+        """
+        pass
+
+    @abstractmethod
+    def enqueue_many(self, events: Sequence[Tuple[str, dict]]) -> None:
+        """
+        Agenda de uma vez os trabalhos de vários eventos (evento, payload), como em uma gravação em lote.
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Retorna contadores da fila (pendentes, concluídos, falhas...).
+        """
+        pass
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+
+
+class PasswordHasher(ABC):
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        """
+        Gera o hash da senha, já codificado com o algoritmo, os parâmetros de custo e o salt.
+        """
+        pass
+
+    @abstractmethod
+    def verify(self, password: str, hashed: str) -> bool:
+        """
+        Verifica se a senha corresponde ao hash armazenado.
+        """
+        pass
+
+    @abstractmethod
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Indica se o hash foi gerado com parâmetros diferentes dos atuais (ou não é um
+        hash reconhecido) e deve ser refeito no próximo login bem-sucedido.
+        """
+        pass
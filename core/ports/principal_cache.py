@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from core.domain.entities import User
+
+
+class PrincipalCache(ABC):
+    """
+    Cache dos usuários autenticados (principals) já verificados a partir de um token,
+    para que cada requisição autenticada não precise decodificar o token e ir ao banco.
+    """
+
+    @abstractmethod
+    def get(self, token: str) -> Optional[User]:
+        """
+        Retorna o usuário associado ao token se ainda estiver em cache e válido, None caso contrário.
+        """
+        pass
+
+    @abstractmethod
+    def put(self, token: str, user: User, expires_at: float) -> None:
+        """
+        Guarda o usuário verificado para o token. A entrada nunca vive além de `expires_at`
+        (timestamp Unix, normalmente o `exp` do token).
+        """
+        pass
+
+    @abstractmethod
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Remove todas as entradas do usuário (ex.: após alteração ou remoção).
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Retorna contadores de uso do cache (hits, misses, tamanho...).
+        """
+        pass
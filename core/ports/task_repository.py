@@ -1,13 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
-from core.domain.entities import Task 
+from typing import Dict, Optional, List, Sequence, Iterator, Tuple
+from core.domain.entities import Task, TaskChange
+from core.domain.task_query import TaskQuery
 
 class TaskRepository(ABC):
     @abstractmethod
     def save(self, task: Task) -> Task:
         """
         Salva uma nova tarefa ou atualiza uma existente no repositório.
-        Retorna a entidade Task salva/atualizada.
+        Na atualização, se task.version não for a versão atual da tarefa, lança
+        ConcurrentModificationException (outra gravação chegou antes).
+        Retorna a entidade Task salva/atualizada, com version e updated_at novos.
+        """
+        pass
+
+    @abstractmethod
+    def patch(self, task_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[Task]:
+        """
+        Atualiza só as colunas em `changes` (title, description, status, assigned_to_id)
+        com um único comando, incrementando version e renovando updated_at.
+        Com expected_version, só grava se a tarefa ainda estiver nessa versão; caso
+        contrário lança ConcurrentModificationException.
+        Lança ValueError se assigned_to_id não for de um usuário existente.
+        Retorna a Task atualizada (com assignee_name), ou None se a tarefa não existe.
         """
         pass
 
@@ -20,17 +35,107 @@ class TaskRepository(ABC):
         pass
 
     @abstractmethod
-    def find_all(self, assigned_to_id: Optional[int] = None) -> List[Task]:
+    def find_by_ids(self, task_ids: List[int]) -> List[Task]:
+        """
+        Busca várias tarefas pelos IDs em uma única consulta, com assignee_name preenchido.
+        IDs inexistentes são ignorados; a ordem do resultado não é garantida.
+        """
+        pass
+
+    @abstractmethod
+    def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[Task]:
+        """
+        Lista as tarefas que atendem aos filtros e à busca de `query` (todas, se None),
+        na ordem de query.sort_keys. A filtragem e a ordenação são feitas pelo banco.
+        A paginação é por cursor (keyset): retorna no máximo `limit` tarefas posteriores
+        a query.after nessa ordem.
+        `fields` restringe as colunas lidas (nomes de Task.FIELDS); o id e os campos
+        de ordenação são sempre lidos.
+        Retorna uma lista de entidades Task.
+        """
+        pass
+
+    @abstractmethod
+    def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                fields: Optional[Sequence[str]] = None) -> List[Task]:
         """
-        Lista todas as tarefas, opcionalmente filtrando por ID do usuário atribuído.
+        Lista as tarefas já com o nome do usuário atribuído (assignee_name) preenchido,
+        resolvendo os responsáveis em uma única consulta em vez de uma por tarefa.
+        Aceita os mesmos filtros, paginação e projeção de find_all.
         Retorna uma lista de entidades Task.
         """
         pass
 
+    @abstractmethod
+    def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> Iterator[Task]:
+        """
+        Percorre todas as tarefas que atendem a `query` (com assignee_name preenchido),
+        na ordem de query.sort_keys, lendo do banco em lotes de `batch_size` para
+        manter a memória constante.
+        Retorna um gerador de entidades Task.
+        """
+        pass
+
+    @abstractmethod
+    def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        """
+        Resumo barato (sem montar as entidades) das tarefas que find_all_with_assignees
+        devolveria com os mesmos filtros e paginação: muda sempre que uma delas, ou o
+        nome do seu responsável, é alterada, criada ou removida. Usado para ETags.
+        """
+        pass
+
+    @abstractmethod
+    def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        """
+        Conta as tarefas agrupadas por (assigned_to_id, status), sem montar as entidades.
+        Pares sem tarefas não aparecem no resultado.
+        Retorna um dicionário {(assigned_to_id, status): quantidade}.
+        """
+        pass
+
     @abstractmethod
     def delete_by_id(self, task_id: int) -> bool:
         """
         Remove uma tarefa pelo seu ID.
         Retorna True se a tarefa foi removida, False caso contrário.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def save_many(self, tasks: List[Task]) -> List[Task]:
+        """
+        Insere (id None) ou atualiza várias tarefas em uma única transação.
+        As atualizações conferem a version como em save; um conflito desfaz o lote inteiro.
+        Retorna as entidades Task salvas na mesma ordem da entrada.
+        """
+        pass
+
+    @abstractmethod
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        """
+        Remove várias tarefas em uma única transação.
+        Retorna os IDs efetivamente removidos.
+        """
+        pass
+
+    @abstractmethod
+    def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        """
+        Feed de mudanças: a última mudança de cada tarefa criada, alterada ou removida
+        depois da sequência `since`, em ordem crescente de seq, com o estado atual da
+        tarefa (None se removida). Também conta como mudança da tarefa a troca do nome
+        ou a remoção do seu responsável. Retorna no máximo `limit` mudanças.
+        Lança ChangesExpiredException se mudanças posteriores a `since` já foram
+        descartadas do histórico.
+        """
+        pass
+
+    @abstractmethod
+    def last_change_seq(self) -> int:
+        """
+        Sequência da mudança mais recente (0 se ainda não houve nenhuma): o cursor a
+        partir do qual um cliente que acabou de ler a listagem completa acompanha o feed.
+        """
+        pass
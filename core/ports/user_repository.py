@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from core.domain.entities import User
 
 class UserRepository(ABC):
@@ -7,16 +7,47 @@ class UserRepository(ABC):
     def save(self, user: User) -> User:
         pass
 
+    @abstractmethod
+    def patch(self, user_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[User]:
+        """
+        Atualiza só as colunas em `changes` (nome, username, password) com um único
+        comando, incrementando version e renovando updated_at.
+        Com expected_version, lança ConcurrentModificationException se o usuário
+        não estiver mais nessa versão. Lança ValueError se o username já for de outro usuário.
+        Retorna o User atualizado, ou None se o usuário não existe.
+        """
+        pass
+
     @abstractmethod
     def find_by_id(self, user_id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    def find_by_ids(self, user_ids: List[int]) -> List[User]:
+        """
+        Busca vários usuários pelos IDs em uma única consulta; IDs inexistentes são ignorados.
+        """
+        pass
+
     @abstractmethod
     def find_by_username(self, username: str) -> Optional[User]:
         pass
 
     @abstractmethod
-    def find_all(self) -> List[User]:
+    def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[User]:
+        """
+        Lista usuários em ordem crescente de id, paginando por cursor (id > after_id).
+        `fields` restringe as colunas lidas (nomes de User.FIELDS); o id é sempre lido.
+        """
+        pass
+
+    @abstractmethod
+    def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        """
+        Resumo barato dos usuários que find_all devolveria com a mesma paginação:
+        muda sempre que um deles é alterado, criado ou removido. Usado para ETags.
+        """
         pass
 
     @abstractmethod
@@ -0,0 +1,153 @@
+"""
+Ponte entre os serviços síncronos (UserServiceImpl, TaskServiceImpl) e os adaptadores
+assíncronos, para que o modo ASGI reutilize a mesma lógica de negócio sem duplicá-la.
+
+Os serviços são executados com run_service() (greenlet_spawn do SQLAlchemy). Dentro
+dele, os adaptadores abaixo implementam as portas síncronas chamando await_only() nas
+corrotinas da porta assíncrona: a greenlet do serviço é suspensa e o event loop fica
+livre para atender outras requisições enquanto o banco responde. É o mesmo mecanismo
+que o AsyncSession usa para rodar a Session síncrona sobre drivers asyncio.
+"""
+import asyncio
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.util import await_only, greenlet_spawn
+from core.domain.entities import User as DomainUser, Task as DomainTask, TaskChange
+from core.domain.task_query import TaskQuery
+from core.ports.user_repository import UserRepository
+from core.ports.task_repository import TaskRepository
+from core.ports.async_user_repository import AsyncUserRepository
+from core.ports.async_task_repository import AsyncTaskRepository
+from core.ports.password_hasher import PasswordHasher
+from core.ports.change_notifier import ChangeNotifier
+from infrastructure.notifications.change_notifier import InProcessChangeNotifier
+from infrastructure.security.password_hashers import PooledPasswordHasher
+
+
+async def run_service(fn, *args, **kwargs):
+    """
+    Executa um método de serviço síncrono sem bloquear o event loop.
+    """
+    return await greenlet_spawn(fn, *args, **kwargs)
+
+
+class AwaitingUserRepository(UserRepository):
+    def __init__(self, inner: AsyncUserRepository):
+        self.inner = inner
+
+    def save(self, user: DomainUser) -> DomainUser:
+        return await_only(self.inner.save(user))
+
+    def patch(self, user_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainUser]:
+        return await_only(self.inner.patch(user_id, changes, expected_version))
+
+    def find_by_id(self, user_id: int) -> Optional[DomainUser]:
+        return await_only(self.inner.find_by_id(user_id))
+
+    def find_by_ids(self, user_ids: List[int]) -> List[DomainUser]:
+        return await_only(self.inner.find_by_ids(user_ids))
+
+    def find_by_username(self, username: str) -> Optional[DomainUser]:
+        return await_only(self.inner.find_by_username(username))
+
+    def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainUser]:
+        return await_only(self.inner.find_all(limit=limit, after_id=after_id, fields=fields))
+
+    def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        return await_only(self.inner.fingerprint(limit=limit, after_id=after_id))
+
+    def delete_by_id(self, user_id: int) -> bool:
+        return await_only(self.inner.delete_by_id(user_id))
+
+
+class AwaitingTaskRepository(TaskRepository):
+    def __init__(self, inner: AsyncTaskRepository):
+        self.inner = inner
+
+    def save(self, task: DomainTask) -> DomainTask:
+        return await_only(self.inner.save(task))
+
+    def patch(self, task_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainTask]:
+        return await_only(self.inner.patch(task_id, changes, expected_version))
+
+    def find_by_id(self, task_id: int) -> Optional[DomainTask]:
+        return await_only(self.inner.find_by_id(task_id))
+
+    def find_by_ids(self, task_ids: List[int]) -> List[DomainTask]:
+        return await_only(self.inner.find_by_ids(task_ids))
+
+    def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return await_only(self.inner.find_all(query=query, limit=limit, fields=fields))
+
+    def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return await_only(self.inner.find_all_with_assignees(query=query, limit=limit, fields=fields))
+
+    def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> Iterator[DomainTask]:
+        # Deve ser consumido inteiro dentro do mesmo run_service()
+        iterator = self.inner.iter_all(query=query, batch_size=batch_size).__aiter__()
+        while True:
+            try:
+                yield await_only(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+
+    def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        return await_only(self.inner.fingerprint(query=query, limit=limit))
+
+    def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        return await_only(self.inner.count_by_assignee_and_status())
+
+    def delete_by_id(self, task_id: int) -> bool:
+        return await_only(self.inner.delete_by_id(task_id))
+
+    def save_many(self, tasks: List[DomainTask]) -> List[DomainTask]:
+        return await_only(self.inner.save_many(tasks))
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        return await_only(self.inner.delete_many(task_ids))
+
+    def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        return await_only(self.inner.find_changes(since, limit))
+
+    def last_change_seq(self) -> int:
+        return await_only(self.inner.last_change_seq())
+
+
+class AwaitingPasswordHasher(PasswordHasher):
+    """
+    Usa o pool de um PooledPasswordHasher sem bloquear o event loop: espera o Future
+    com await_only e, se o pool estiver lotado, falha na hora em vez de aguardar vaga.
+    """
+
+    def __init__(self, pooled: PooledPasswordHasher):
+        self.pooled = pooled
+
+    def _await(self, fn, *args):
+        return await_only(asyncio.wrap_future(self.pooled.submit(fn, *args, acquire_timeout=0)))
+
+    def hash(self, password: str) -> str:
+        return self._await(self.pooled.inner.hash, password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._await(self.pooled.inner.verify, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self.pooled.needs_rehash(hashed)
+
+
+class AwaitingChangeNotifier(ChangeNotifier):
+    """
+    Espera do feed de mudanças (long-poll / SSE) dentro de run_service: suspende a
+    greenlet do serviço com await_only em vez de bloquear o event loop na Condition.
+    """
+
+    def __init__(self, inner: InProcessChangeNotifier):
+        self.inner = inner
+
+    def notify(self, seq: int) -> None:
+        self.inner.notify(seq)
+
+    def wait(self, since: int, timeout: float) -> bool:
+        return await_only(self.inner.wait_async(since, timeout))
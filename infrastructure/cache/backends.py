@@ -0,0 +1,97 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Interface de armazenamento usada pelos repositórios com cache.
+    Um backend compartilhado entre processos (ex.: Redis) só precisa implementá-la.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retorna o valor guardado na chave, ou None se ausente/expirado.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Guarda o valor na chave; `ttl` em segundos (None usa o padrão do backend).
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """
+        Remove as chaves informadas (chaves ausentes são ignoradas).
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Retorna contadores de uso do backend.
+        """
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Backend LRU com TTL na memória do processo. Cada worker tem o seu próprio cache,
+    então leituras podem ficar desatualizadas entre workers por até `ttl` segundos.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
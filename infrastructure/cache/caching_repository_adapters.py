@@ -0,0 +1,201 @@
+import copy
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from core.domain.entities import User as DomainUser, Task as DomainTask, TaskChange
+from core.domain.task_query import TaskQuery
+from core.ports.user_repository import UserRepository
+from core.ports.task_repository import TaskRepository
+from infrastructure.cache.backends import CacheBackend
+
+# As entidades de domínio são mutáveis (os serviços alteram o que recebem do
+# repositório), então o cache sempre guarda e devolve cópias.
+
+
+class CachingTaskRepository(TaskRepository):
+    """
+    Decorador read-through de qualquer TaskRepository: find_by_id é servido do cache
+    e toda escrita invalida as chaves afetadas. Listagens não são cacheadas.
+    """
+
+    def __init__(self, inner: TaskRepository, backend: CacheBackend, prefix: str = 'task'):
+        self.inner = inner
+        self.backend = backend
+        self.prefix = prefix
+
+    def _generation(self) -> str:
+        # Geração aleatória no lugar de um contador: se a chave for despejada,
+        # uma nova geração nunca coincide com entradas antigas.
+        generation_key = f'{self.prefix}:generation'
+        generation = self.backend.get(generation_key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            self.backend.set(generation_key, generation)
+        return generation
+
+    def _key(self, task_id: int) -> str:
+        return f'{self.prefix}:{self._generation()}:id:{task_id}'
+
+    def invalidate_all(self) -> None:
+        """
+        Descarta todas as tarefas em cache (ex.: quando um usuário muda de nome ou é removido).
+        """
+        self.backend.delete(f'{self.prefix}:generation')
+
+    def save(self, task: DomainTask) -> DomainTask:
+        saved_task = self.inner.save(task)
+        self.backend.delete(self._key(saved_task.id))
+        return saved_task
+
+    def patch(self, task_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainTask]:
+        try:
+            return self.inner.patch(task_id, changes, expected_version)
+        finally:
+            # Mesmo num conflito: a entrada em cache pode ser justamente a versão velha
+            self.backend.delete(self._key(task_id))
+
+    def find_by_id(self, task_id: int) -> Optional[DomainTask]:
+        key = self._key(task_id)
+        cached = self.backend.get(key)
+        if cached is not None:
+            return copy.copy(cached)
+        task = self.inner.find_by_id(task_id)
+        if task is not None:
+            self.backend.set(key, copy.copy(task))
+        return task
+
+    def find_by_ids(self, task_ids: List[int]) -> List[DomainTask]:
+        return self.inner.find_by_ids(task_ids)
+
+    def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return self.inner.find_all(query=query, limit=limit, fields=fields)
+
+    def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return self.inner.find_all_with_assignees(query=query, limit=limit, fields=fields)
+
+    def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> Iterator[DomainTask]:
+        return self.inner.iter_all(query=query, batch_size=batch_size)
+
+    def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        # Nunca cacheado: é justamente o que diz se a listagem mudou
+        return self.inner.fingerprint(query=query, limit=limit)
+
+    def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        # Muda a cada gravação de tarefa; o custo já é baixo no repositório
+        return self.inner.count_by_assignee_and_status()
+
+    def delete_by_id(self, task_id: int) -> bool:
+        deleted = self.inner.delete_by_id(task_id)
+        self.backend.delete(self._key(task_id))
+        return deleted
+
+    def save_many(self, tasks: List[DomainTask]) -> List[DomainTask]:
+        saved_tasks = self.inner.save_many(tasks)
+        self.backend.delete(*[self._key(task.id) for task in saved_tasks])
+        return saved_tasks
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        deleted_ids = self.inner.delete_many(task_ids)
+        self.backend.delete(*[self._key(task_id) for task_id in task_ids])
+        return deleted_ids
+
+    def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        # Nunca cacheado, como fingerprint: é o que diz o que mudou
+        return self.inner.find_changes(since, limit)
+
+    def last_change_seq(self) -> int:
+        return self.inner.last_change_seq()
+
+
+class CachingUserRepository(UserRepository):
+    """
+    Decorador read-through de qualquer UserRepository para find_by_id, find_by_ids e
+    find_by_username, com invalidação em save/delete_by_id.
+    Como as tarefas em cache carregam o nome do responsável (e são removidas em
+    cascata com ele), escritas de usuário também invalidam o `task_cache`, se houver.
+    """
+
+    def __init__(self, inner: UserRepository, backend: CacheBackend, prefix: str = 'user',
+                 task_cache: Optional[CachingTaskRepository] = None):
+        self.inner = inner
+        self.backend = backend
+        self.prefix = prefix
+        self.task_cache = task_cache
+
+    def _id_key(self, user_id: int) -> str:
+        return f'{self.prefix}:id:{user_id}'
+
+    def _username_key(self, username: str) -> str:
+        return f'{self.prefix}:username:{username}'
+
+    def _remember(self, user: DomainUser) -> None:
+        self.backend.set(self._id_key(user.id), copy.copy(user))
+        # O username aponta só para o id; a leitura confere se o username ainda bate,
+        # assim renomear um usuário não deixa a chave antiga servindo dados velhos.
+        self.backend.set(self._username_key(user.username), user.id)
+
+    def _invalidate(self, user_id: int) -> None:
+        self.backend.delete(self._id_key(user_id))
+        if self.task_cache:
+            self.task_cache.invalidate_all()
+
+    def save(self, user: DomainUser) -> DomainUser:
+        is_new = user.id is None
+        saved_user = self.inner.save(user)
+        if not is_new:
+            self._invalidate(saved_user.id)
+        return saved_user
+
+    def patch(self, user_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainUser]:
+        try:
+            return self.inner.patch(user_id, changes, expected_version)
+        finally:
+            self._invalidate(user_id)
+
+    def find_by_id(self, user_id: int) -> Optional[DomainUser]:
+        cached = self.backend.get(self._id_key(user_id))
+        if cached is not None:
+            return copy.copy(cached)
+        user = self.inner.find_by_id(user_id)
+        if user is not None:
+            self._remember(user)
+        return user
+
+    def find_by_ids(self, user_ids: List[int]) -> List[DomainUser]:
+        users = []
+        missing_ids = []
+        for user_id in user_ids:
+            cached = self.backend.get(self._id_key(user_id))
+            if cached is not None:
+                users.append(copy.copy(cached))
+            else:
+                missing_ids.append(user_id)
+        if missing_ids:
+            for user in self.inner.find_by_ids(missing_ids):
+                self._remember(user)
+                users.append(user)
+        return users
+
+    def find_by_username(self, username: str) -> Optional[DomainUser]:
+        user_id = self.backend.get(self._username_key(username))
+        if user_id is not None:
+            cached = self.backend.get(self._id_key(user_id))
+            if cached is not None and cached.username == username:
+                return copy.copy(cached)
+        user = self.inner.find_by_username(username)
+        if user is not None:
+            self._remember(user)
+        return user
+
+    def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainUser]:
+        return self.inner.find_all(limit=limit, after_id=after_id, fields=fields)
+
+    def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        return self.inner.fingerprint(limit=limit, after_id=after_id)
+
+    def delete_by_id(self, user_id: int) -> bool:
+        deleted = self.inner.delete_by_id(user_id)
+        self._invalidate(user_id)
+        return deleted
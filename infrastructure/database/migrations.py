@@ -0,0 +1,175 @@
+"""
+Migrações versionadas do schema. Cada migração é uma função registrada com
+@migration(versão, descrição) que recebe uma Connection já dentro de uma transação;
+upgrade() aplica, em ordem, as que ainda não constam na tabela schema_migrations.
+
+As migrações descrevem o schema com tabelas próprias (e não com os modelos ORM),
+para que continuem reproduzindo o mesmo passo mesmo depois que os modelos evoluírem.
+"""
+import datetime
+from typing import Callable, List, NamedTuple
+import sqlalchemy as sa
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sa.engine.Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append(Migration(version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+
+schema_migrations = sa.Table(
+    'schema_migrations', sa.MetaData(),
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('description', sa.String(255), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False),
+)
+
+
+def applied_versions(connection: sa.engine.Connection) -> set:
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.execute(sa.select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine: sa.engine.Engine, target: int = None) -> List[Migration]:
+    """
+    Aplica as migrações pendentes (até `target`, se informado), cada uma na sua transação.
+    Retorna as migrações aplicadas.
+    """
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+
+    applied = []
+    for pending in MIGRATIONS:
+        if pending.version in done or (target is not None and pending.version > target):
+            continue
+        with engine.begin() as connection:
+            pending.apply(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=pending.version,
+                description=pending.description,
+                applied_at=datetime.datetime.utcnow()
+            ))
+        applied.append(pending)
+    return applied
+
+
+@migration(1, 'cria as tabelas users e tasks')
+def _create_users_and_tasks(connection):
+    # checkfirst: bancos criados antes pelo db.create_all() já têm estas tabelas
+    metadata = sa.MetaData()
+    sa.Table(
+        'users', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('nome', sa.String(80), nullable=False),
+        sa.Column('username', sa.String(80), unique=True, nullable=False),
+        sa.Column('password', sa.String(120), nullable=False),
+    )
+    sa.Table(
+        'tasks', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('title', sa.String(120), nullable=False),
+        sa.Column('description', sa.String(255), nullable=True),
+        sa.Column('status', sa.String(50), nullable=False),
+        sa.Column('assigned_to_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    )
+    metadata.create_all(connection, checkfirst=True)
+
+
+@migration(2, 'índices compostos de tasks para os filtros por responsável e status')
+def _add_task_filter_indexes(connection):
+    tasks = sa.Table('tasks', sa.MetaData(), autoload_with=connection)
+    # (assigned_to_id, status): GET /tasks?assignedTo=&status=
+    # (assigned_to_id, id): listagem paginada por responsável (WHERE assigned_to_id = ? AND id > ? ORDER BY id)
+    sa.Index('ix_tasks_assigned_to_id_status', tasks.c.assigned_to_id, tasks.c.status).create(connection, checkfirst=True)
+    sa.Index('ix_tasks_assigned_to_id_id', tasks.c.assigned_to_id, tasks.c.id).create(connection, checkfirst=True)
+
+
+@migration(3, 'colunas version e updated_at em users e tasks')
+def _add_version_columns(connection):
+    existing = sa.inspect(connection)
+    for table in ('users', 'tasks'):
+        columns = {column['name'] for column in existing.get_columns(table)}
+        # NOT NULL exige um default constante no ALTER TABLE (SQLite); as linhas
+        # existentes recebem em seguida o horário da migração.
+        if 'version' not in columns:
+            connection.execute(sa.text(f'ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+        if 'updated_at' not in columns:
+            connection.execute(sa.text(
+                f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'"
+            ))
+            connection.execute(sa.text(f'UPDATE {table} SET updated_at = :now'), {'now': datetime.datetime.utcnow()})
+
+
+@migration(4, 'índice GIN de busca textual em tasks (só PostgreSQL)')
+def _add_task_search_index(connection):
+    # A expressão precisa ser idêntica à gerada por task_search no repositório; nos
+    # demais bancos a busca é feita com LIKE e não há índice equivalente.
+    if connection.dialect.name != 'postgresql':
+        return
+    connection.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN "
+        "(to_tsvector('portuguese', title || ' ' || coalesce(description, '')))"
+    ))
+
+
+@migration(5, 'tabela task_counters com as contagens de tarefas por responsável e status')
+def _create_task_counters(connection):
+    metadata = sa.MetaData()
+    task_counters = sa.Table(
+        'task_counters', metadata,
+        sa.Column('assigned_to_id', sa.Integer, primary_key=True),
+        sa.Column('status', sa.String(50), primary_key=True),
+        sa.Column('count', sa.Integer, nullable=False),
+    )
+    metadata.create_all(connection, checkfirst=True)
+    tasks = sa.Table('tasks', sa.MetaData(), autoload_with=connection)
+    # Preenche a partir das tarefas existentes (a mesma consulta de rebuild_counters)
+    connection.execute(task_counters.delete())
+    connection.execute(task_counters.insert().from_select(
+        ['assigned_to_id', 'status', 'count'],
+        sa.select(tasks.c.assigned_to_id, tasks.c.status, sa.func.count())
+        .group_by(tasks.c.assigned_to_id, tasks.c.status)
+    ))
+
+
+@migration(6, 'tabela jobs da fila de trabalhos em segundo plano')
+def _create_jobs(connection):
+    metadata = sa.MetaData()
+    jobs = sa.Table(
+        'jobs', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String(80), nullable=False),
+        sa.Column('event', sa.String(80), nullable=False),
+        sa.Column('payload', sa.Text, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer, nullable=False),
+        sa.Column('run_at', sa.DateTime, nullable=False),
+        sa.Column('locked_at', sa.DateTime, nullable=True),
+        sa.Column('last_error', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+    )
+    sa.Index('ix_jobs_status_run_at', jobs.c.status, jobs.c.run_at)
+    metadata.create_all(connection, checkfirst=True)
+
+
+@migration(7, 'tabela task_changes do feed de mudanças de tarefas')
+def _create_task_changes(connection):
+    metadata = sa.MetaData()
+    sa.Table(
+        'task_changes', metadata,
+        sa.Column('seq', sa.Integer, primary_key=True),
+        sa.Column('task_id', sa.Integer, nullable=False),
+        sa.Column('changed_at', sa.DateTime, nullable=False),
+    )
+    metadata.create_all(connection, checkfirst=True)
@@ -0,0 +1,83 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mede quanto tempo cada checkout leva para obter uma conexão
+    (espera por conexão livre + pre-ping + eventual abertura de conexão nova)
+    e quantos checkouts estouraram o pool_timeout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def wait_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.total_wait,
+                'wait_seconds_avg': self.total_wait / self.checkouts if self.checkouts else 0.0,
+                'wait_seconds_max': self.max_wait
+            }
+
+
+def build_engine_options(database_uri: str, pool_size: int, max_overflow: int, pool_timeout: float,
+                         pool_recycle: int, pool_pre_ping: bool) -> dict:
+    """
+    Monta o SQLALCHEMY_ENGINE_OPTIONS. O SQLite em memória usa um StaticPool de
+    conexão única, então o dimensionamento do pool só é aplicado aos demais bancos.
+    """
+    options = {'pool_pre_ping': pool_pre_ping, 'pool_recycle': pool_recycle}
+    if database_uri and not (database_uri in ('sqlite://', 'sqlite:///') or ':memory:' in database_uri):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout
+        )
+    return options
+
+
+def pool_status(engine) -> dict:
+    """
+    Retorna os gauges do pool do engine: conexões em uso, ociosas, overflow e espera.
+    """
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # overflow() começa em -pool_size; só o que passou do tamanho fixo interessa
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout()
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.wait_stats())
+    return status
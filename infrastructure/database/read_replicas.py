@@ -0,0 +1,139 @@
+"""
+Roteamento das leituras dos repositórios para réplicas do banco.
+
+RoutingSession é a classe de db.session. Sem um ReadReplicaRouter em
+app.extensions['read_replicas'] ela se comporta como a sessão do Flask-SQLAlchemy:
+tudo vai para o primário (DATABASE_URL). Com réplicas configuradas, os SELECTs feitos
+dentro de um método marcado com @replica_read vão para uma réplica, escolhida pelo
+balanceador na primeira leitura da sessão e mantida até o fim dela (a sessão é por
+requisição), para que as leituras de uma requisição vejam o mesmo estado.
+
+Gravações (flush, INSERT/UPDATE/DELETE) vão sempre para o primário e fixam nele a
+sessão: qualquer leitura posterior na mesma requisição lê o que acabou de ser gravado.
+Entre requisições não há essa garantia; uma leitura logo depois da gravação de outra
+requisição pode encontrar a réplica atrasada.
+"""
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+from typing import List
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from infrastructure.database.pool_metrics import pool_status
+
+BALANCING = ('round_robin', 'least_connections')
+
+# Chaves em Session.info, que sobrevive a close() e dura o mesmo que a sessão
+_REPLICA = 'read_replica'
+_PRIMARY_ONLY = 'read_replica_primary_only'
+_READ_DEPTH = 'read_replica_depth'
+_REPLICA_USED = 'read_replica_used'
+
+
+class ReadReplicaRouter:
+    """
+    Réplicas de leitura e o balanceamento entre elas: 'round_robin' alterna entre as
+    réplicas; 'least_connections' escolhe a que tem menos conexões em uso neste
+    processo (empates seguem a ordem do round-robin).
+    """
+
+    def __init__(self, engines: List[Engine], balancing: str = 'round_robin'):
+        if not engines:
+            raise ValueError("Informe ao menos uma réplica de leitura.")
+        if balancing not in BALANCING:
+            raise ValueError(f"Balanceamento de réplicas inválido: {balancing!r} (use {' ou '.join(BALANCING)}).")
+        self.engines = engines
+        self.balancing = balancing
+        self._lock = threading.Lock()
+        self._next = 0
+        self._in_use = [0] * len(engines)
+        self._picks = [0] * len(engines)
+        for index, engine in enumerate(engines):
+            event.listen(engine, 'checkout', functools.partial(self._checked_out, index, 1))
+            event.listen(engine, 'checkin', functools.partial(self._checked_out, index, -1))
+
+    def _checked_out(self, index: int, delta: int, *args) -> None:
+        with self._lock:
+            self._in_use[index] += delta
+
+    def choose(self) -> int:
+        """
+        Retorna o índice da réplica que deve atender a próxima sessão.
+        """
+        with self._lock:
+            order = [(self._next + offset) % len(self.engines) for offset in range(len(self.engines))]
+            index = order[0]
+            if self.balancing == 'least_connections':
+                index = min(order, key=lambda candidate: self._in_use[candidate])
+            self._next = (index + 1) % len(self.engines)
+            self._picks[index] += 1
+            return index
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'balancing': self.balancing,
+                'replicas': [
+                    dict(pool_status(engine), url=engine.url.render_as_string(hide_password=True), in_use=in_use, picks=picks)
+                    for engine, in_use, picks in zip(self.engines, self._in_use, self._picks)
+                ]
+            }
+
+
+class RoutingSession(Session):
+    """
+    Sessão do Flask-SQLAlchemy que manda para uma réplica os SELECTs das leituras
+    marcadas com @replica_read, enquanto a sessão não tiver gravado nada.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or getattr(clause, 'is_dml', False):
+                self.info[_PRIMARY_ONLY] = True
+            elif self.info.get(_READ_DEPTH) and not self.info.get(_PRIMARY_ONLY):
+                router = current_app.extensions.get('read_replicas')
+                if router is not None:
+                    if _REPLICA not in self.info:
+                        self.info[_REPLICA] = router.choose()
+                    self.info[_REPLICA_USED] = True
+                    return router.engines[self.info[_REPLICA]]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    @contextmanager
+    def reading(self):
+        depth = self.info.get(_READ_DEPTH, 0)
+        self.info[_READ_DEPTH] = depth + 1
+        try:
+            yield
+        finally:
+            self.info[_READ_DEPTH] = depth
+            if depth == 0 and self.info.pop(_REPLICA_USED, False) and not (self.new or self.dirty or self.deleted):
+                # Devolve a conexão da réplica ao pool e descarta os objetos lidos dela,
+                # para que um save seguinte recarregue do primário (e compare a versão atual)
+                self.close()
+
+
+def replica_read(method):
+    """
+    Marca um método de repositório como somente leitura, elegível para as réplicas.
+    Em geradores (ex.: iter_all) a marcação vale até o fim da iteração.
+    """
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator_wrapper(*args, **kwargs):
+            with _current_session().reading():
+                yield from method(*args, **kwargs)
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with _current_session().reading():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def _current_session() -> RoutingSession:
+    return current_app.extensions['sqlalchemy'].session()
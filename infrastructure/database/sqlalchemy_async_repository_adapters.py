@@ -0,0 +1,351 @@
+import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from core.domain.entities import User as DomainUser, Task as DomainTask, TaskChange
+from core.domain.exceptions import ConcurrentModificationException
+from core.domain.task_query import TaskQuery
+from core.ports.async_user_repository import AsyncUserRepository
+from core.ports.async_task_repository import AsyncTaskRepository
+from core.ports.change_notifier import ChangeNotifier
+from infrastructure.database.sqlalchemy_models import UserORM, TaskORM, TaskCounterORM
+from infrastructure.database.sqlalchemy_repository_adapters import (
+    COUNTED_COLUMNS, COUNTED_PATCH_ATTEMPTS, _assignee_task_changes_insert, _changelog_lock_statement,
+    _check_changes_cursor, _check_version, _concurrent_modification, _prepare_save_many, _save_many_counted_pairs,
+    _saved_tasks, _task_change_from_row, _task_changes_bounds_statement, _task_changes_insert,
+    _task_changes_statement, _task_counted_columns_statement, _task_counted_rows_statement,
+    _task_counter_stats_statement, _task_counter_statement, _task_export_statement, _task_fingerprint_statement,
+    _task_from_row, _task_patch_miss, _task_patch_miss_statement, _task_patch_statement,
+    _task_projection_statement, _task_rebuild_counter_statements, _task_rows_statement, _task_stats_statement,
+    _user_fingerprint_statement, _user_patch_statement, _user_projection_statement, _user_rows_statement,
+    _notify_change, _username_taken, _version_conflict,
+)
+
+# Os adaptadores recebem uma fábrica que devolve a AsyncSession da requisição atual
+# (ex.: um async_scoped_session). A sessão precisa de expire_on_commit=False, pois
+# depois do commit os atributos não podem ser recarregados implicitamente.
+
+
+def _task_without_assignee(task_orm: TaskORM) -> DomainTask:
+    # Não toca em task_orm.assignee: em modo assíncrono não há lazy-load implícito.
+    # O serviço preenche assignee_name quando precisa dele.
+    return DomainTask(
+        id=task_orm.id,
+        title=task_orm.title,
+        description=task_orm.description,
+        status=task_orm.status,
+        assigned_to_id=task_orm.assigned_to_id,
+        version=task_orm.version,
+        updated_at=task_orm.updated_at
+    )
+
+
+async def _record_changes(session: AsyncSession, statement) -> Optional[int]:
+    # Mesmo protocolo de sqlalchemy_repository_adapters._record_changes
+    lock = _changelog_lock_statement(session.get_bind().dialect.name)
+    if lock is not None:
+        await session.execute(lock)
+    return max((await session.execute(statement)).scalars(), default=None)
+
+
+class AsyncSQLAlchemyUserRepository(AsyncUserRepository):
+    def __init__(self, session_factory: Callable[[], AsyncSession], task_counters: bool = False,
+                 change_notifier: Optional[ChangeNotifier] = None):
+        self.session_factory = session_factory
+        self.task_counters = task_counters
+        self.change_notifier = change_notifier
+
+    async def save(self, user: DomainUser) -> DomainUser:
+        session = self.session_factory()
+        renamed = False
+        seq = None
+        if user.id is None:
+            user_orm = UserORM.from_domain_entity(user)
+            session.add(user_orm)
+        else:
+            user_orm = await session.get(UserORM, user.id)
+            if not user_orm:
+                raise ValueError("Usuário não encontrado para atualização.")
+            _check_version(user, user_orm)
+            renamed = user_orm.nome != user.nome
+            user_orm.nome = user.nome
+            user_orm.username = user.username
+            user_orm.password = user.password
+        try:
+            await session.flush()
+            if renamed:
+                seq = await _record_changes(session, _assignee_task_changes_insert(user_orm.id, datetime.datetime.utcnow()))
+            await session.commit()
+        except StaleDataError:
+            await session.rollback()
+            raise _concurrent_modification()
+        _notify_change(self.change_notifier, seq)
+        return user_orm.to_domain_entity()
+
+    async def patch(self, user_id: int, changes: dict,
+                    expected_version: Optional[int] = None) -> Optional[DomainUser]:
+        session = self.session_factory()
+        try:
+            row = (await session.execute(_user_patch_statement(user_id, changes, expected_version))).first()
+        except IntegrityError:
+            await session.rollback()
+            raise _username_taken()
+        seq = None
+        if row is not None and 'nome' in changes:
+            seq = await _record_changes(session, _assignee_task_changes_insert(user_id, datetime.datetime.utcnow()))
+        await session.commit()
+        if row is not None:
+            _notify_change(self.change_notifier, seq)
+            return DomainUser(*row)
+        if expected_version is not None and await self.find_by_id(user_id) is not None:
+            raise _concurrent_modification()
+        return None
+
+    async def find_by_id(self, user_id: int) -> Optional[DomainUser]:
+        user_orm = await self.session_factory().get(UserORM, user_id)
+        return user_orm.to_domain_entity() if user_orm else None
+
+    async def find_by_ids(self, user_ids: List[int]) -> List[DomainUser]:
+        result = await self.session_factory().scalars(select(UserORM).where(UserORM.id.in_(user_ids)))
+        return [user_orm.to_domain_entity() for user_orm in result]
+
+    async def find_by_username(self, username: str) -> Optional[DomainUser]:
+        user_orm = (await self.session_factory().scalars(
+            select(UserORM).where(UserORM.username == username)
+        )).first()
+        return user_orm.to_domain_entity() if user_orm else None
+
+    async def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                       fields: Optional[Sequence[str]] = None) -> List[DomainUser]:
+        session = self.session_factory()
+        if fields is None:
+            return [DomainUser(*row) for row in await session.execute(_user_rows_statement(limit, after_id))]
+
+        result = await session.execute(_user_projection_statement(limit, after_id, fields))
+        return [DomainUser(**row._mapping) for row in result]
+
+    async def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        result = await self.session_factory().execute(_user_fingerprint_statement(limit, after_id))
+        return tuple(result.one())
+
+    async def delete_by_id(self, user_id: int) -> bool:
+        session = self.session_factory()
+        user_orm = await session.get(UserORM, user_id)
+        if user_orm:
+            task_ids = (await session.scalars(select(TaskORM.id).where(TaskORM.assigned_to_id == user_id))).all()
+            await session.delete(user_orm)
+            if self.task_counters:
+                await session.execute(delete(TaskCounterORM).where(TaskCounterORM.assigned_to_id == user_id))
+            await session.flush()
+            seq = None
+            if task_ids:
+                seq = await _record_changes(session, _task_changes_insert(task_ids, datetime.datetime.utcnow()))
+            await session.commit()
+            _notify_change(self.change_notifier, seq)
+            return True
+        return False
+
+
+class AsyncSQLAlchemyTaskRepository(AsyncTaskRepository):
+    def __init__(self, session_factory: Callable[[], AsyncSession], task_counters: bool = False,
+                 change_notifier: Optional[ChangeNotifier] = None):
+        self.session_factory = session_factory
+        self.task_counters = task_counters
+        self.change_notifier = change_notifier
+
+    async def _count(self, session: AsyncSession, removed=(), added=()) -> None:
+        if self.task_counters:
+            statement = _task_counter_statement(session.get_bind().dialect.name, removed, added)
+            if statement is not None:
+                await session.execute(statement)
+
+    async def save(self, task: DomainTask) -> DomainTask:
+        session = self.session_factory()
+        removed = ()
+        if task.id is None:
+            task_orm = TaskORM.from_domain_entity(task)
+            session.add(task_orm)
+        else:
+            task_orm = await session.get(TaskORM, task.id)
+            if not task_orm:
+                raise ValueError("Tarefa não encontrada para atualização.")
+            _check_version(task, task_orm)
+            removed = ((task_orm.assigned_to_id, task_orm.status),)
+            task_orm.title = task.title
+            task_orm.description = task.description
+            task_orm.status = task.status
+            task_orm.assigned_to_id = task.assigned_to_id
+        try:
+            await session.flush()
+            await self._count(session, removed, ((task_orm.assigned_to_id, task_orm.status),))
+            seq = await _record_changes(session, _task_changes_insert([task_orm.id], datetime.datetime.utcnow()))
+            await session.commit()
+        except StaleDataError:
+            await session.rollback()
+            raise _concurrent_modification()
+        _notify_change(self.change_notifier, seq)
+        return _task_without_assignee(task_orm)
+
+    async def patch(self, task_id: int, changes: dict,
+                    expected_version: Optional[int] = None) -> Optional[DomainTask]:
+        if self.task_counters and COUNTED_COLUMNS & changes.keys():
+            return await self._patch_counted(task_id, changes, expected_version)
+        session = self.session_factory()
+        row = (await session.execute(_task_patch_statement(task_id, changes, expected_version))).first()
+        seq = None
+        if row is not None:
+            seq = await _record_changes(session, _task_changes_insert([task_id], row.updated_at))
+        await session.commit()
+        if row is not None:
+            _notify_change(self.change_notifier, seq)
+            return DomainTask(*row)
+        _task_patch_miss((await session.execute(_task_patch_miss_statement(task_id, changes))).first(),
+                         task_id, changes, expected_version)
+        return None
+
+    async def _patch_counted(self, task_id: int, changes: dict,
+                             expected_version: Optional[int]) -> Optional[DomainTask]:
+        # Mesmo protocolo de SQLAlchemyTaskRepository._patch_counted
+        session = self.session_factory()
+        for _ in range(COUNTED_PATCH_ATTEMPTS):
+            current = (await session.execute(_task_counted_columns_statement(task_id))).first()
+            if current is None:
+                return None
+            version, assigned_to_id, status = current
+            if expected_version is not None and version != expected_version:
+                raise _version_conflict(task_id, version, expected_version)
+            row = (await session.execute(_task_patch_statement(task_id, changes, version))).first()
+            if row is not None:
+                task = DomainTask(*row)
+                await self._count(session, ((assigned_to_id, status),), ((task.assigned_to_id, task.status),))
+                seq = await _record_changes(session, _task_changes_insert([task_id], task.updated_at))
+                await session.commit()
+                _notify_change(self.change_notifier, seq)
+                return task
+            await session.commit()
+            try:
+                _task_patch_miss((await session.execute(_task_patch_miss_statement(task_id, changes))).first(),
+                                 task_id, changes, version)
+            except ConcurrentModificationException:
+                if expected_version is not None:
+                    raise
+                continue
+            return None
+        raise _concurrent_modification()
+
+    async def find_by_id(self, task_id: int) -> Optional[DomainTask]:
+        task_orm = await self.session_factory().get(TaskORM, task_id, options=[joinedload(TaskORM.assignee)])
+        return task_orm.to_domain_entity() if task_orm else None
+
+    async def find_by_ids(self, task_ids: List[int]) -> List[DomainTask]:
+        statement = select(TaskORM).options(joinedload(TaskORM.assignee)).where(TaskORM.id.in_(task_ids))
+        result = await self.session_factory().scalars(statement)
+        return [task_orm.to_domain_entity() for task_orm in result]
+
+    async def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                       fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return await self.find_all_with_assignees(query=query, limit=limit, fields=fields)
+
+    async def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                      fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        session = self.session_factory()
+        query = query or TaskQuery()
+        if fields is not None:
+            statement = _task_projection_statement(query, limit, fields)
+            return [_task_from_row(row) for row in await session.execute(statement)]
+
+        statement = _task_rows_statement(query, limit)
+        return [DomainTask(*row) for row in await session.execute(statement)]
+
+    async def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> AsyncIterator[DomainTask]:
+        result = await self.session_factory().stream(_task_export_statement(query or TaskQuery(), batch_size))
+        async for row in result:
+            yield DomainTask(*row)
+
+    async def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        statement = _task_fingerprint_statement(query or TaskQuery(), limit)
+        return tuple((await self.session_factory().execute(statement)).one())
+
+    async def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        statement = _task_counter_stats_statement() if self.task_counters else _task_stats_statement()
+        result = await self.session_factory().execute(statement)
+        return {(assigned_to_id, status): count for assigned_to_id, status, count in result}
+
+    async def rebuild_counters(self) -> None:
+        session = self.session_factory()
+        for statement in _task_rebuild_counter_statements():
+            await session.execute(statement)
+        await session.commit()
+
+    async def delete_by_id(self, task_id: int) -> bool:
+        session = self.session_factory()
+        task_orm = await session.get(TaskORM, task_id)
+        if task_orm:
+            await session.delete(task_orm)
+            await session.flush()
+            await self._count(session, removed=((task_orm.assigned_to_id, task_orm.status),))
+            seq = await _record_changes(session, _task_changes_insert([task_id], datetime.datetime.utcnow()))
+            await session.commit()
+            _notify_change(self.change_notifier, seq)
+            return True
+        return False
+
+    async def save_many(self, tasks: List[DomainTask]) -> List[DomainTask]:
+        session = self.session_factory()
+        now = datetime.datetime.utcnow()
+        new_orms, changes = _prepare_save_many(tasks, now)
+        removed = ()
+        if self.task_counters and changes:
+            current_rows = await session.execute(_task_counted_rows_statement([change['id'] for change in changes]))
+            removed = _save_many_counted_pairs(changes, current_rows)
+        try:
+            session.add_all(new_orms.values())
+            if changes:
+                await session.execute(update(TaskORM), changes)
+            await session.flush()
+        except StaleDataError:
+            await session.rollback()
+            raise _concurrent_modification()
+
+        saved = _saved_tasks(tasks, new_orms, now)
+        await self._count(session, removed, [(task.assigned_to_id, task.status) for task in saved])
+        seq = None
+        if saved:
+            seq = await _record_changes(session, _task_changes_insert([task.id for task in saved], now))
+        await session.commit()
+        _notify_change(self.change_notifier, seq)
+        return saved
+
+    async def delete_many(self, task_ids: List[int]) -> List[int]:
+        session = self.session_factory()
+        rows = (await session.execute(
+            delete(TaskORM).where(TaskORM.id.in_(task_ids))
+            .returning(TaskORM.id, TaskORM.assigned_to_id, TaskORM.status)
+        )).all()
+        await self._count(session, removed=[(assigned_to_id, status) for _, assigned_to_id, status in rows])
+        seq = None
+        if rows:
+            seq = await _record_changes(session, _task_changes_insert([row.id for row in rows], datetime.datetime.utcnow()))
+        await session.commit()
+        _notify_change(self.change_notifier, seq)
+        return [row.id for row in rows]
+
+    async def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        session = self.session_factory()
+        try:
+            _check_changes_cursor(since, (await session.execute(_task_changes_bounds_statement())).one())
+            result = await session.execute(_task_changes_statement(since, limit))
+            return [_task_change_from_row(row) for row in result]
+        finally:
+            # Encerra a transação de leitura: no long-poll e no SSE a espera seguinte não
+            # segura conexão do pool (também quando o cursor expirou)
+            await session.commit()
+
+    async def last_change_seq(self) -> int:
+        session = self.session_factory()
+        _, max_seq = (await session.execute(_task_changes_bounds_statement())).one()
+        await session.commit()
+        return max_seq or 0
@@ -1,7 +1,15 @@
+import datetime
 from flask_sqlalchemy import SQLAlchemy
 from core.domain.entities import User as DomainUser, Task as DomainTask 
+from infrastructure.database.read_replicas import RoutingSession
+
+# RoutingSession manda para as réplicas (se configuradas) as leituras marcadas com @replica_read
+db = SQLAlchemy(session_options={'class_': RoutingSession}) 
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
 
-db = SQLAlchemy() 
 
 class UserORM(db.Model):
     __tablename__ = 'users'
@@ -9,6 +17,12 @@ class UserORM(db.Model):
     nome = db.Column(db.String(80), nullable=False)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password = db.Column(db.String(120), nullable=False)
+    # Criados pela migração 3. version_id_col faz o ORM incrementar version a cada
+    # UPDATE e incluir "AND version = <lida>" no WHERE (StaleDataError se outra
+    # gravação chegou antes).
+    version = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
+    __mapper_args__ = {'version_id_col': version}
 
     tasks = db.relationship('TaskORM', backref='assignee', lazy=True, cascade="all, delete-orphan")
 
@@ -17,7 +31,9 @@ class UserORM(db.Model):
             id=self.id,
             nome=self.nome,
             username=self.username,
-            password=self.password 
+            password=self.password,
+            version=self.version,
+            updated_at=self.updated_at
         )
 
     @staticmethod
@@ -32,11 +48,19 @@ class UserORM(db.Model):
 
 class TaskORM(db.Model):
     __tablename__ = 'tasks'
+    # Criados pela migração 2 (infrastructure/database/migrations.py)
+    __table_args__ = (
+        db.Index('ix_tasks_assigned_to_id_status', 'assigned_to_id', 'status'),
+        db.Index('ix_tasks_assigned_to_id_id', 'assigned_to_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.String(255), nullable=True)
     status = db.Column(db.String(50), default='pending', nullable=False)
     assigned_to_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
+    __mapper_args__ = {'version_id_col': version}
 
     def to_domain_entity(self) -> DomainTask:
         task = DomainTask(
@@ -44,7 +68,9 @@ class TaskORM(db.Model):
             title=self.title,
             description=self.description,
             status=self.status,
-            assigned_to_id=self.assigned_to_id
+            assigned_to_id=self.assigned_to_id,
+            version=self.version,
+            updated_at=self.updated_at
         )
         if self.assignee:
             task.assignee_name = self.assignee.nome
@@ -58,4 +84,52 @@ class TaskORM(db.Model):
             description=domain_task.description,
             status=domain_task.status,
             assigned_to_id=domain_task.assigned_to_id
-        )
\ No newline at end of file
+        )
+
+
+class TaskCounterORM(db.Model):
+    """
+    Contagem materializada de tarefas por (responsável, status), mantida de forma
+    incremental pelos repositórios quando TASK_STATS_COUNTERS está ativo.
+    Criada e preenchida pela migração 5. Sem chave estrangeira: as linhas de um
+    usuário removido são apagadas pelo próprio repositório de usuários.
+    """
+    __tablename__ = 'task_counters'
+    assigned_to_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class JobORM(db.Model):
+    """
+    Fila de trabalhos em segundo plano (DatabaseJobDispatcher), consumida por
+    worker.py. Criada pela migração 6. Uma linha por (evento, handler); a linha é
+    apagada quando o trabalho conclui e fica com status 'failed' quando esgota as tentativas.
+    """
+    __tablename__ = 'jobs'
+    # Reserva dos próximos trabalhos: WHERE status = 'pending' AND run_at <= agora ORDER BY run_at
+    __table_args__ = (db.Index('ix_jobs_status_run_at', 'status', 'run_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), nullable=False)
+    event = db.Column(db.String(80), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending | running | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, nullable=False)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+
+
+class TaskChangeORM(db.Model):
+    """
+    Histórico de mudanças de tarefas do feed GET /tasks/changes. Criada pela migração 7.
+    Uma linha por gravação que cria, altera ou remove uma tarefa (ou troca o nome ou
+    remove o seu responsável); seq cresce na ordem dos commits. Sem chave estrangeira:
+    a linha de uma tarefa removida é o que avisa os clientes da remoção.
+    Linhas antigas são descartadas por "flask prune-task-changes".
+    """
+    __tablename__ = 'task_changes'
+    seq = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
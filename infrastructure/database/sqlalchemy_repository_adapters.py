@@ -1,11 +1,520 @@
-from typing import Optional, List
-from core.domain.entities import User as DomainUser, Task as DomainTask
+import collections
+import datetime
+import importlib
+from typing import Dict, Optional, List, Sequence, Iterator, Tuple
+from sqlalchemy import Boolean, and_, delete, func, insert, literal, literal_column, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.sql.functions import FunctionElement
+from core.domain.entities import User as DomainUser, Task as DomainTask, TaskChange
+from core.domain.exceptions import ChangesExpiredException, ConcurrentModificationException
+from core.domain.task_query import TaskQuery
 from core.ports.user_repository import UserRepository
 from core.ports.task_repository import TaskRepository
-from infrastructure.database.sqlalchemy_models import db, UserORM, TaskORM
+from core.ports.change_notifier import ChangeNotifier
+from infrastructure.database.read_replicas import replica_read
+from infrastructure.database.sqlalchemy_models import db, UserORM, TaskORM, TaskCounterORM, TaskChangeORM
+
+def _paginate(query, id_column, limit: Optional[int], after_id: Optional[int]):
+    # Paginação keyset: "WHERE id > cursor ORDER BY id LIMIT n" usa o índice da PK
+    # e custa o mesmo em qualquer página, ao contrário de OFFSET.
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    query = query.order_by(id_column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+# Configuração de texto do PostgreSQL usada na busca; precisa ser a mesma do índice
+# GIN ix_tasks_search (migração 4) para que ele seja usado.
+SEARCH_CONFIG = 'portuguese'
+
+
+class task_search(FunctionElement):
+    """
+    Filtro de busca textual em title/description: cada argumento é um termo que
+    precisa aparecer na tarefa. Compilado conforme o banco (ver os @compiles abaixo),
+    para que os mesmos statements sirvam ao PostgreSQL e ao SQLite.
+    """
+    type = Boolean()
+    name = 'task_search'
+    inherit_cache = True
+
+
+@compiles(task_search, 'postgresql')
+def _compile_fulltext_search(element, compiler, **kw):
+    # Mesma expressão do índice: to_tsvector(config, title || ' ' || coalesce(description, ''))
+    config = literal_column(f"'{SEARCH_CONFIG}'")
+    document = func.to_tsvector(config, TaskORM.title.op('||')(literal_column("' '")).op('||')(
+        func.coalesce(TaskORM.description, literal_column("''"))))
+    terms = [func.plainto_tsquery(config, term) for term in element.clauses]
+    tsquery = terms[0]
+    for term in terms[1:]:
+        tsquery = tsquery.op('&&')(term)
+    return f"({compiler.process(document.op('@@')(tsquery), **kw)})"
+
+
+@compiles(task_search)
+def _compile_like_search(element, compiler, **kw):
+    # Sem índice de texto: LIKE por termo, sem diferenciar maiúsculas. O escape de
+    # % e _ é feito no próprio SQL, já que os termos chegam como parâmetros.
+    conditions = []
+    for term in element.clauses:
+        escaped = func.lower(term)
+        for special in ('!', '%', '_'):
+            escaped = func.replace(escaped, literal_column(f"'{special}'"), literal_column(f"'!{special}'"))
+        pattern = literal_column("'%'").op('||')(escaped).op('||')(literal_column("'%'"))
+        conditions.append(or_(
+            func.lower(TaskORM.title).like(pattern, escape='!'),
+            func.lower(func.coalesce(TaskORM.description, literal_column("''"))).like(pattern, escape='!')
+        ))
+    return f'({compiler.process(and_(*conditions), **kw)})'
+
+
+def _filter_tasks(statement, query: TaskQuery):
+    # assigned_to_id + status é atendido pelo índice (assigned_to_id, status)
+    if query.assigned_to_id:
+        statement = statement.where(TaskORM.assigned_to_id == query.assigned_to_id)
+    if query.statuses:
+        statement = statement.where(TaskORM.status.in_(query.statuses))
+    if query.min_id is not None:
+        statement = statement.where(TaskORM.id >= query.min_id)
+    if query.max_id is not None:
+        statement = statement.where(TaskORM.id <= query.max_id)
+    if query.search_terms:
+        statement = statement.where(task_search(*query.search_terms))
+    return statement
+
+
+def _keyset_after(sort_columns, after: tuple):
+    """
+    Condição "vem depois de `after`" para uma ordenação de várias colunas com
+    direções mistas: (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+    """
+    alternatives = []
+    for index, (column, descending) in enumerate(sort_columns):
+        ties = [sort_columns[previous][0] == after[previous] for previous in range(index)]
+        alternatives.append(and_(*ties, column < after[index] if descending else column > after[index]))
+    return or_(*alternatives)
+
+
+def _page_tasks(statement, query: TaskQuery, limit: Optional[int]):
+    # Na ordenação padrão (só id) vale o mesmo "WHERE id > cursor ORDER BY id" de _paginate
+    sort_columns = [(SORT_COLUMNS[field], descending) for field, descending in query.sort_keys]
+    if query.after is not None:
+        statement = statement.where(_keyset_after(sort_columns, query.after))
+    statement = statement.order_by(*[column.desc() if descending else column for column, descending in sort_columns])
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+USER_COLUMNS = {
+    'id': UserORM.id,
+    'nome': UserORM.nome,
+    'username': UserORM.username,
+}
+
+TASK_COLUMNS = {
+    'id': TaskORM.id,
+    'title': TaskORM.title,
+    'description': TaskORM.description,
+    'status': TaskORM.status,
+    'assigned_to_id': TaskORM.assigned_to_id,
+}
+
+SORT_COLUMNS = dict(TASK_COLUMNS, updated_at=TaskORM.updated_at)
+
+
+# Construtores de statements compartilhados com o adaptador assíncrono
+# (sqlalchemy_async_repository_adapters.py), que executa os mesmos SELECTs.
+
+def _user_projection_statement(limit: Optional[int], after_id: Optional[int], fields: Sequence[str]):
+    # Projeção: seleciona apenas as colunas pedidas, sem instanciar objetos ORM
+    columns = [USER_COLUMNS['id'].label('id')]
+    columns += [USER_COLUMNS[field].label(field) for field in fields if field != 'id']
+    return _paginate(select(*columns), UserORM.id, limit, after_id)
+
+
+def _task_projection_statement(query: TaskQuery, limit: Optional[int], fields: Sequence[str]):
+    # Os campos de ordenação também são lidos: o cursor da próxima página sai deles
+    names = ['id'] + [field for field in fields if field in TASK_COLUMNS and field != 'id']
+    names += [field for field, _ in query.sort_keys if field not in names]
+    columns = [SORT_COLUMNS[name].label(name) for name in names]
+    with_assignee = 'assigned_to_name' in fields
+    if with_assignee:
+        columns.append(UserORM.nome.label('assignee_name'))
+
+    statement = select(*columns).select_from(TaskORM)
+    if with_assignee:
+        statement = statement.outerjoin(UserORM, TaskORM.assigned_to_id == UserORM.id)
+    return _page_tasks(_filter_tasks(statement, query), query, limit)
+
+
+# Leitura completa como tuplas (sem instâncias ORM nem identity map): as colunas vêm
+# na ordem dos construtores das entidades, então cada linha vira User(*row) / Task(*row).
+
+def _user_rows_statement(limit: Optional[int], after_id: Optional[int]):
+    columns = (UserORM.id, UserORM.nome, UserORM.username, UserORM.password, UserORM.version, UserORM.updated_at)
+    return _paginate(select(*columns), UserORM.id, limit, after_id)
+
+
+def _task_rows_statement(query: TaskQuery, limit: Optional[int]):
+    columns = (TaskORM.id, TaskORM.title, TaskORM.description, TaskORM.status, TaskORM.assigned_to_id,
+               UserORM.nome, TaskORM.version, TaskORM.updated_at)
+    statement = select(*columns).select_from(TaskORM).outerjoin(UserORM, TaskORM.assigned_to_id == UserORM.id)
+    return _page_tasks(_filter_tasks(statement, query), query, limit)
+
+
+def _task_export_statement(query: TaskQuery, batch_size: int):
+    # Lê tuplas (sem objetos ORM) por um cursor do lado do servidor: stream_results
+    # evita que o driver carregue o resultado inteiro e yield_per busca em lotes.
+    statement = _task_rows_statement(query, None)
+    return statement.execution_options(stream_results=True, yield_per=batch_size)
+
+
+# Fingerprints para ETags: agregados sobre a mesma janela (filtros + página) da
+# listagem, sem montar entidades. count e sum(id) mudam quando linhas entram ou
+# saem da janela; sum(version) muda a cada UPDATE (o ORM incrementa version).
+
+def _user_fingerprint_statement(limit: Optional[int], after_id: Optional[int]):
+    window = _paginate(select(UserORM.id, UserORM.version, UserORM.updated_at), UserORM.id, limit, after_id).subquery()
+    return select(func.count(), func.sum(window.c.id), func.sum(window.c.version), func.max(window.c.updated_at))
+
+
+def _task_fingerprint_statement(query: TaskQuery, limit: Optional[int]):
+    # A versão do responsável entra porque a listagem inclui o nome dele
+    window = (
+        select(TaskORM.id, TaskORM.version, TaskORM.updated_at, UserORM.version.label('assignee_version'))
+        .select_from(TaskORM)
+        .outerjoin(UserORM, TaskORM.assigned_to_id == UserORM.id)
+    )
+    window = _page_tasks(_filter_tasks(window, query), query, limit).subquery()
+    return select(func.count(), func.sum(window.c.id), func.sum(window.c.version), func.max(window.c.updated_at),
+                  func.sum(window.c.assignee_version))
+
+
+# Atualizações parciais em um só comando: UPDATE ... RETURNING só com as colunas
+# alteradas, sem ler a linha antes. version e updated_at são renovados no próprio
+# UPDATE; com expected_version ele só atinge a linha se ela ainda estiver nessa versão.
+
+def _user_patch_statement(user_id: int, changes: dict, expected_version: Optional[int]):
+    statement = update(UserORM).where(UserORM.id == user_id)
+    if expected_version is not None:
+        statement = statement.where(UserORM.version == expected_version)
+    return (
+        statement.values(**changes, version=UserORM.version + 1, updated_at=datetime.datetime.utcnow())
+        .returning(UserORM.id, UserORM.nome, UserORM.username, UserORM.password, UserORM.version,
+                   UserORM.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _task_patch_statement(task_id: int, changes: dict, expected_version: Optional[int]):
+    statement = update(TaskORM).where(TaskORM.id == task_id)
+    if expected_version is not None:
+        statement = statement.where(TaskORM.version == expected_version)
+    if 'assigned_to_id' in changes:
+        # O responsável é conferido no próprio UPDATE (o SQLite não aplica a FK por
+        # padrão): se ele não existe, nenhuma linha é atingida.
+        statement = statement.where(select(UserORM.id).where(UserORM.id == changes['assigned_to_id']).exists())
+    # O nome do responsável volta no RETURNING, na ordem do construtor de Task
+    assignee = aliased(UserORM)
+    assignee_name = select(assignee.nome).where(assignee.id == TaskORM.assigned_to_id).scalar_subquery()
+    return (
+        statement.values(**changes, version=TaskORM.version + 1, updated_at=datetime.datetime.utcnow())
+        .returning(TaskORM.id, TaskORM.title, TaskORM.description, TaskORM.status, TaskORM.assigned_to_id,
+                   assignee_name, TaskORM.version, TaskORM.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _task_patch_miss_statement(task_id: int, changes: dict):
+    # Só executado quando o UPDATE não atingiu nenhuma linha, para dizer por quê
+    columns = [TaskORM.version]
+    if 'assigned_to_id' in changes:
+        columns.append(select(UserORM.id).where(UserORM.id == changes['assigned_to_id']).exists())
+    return select(*columns).where(TaskORM.id == task_id)
+
+
+def _task_patch_miss(row, task_id: int, changes: dict, expected_version: Optional[int]) -> None:
+    """
+    Interpreta a linha de _task_patch_miss_statement: retorna se a tarefa não existe
+    e lança a exceção adequada se ela existe mas o UPDATE não a atingiu.
+    """
+    if row is None:
+        return
+    if 'assigned_to_id' in changes and not row[1]:
+        raise ValueError(f"Usuário atribuído com ID {changes['assigned_to_id']} não encontrado.")
+    raise _version_conflict(task_id, row[0], expected_version)
+
+
+def _username_taken() -> ValueError:
+    return ValueError("Username já existe.")
+
+
+def _version_conflict(record_id: int, version: int, expected_version: int) -> ConcurrentModificationException:
+    return ConcurrentModificationException(
+        f"O registro {record_id} foi alterado por outra requisição (versão {version}, esperada {expected_version})."
+    )
+
+
+def _check_version(entity, entity_orm) -> None:
+    # A entidade carrega a versão lida pelo serviço; se o registro já mudou desde
+    # então, gravar por cima perderia a outra atualização.
+    if entity.version is not None and entity.version != entity_orm.version:
+        raise _version_conflict(entity.id, entity_orm.version, entity.version)
+
+
+# Estatísticas por (responsável, status). Sem contadores, um GROUP BY sobre tasks
+# (atendido pelo índice (assigned_to_id, status)); com eles, a leitura de task_counters,
+# que cresce com o número de pares e não com o de tarefas.
+# As gravações que mudam esses pares somam deltas aos contadores na mesma transação.
+
+COUNTED_COLUMNS = frozenset(('assigned_to_id', 'status'))
+
+# Tentativas de um patch com contadores quando outra gravação muda a tarefa entre a
+# leitura dos valores anteriores e o UPDATE
+COUNTED_PATCH_ATTEMPTS = 3
+
+# Bancos com INSERT ... ON CONFLICT DO UPDATE; o módulo do dialeto só é importado quando usado
+UPSERT_DIALECTS = ('postgresql', 'sqlite')
+
+
+def _task_stats_statement():
+    return (
+        select(TaskORM.assigned_to_id, TaskORM.status, func.count())
+        .group_by(TaskORM.assigned_to_id, TaskORM.status)
+    )
+
+
+def _task_counter_stats_statement():
+    return (
+        select(TaskCounterORM.assigned_to_id, TaskCounterORM.status, TaskCounterORM.count)
+        .where(TaskCounterORM.count > 0)
+    )
+
+
+def _task_counter_statement(dialect_name: str, removed=(), added=()):
+    """
+    Soma aos contadores os deltas de pares (assigned_to_id, status) removidos e
+    adicionados, com INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count:
+    sem ler os contadores antes, e o bloqueio da linha serializa gravações concorrentes
+    no mesmo par. Retorna None se os deltas se anulam.
+    """
+    deltas = collections.Counter(added)
+    deltas.subtract(removed)
+    # Ordem fixa das linhas, para que dois lotes concorrentes não travem um ao outro
+    rows = [
+        {'assigned_to_id': assigned_to_id, 'status': status, 'count': delta}
+        for (assigned_to_id, status), delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return None
+    if dialect_name not in UPSERT_DIALECTS:
+        raise ValueError(f"TASK_STATS_COUNTERS não é suportado no banco {dialect_name}.")
+    dialect_insert = importlib.import_module(f'sqlalchemy.dialects.{dialect_name}').insert
+    statement = dialect_insert(TaskCounterORM).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[TaskCounterORM.assigned_to_id, TaskCounterORM.status],
+        set_={'count': TaskCounterORM.count + statement.excluded['count']}
+    )
+
+
+def _task_rebuild_counter_statements():
+    # Recalcula todos os contadores a partir das tarefas (mesma consulta da migração 5)
+    return [
+        delete(TaskCounterORM),
+        TaskCounterORM.__table__.insert().from_select(['assigned_to_id', 'status', 'count'], _task_stats_statement())
+    ]
+
+
+def _task_counted_columns_statement(task_id: int):
+    return select(TaskORM.version, TaskORM.assigned_to_id, TaskORM.status).where(TaskORM.id == task_id)
+
+
+def _task_counted_rows_statement(task_ids: List[int]):
+    return select(TaskORM.id, TaskORM.version, TaskORM.assigned_to_id, TaskORM.status).where(TaskORM.id.in_(task_ids))
+
+
+def _save_many_counted_pairs(changes: List[dict], current_rows) -> list:
+    """
+    Pares (assigned_to_id, status) anteriores das tarefas atualizadas por um
+    save_many, conferindo as versões como o UPDATE fará: se uma versão já mudou o
+    lote falharia de qualquer forma, e os valores lidos não seriam os substituídos.
+    """
+    current = {row.id: row for row in current_rows}
+    removed = []
+    for change in changes:
+        row = current.get(change['id'])
+        if row is None:
+            continue
+        if row.version != change['version']:
+            raise _version_conflict(row.id, row.version, change['version'])
+        removed.append((row.assigned_to_id, row.status))
+    return removed
+
+
+def _task_from_row(row) -> DomainTask:
+    values = dict(row._mapping)
+    assignee_name = values.pop('assignee_name', None)
+    task = DomainTask(**values)
+    task.assignee_name = assignee_name
+    return task
+
+
+def _prepare_save_many(tasks: List[DomainTask], now: datetime.datetime):
+    """
+    Separa um lote em objetos ORM a inserir (por posição no lote) e linhas de
+    UPDATE por chave primária para as tarefas que já têm id. Cada UPDATE leva a
+    version lida: o ORM a usa no WHERE e grava version + 1.
+    """
+    new_orms = {}
+    changes = []
+    for index, task in enumerate(tasks):
+        if task.id is None:
+            new_orms[index] = TaskORM.from_domain_entity(task)
+        else:
+            changes.append({
+                'id': task.id,
+                'title': task.title,
+                'description': task.description,
+                'status': task.status,
+                'assigned_to_id': task.assigned_to_id,
+                'version': task.version,
+                'updated_at': now
+            })
+    return new_orms, changes
+
+
+def _saved_tasks(tasks: List[DomainTask], new_orms: dict, now: datetime.datetime) -> List[DomainTask]:
+    # Chamado após o flush, quando os ids, versões e datas já estão nos objetos ORM
+    saved = []
+    for index, task in enumerate(tasks):
+        task_orm = new_orms.get(index)
+        saved.append(DomainTask(
+            id=task_orm.id if task_orm else task.id,
+            title=task.title,
+            description=task.description,
+            status=task.status,
+            assigned_to_id=task.assigned_to_id,
+            version=task_orm.version if task_orm else task.version + 1,
+            updated_at=task_orm.updated_at if task_orm else now
+        ))
+    return saved
+
+
+def _concurrent_modification() -> ConcurrentModificationException:
+    return ConcurrentModificationException("O registro foi alterado por outra requisição; leia-o novamente.")
+
+
+# Feed de mudanças (GET /tasks/changes): cada gravação insere em task_changes uma
+# linha por tarefa afetada, na mesma transação e como último comando antes do
+# commit. O feed lê a última seq de cada tarefa depois do cursor do cliente e o
+# estado atual dela; se a tarefa não existe mais, a mudança é uma remoção.
+
+# Chave do lock consultivo do PostgreSQL tomado antes do INSERT em task_changes. Sem
+# ele, uma transação com seq menor poderia ser confirmada depois de outra com seq
+# maior, e um cliente que já tivesse avançado o cursor perderia a mudança. Fica preso
+# até o fim da transação, por isso o INSERT é o último comando antes do commit.
+CHANGELOG_LOCK_KEY = 0x7461736b
+
+
+def _changelog_lock_statement(dialect_name: str):
+    # No SQLite as transações de escrita já são serializadas pelo lock do banco
+    if dialect_name != 'postgresql':
+        return None
+    return select(func.pg_advisory_xact_lock(CHANGELOG_LOCK_KEY))
+
+
+def _task_changes_insert(task_ids: List[int], now: datetime.datetime):
+    rows = [{'task_id': task_id, 'changed_at': now} for task_id in task_ids]
+    return insert(TaskChangeORM).values(rows).returning(TaskChangeORM.seq)
+
+
+def _assignee_task_changes_insert(user_id: int, now: datetime.datetime):
+    # O nome do responsável faz parte da tarefa no feed: renomeá-lo muda todas as tarefas dele
+    tasks = select(TaskORM.id, literal(now)).where(TaskORM.assigned_to_id == user_id)
+    return insert(TaskChangeORM).from_select(['task_id', 'changed_at'], tasks).returning(TaskChangeORM.seq)
+
+
+def _task_changes_statement(since: int, limit: int):
+    # Colunas: seq, task_id e a tarefa na ordem do construtor de Task (todas nulas se removida)
+    latest = (
+        select(TaskChangeORM.task_id, func.max(TaskChangeORM.seq).label('seq'))
+        .where(TaskChangeORM.seq > since)
+        .group_by(TaskChangeORM.task_id)
+        .subquery()
+    )
+    return (
+        select(latest.c.seq, latest.c.task_id, TaskORM.id, TaskORM.title, TaskORM.description, TaskORM.status,
+               TaskORM.assigned_to_id, UserORM.nome, TaskORM.version, TaskORM.updated_at)
+        .select_from(latest)
+        .outerjoin(TaskORM, TaskORM.id == latest.c.task_id)
+        .outerjoin(UserORM, TaskORM.assigned_to_id == UserORM.id)
+        .order_by(latest.c.seq)
+        .limit(limit)
+    )
+
+
+def _task_changes_bounds_statement():
+    return select(func.min(TaskChangeORM.seq), func.max(TaskChangeORM.seq))
+
+
+def _task_changes_prune_statement(older_than: datetime.datetime):
+    """
+    Remove o histórico até a última seq anterior a `older_than` (por seq, e não por
+    data, para não abrir buracos no meio do histórico). A linha mais recente sempre
+    fica: no SQLite a próxima seq é max(seq) + 1, e o feed usa min(seq) para saber
+    até onde o histórico vai.
+    """
+    cutoff = select(func.max(TaskChangeORM.seq)).where(TaskChangeORM.changed_at < older_than).scalar_subquery()
+    latest = select(func.max(TaskChangeORM.seq)).scalar_subquery()
+    return delete(TaskChangeORM).where(TaskChangeORM.seq <= cutoff, TaskChangeORM.seq < latest)
+
+
+def _check_changes_cursor(since: int, bounds) -> None:
+    # Com o histórico começando em min_seq, só os cursores a partir de min_seq - 1 não perderam nada
+    min_seq, _ = bounds
+    if min_seq is not None and since < min_seq - 1:
+        raise ChangesExpiredException(
+            f"O histórico de mudanças não alcança mais a sequência {since}; refaça a listagem completa."
+        )
+
+
+def _task_change_from_row(row) -> TaskChange:
+    return TaskChange(row[0], row[1], DomainTask(*row[2:]) if row[2] is not None else None)
+
+
+def _record_changes(statement) -> Optional[int]:
+    """
+    Executa um dos INSERTs em task_changes acima na transação corrente e retorna a
+    maior seq gravada (None se nenhuma tarefa foi afetada).
+    """
+    lock = _changelog_lock_statement(db.session.get_bind().dialect.name)
+    if lock is not None:
+        db.session.execute(lock)
+    return max(db.session.execute(statement).scalars(), default=None)
+
+
+def _notify_change(change_notifier: Optional[ChangeNotifier], seq: Optional[int]) -> None:
+    # Só depois do commit: quem acorda precisa enxergar a mudança
+    if change_notifier is not None and seq is not None:
+        change_notifier.notify(seq)
+
 
 class SQLAlchemyUserRepository(UserRepository):
+    def __init__(self, task_counters: bool = False, change_notifier: Optional[ChangeNotifier] = None):
+        # Com task_counters, remover um usuário apaga também os contadores das tarefas dele
+        self.task_counters = task_counters
+        # Renomear ou remover um usuário muda as tarefas dele no feed de mudanças
+        self.change_notifier = change_notifier
+
     def save(self, user: DomainUser) -> DomainUser:
+        renamed = False
         if user.id is None: 
             user_orm = UserORM.from_domain_entity(user)
             db.session.add(user_orm)
@@ -13,35 +522,102 @@ class SQLAlchemyUserRepository(UserRepository):
             user_orm = UserORM.query.get(user.id)
             if not user_orm:
                 raise ValueError("Usuário não encontrado para atualização.")
+            _check_version(user, user_orm)
+            renamed = user_orm.nome != user.nome
             user_orm.nome = user.nome
             user_orm.username = user.username
             user_orm.password = user.password 
-        db.session.commit()
+        try:
+            db.session.flush()
+            seq = None
+            if renamed:
+                seq = _record_changes(_assignee_task_changes_insert(user_orm.id, datetime.datetime.utcnow()))
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            raise _concurrent_modification()
+        _notify_change(self.change_notifier, seq)
         return user_orm.to_domain_entity()
 
+    def patch(self, user_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainUser]:
+        try:
+            row = db.session.execute(_user_patch_statement(user_id, changes, expected_version)).first()
+        except IntegrityError:
+            # Única restrição que um UPDATE de usuário pode violar: username único
+            db.session.rollback()
+            raise _username_taken()
+        seq = None
+        if row is not None and 'nome' in changes:
+            seq = _record_changes(_assignee_task_changes_insert(user_id, datetime.datetime.utcnow()))
+        db.session.commit()
+        if row is not None:
+            _notify_change(self.change_notifier, seq)
+            return DomainUser(*row)
+        if expected_version is not None and self.find_by_id(user_id) is not None:
+            raise _concurrent_modification()
+        return None
+
+    @replica_read
     def find_by_id(self, user_id: int) -> Optional[DomainUser]:
         user_orm = UserORM.query.get(user_id)
         return user_orm.to_domain_entity() if user_orm else None
 
+    @replica_read
+    def find_by_ids(self, user_ids: List[int]) -> List[DomainUser]:
+        users_orm = UserORM.query.filter(UserORM.id.in_(user_ids)).all()
+        return [user_orm.to_domain_entity() for user_orm in users_orm]
+
+    @replica_read
     def find_by_username(self, username: str) -> Optional[DomainUser]:
         user_orm = UserORM.query.filter_by(username=username).first()
         return user_orm.to_domain_entity() if user_orm else None
 
-    def find_all(self) -> List[DomainUser]:
-        users_orm = UserORM.query.all()
-        return [user_orm.to_domain_entity() for user_orm in users_orm]
+    @replica_read
+    def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainUser]:
+        if fields is None:
+            return [DomainUser(*row) for row in db.session.execute(_user_rows_statement(limit, after_id))]
+
+        rows = db.session.execute(_user_projection_statement(limit, after_id, fields)).all()
+        return [DomainUser(**row._mapping) for row in rows]
+
+    @replica_read
+    def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        return tuple(db.session.execute(_user_fingerprint_statement(limit, after_id)).one())
 
     def delete_by_id(self, user_id: int) -> bool:
         user_orm = UserORM.query.get(user_id)
         if user_orm:
+            # Ids das tarefas removidas em cascata, lidos antes do DELETE para o feed de mudanças
+            task_ids = [task_orm.id for task_orm in user_orm.tasks]
             db.session.delete(user_orm)
+            if self.task_counters:
+                # As tarefas saem em cascata com o usuário, então todos os pares dele zeram
+                db.session.execute(delete(TaskCounterORM).where(TaskCounterORM.assigned_to_id == user_id))
+            db.session.flush()
+            seq = _record_changes(_task_changes_insert(task_ids, datetime.datetime.utcnow())) if task_ids else None
             db.session.commit()
+            _notify_change(self.change_notifier, seq)
             return True
         return False
 
 
 class SQLAlchemyTaskRepository(TaskRepository):
+    def __init__(self, task_counters: bool = False, change_notifier: Optional[ChangeNotifier] = None):
+        # task_counters: mantém a tabela task_counters a cada gravação e responde
+        # count_by_assignee_and_status a partir dela
+        self.task_counters = task_counters
+        # change_notifier: avisado após o commit de cada gravação registrada em task_changes
+        self.change_notifier = change_notifier
+
+    def _count(self, removed=(), added=()) -> None:
+        if self.task_counters:
+            statement = _task_counter_statement(db.session.get_bind().dialect.name, removed, added)
+            if statement is not None:
+                db.session.execute(statement)
+
     def save(self, task: DomainTask) -> DomainTask:
+        removed = ()
         if task.id is None:
             task_orm = TaskORM.from_domain_entity(task)
             db.session.add(task_orm)
@@ -49,28 +625,189 @@ class SQLAlchemyTaskRepository(TaskRepository):
             task_orm = TaskORM.query.get(task.id)
             if not task_orm:
                 raise ValueError("Tarefa não encontrada para atualização.")
+            _check_version(task, task_orm)
+            # O UPDATE confere a versão carregada, então estes são os valores substituídos
+            removed = ((task_orm.assigned_to_id, task_orm.status),)
             task_orm.title = task.title
             task_orm.description = task.description
             task_orm.status = task.status
             task_orm.assigned_to_id = task.assigned_to_id
-        db.session.commit()
+        try:
+            db.session.flush()
+            self._count(removed, ((task_orm.assigned_to_id, task_orm.status),))
+            seq = _record_changes(_task_changes_insert([task_orm.id], datetime.datetime.utcnow()))
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            raise _concurrent_modification()
+        _notify_change(self.change_notifier, seq)
         return task_orm.to_domain_entity()
 
+    def patch(self, task_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainTask]:
+        if self.task_counters and COUNTED_COLUMNS & changes.keys():
+            return self._patch_counted(task_id, changes, expected_version)
+        row = db.session.execute(_task_patch_statement(task_id, changes, expected_version)).first()
+        seq = _record_changes(_task_changes_insert([task_id], row.updated_at)) if row is not None else None
+        db.session.commit()
+        if row is not None:
+            _notify_change(self.change_notifier, seq)
+            return DomainTask(*row)
+        _task_patch_miss(db.session.execute(_task_patch_miss_statement(task_id, changes)).first(),
+                         task_id, changes, expected_version)
+        return None
+
+    def _patch_counted(self, task_id: int, changes: dict, expected_version: Optional[int]) -> Optional[DomainTask]:
+        # O RETURNING só devolve os valores novos: os anteriores são lidos antes e o
+        # UPDATE é condicionado à versão lida, repetindo se outra gravação chegar antes.
+        for _ in range(COUNTED_PATCH_ATTEMPTS):
+            current = db.session.execute(_task_counted_columns_statement(task_id)).first()
+            if current is None:
+                return None
+            version, assigned_to_id, status = current
+            if expected_version is not None and version != expected_version:
+                raise _version_conflict(task_id, version, expected_version)
+            row = db.session.execute(_task_patch_statement(task_id, changes, version)).first()
+            if row is not None:
+                task = DomainTask(*row)
+                self._count(((assigned_to_id, status),), ((task.assigned_to_id, task.status),))
+                seq = _record_changes(_task_changes_insert([task_id], task.updated_at))
+                db.session.commit()
+                _notify_change(self.change_notifier, seq)
+                return task
+            db.session.commit()
+            try:
+                _task_patch_miss(db.session.execute(_task_patch_miss_statement(task_id, changes)).first(),
+                                 task_id, changes, version)
+            except ConcurrentModificationException:
+                if expected_version is not None:
+                    raise
+                continue
+            return None
+        raise _concurrent_modification()
+
+    @replica_read
     def find_by_id(self, task_id: int) -> Optional[DomainTask]:
         task_orm = TaskORM.query.get(task_id)
         return task_orm.to_domain_entity() if task_orm else None
 
-    def find_all(self, assigned_to_id: Optional[int] = None) -> List[DomainTask]:
-        if assigned_to_id:
-            tasks_orm = TaskORM.query.filter_by(assigned_to_id=assigned_to_id).all()
-        else:
-            tasks_orm = TaskORM.query.all()
-        return [task_orm.to_domain_entity() for task_orm in tasks_orm]
+    @replica_read
+    def find_by_ids(self, task_ids: List[int]) -> List[DomainTask]:
+        query = TaskORM.query.options(joinedload(TaskORM.assignee)).filter(TaskORM.id.in_(task_ids))
+        return [task_orm.to_domain_entity() for task_orm in query.all()]
+
+    @replica_read
+    def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return self.find_all_with_assignees(query=query, limit=limit, fields=fields)
+
+    @replica_read
+    def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        query = query or TaskQuery()
+        if fields is not None:
+            statement = _task_projection_statement(query, limit, fields)
+            return [_task_from_row(row) for row in db.session.execute(statement).all()]
+
+        # O JOIN traz o nome do responsável no mesmo SELECT, evitando o lazy-load por tarefa
+        statement = _task_rows_statement(query, limit)
+        return [DomainTask(*row) for row in db.session.execute(statement)]
+
+    @replica_read
+    def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> Iterator[DomainTask]:
+        for row in db.session.execute(_task_export_statement(query or TaskQuery(), batch_size)):
+            yield DomainTask(*row)
+
+    @replica_read
+    def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        statement = _task_fingerprint_statement(query or TaskQuery(), limit)
+        return tuple(db.session.execute(statement).one())
+
+    @replica_read
+    def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        statement = _task_counter_stats_statement() if self.task_counters else _task_stats_statement()
+        return {(assigned_to_id, status): count for assigned_to_id, status, count in db.session.execute(statement)}
+
+    def rebuild_counters(self) -> None:
+        """
+        Recalcula a tabela task_counters a partir das tarefas. Necessário ao ativar
+        task_counters depois de um período em que as gravações não os mantiveram.
+        """
+        for statement in _task_rebuild_counter_statements():
+            db.session.execute(statement)
+        db.session.commit()
 
     def delete_by_id(self, task_id: int) -> bool:
         task_orm = TaskORM.query.get(task_id)
         if task_orm:
             db.session.delete(task_orm)
+            db.session.flush()
+            self._count(removed=((task_orm.assigned_to_id, task_orm.status),))
+            seq = _record_changes(_task_changes_insert([task_id], datetime.datetime.utcnow()))
             db.session.commit()
+            _notify_change(self.change_notifier, seq)
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def save_many(self, tasks: List[DomainTask]) -> List[DomainTask]:
+        now = datetime.datetime.utcnow()
+        new_orms, changes = _prepare_save_many(tasks, now)
+
+        # No Postgres, add_all + flush agrupa os INSERTs em lotes (insertmanyvalues,
+        # com RETURNING dos ids). O UPDATE por chave primária confere a version de
+        # cada linha (por isso sai um comando por linha, dentro da mesma transação).
+        # Tudo é confirmado com um só commit no fim.
+        removed = ()
+        if self.task_counters and changes:
+            current_rows = db.session.execute(_task_counted_rows_statement([change['id'] for change in changes]))
+            removed = _save_many_counted_pairs(changes, current_rows)
+        try:
+            db.session.add_all(new_orms.values())
+            if changes:
+                db.session.execute(update(TaskORM), changes)
+            db.session.flush()
+        except StaleDataError:
+            db.session.rollback()
+            raise _concurrent_modification()
+
+        saved = _saved_tasks(tasks, new_orms, now)
+        self._count(removed, [(task.assigned_to_id, task.status) for task in saved])
+        seq = _record_changes(_task_changes_insert([task.id for task in saved], now)) if saved else None
+        db.session.commit()
+        _notify_change(self.change_notifier, seq)
+        return saved
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        rows = db.session.execute(
+            delete(TaskORM).where(TaskORM.id.in_(task_ids))
+            .returning(TaskORM.id, TaskORM.assigned_to_id, TaskORM.status)
+        ).all()
+        self._count(removed=[(assigned_to_id, status) for _, assigned_to_id, status in rows])
+        now = datetime.datetime.utcnow()
+        seq = _record_changes(_task_changes_insert([row.id for row in rows], now)) if rows else None
+        db.session.commit()
+        _notify_change(self.change_notifier, seq)
+        return [row.id for row in rows]
+
+    def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        # Lido sempre do primário: uma réplica atrasada devolveria um cursor que já
+        # passou de mudanças que ela ainda não recebeu.
+        _check_changes_cursor(since, db.session.execute(_task_changes_bounds_statement()).one())
+        changes = [_task_change_from_row(row) for row in db.session.execute(_task_changes_statement(since, limit))]
+        # Encerra a transação de leitura: no long-poll a espera seguinte não segura conexão do pool
+        db.session.commit()
+        return changes
+
+    def last_change_seq(self) -> int:
+        _, max_seq = db.session.execute(_task_changes_bounds_statement()).one()
+        db.session.commit()
+        return max_seq or 0
+
+    def prune_changes(self, older_than: datetime.datetime) -> int:
+        """
+        Descarta o histórico de mudanças anterior a `older_than` (ver "flask
+        prune-task-changes"). Clientes com cursor anterior recebem 410 no feed e
+        refazem a listagem completa. Retorna o número de linhas removidas.
+        """
+        removed = db.session.execute(_task_changes_prune_statement(older_than)).rowcount
+        db.session.commit()
+        return removed
@@ -0,0 +1,179 @@
+"""
+Fila de trabalhos durável na tabela jobs (migração 6).
+
+DatabaseJobDispatcher grava uma linha por trabalho na API; DatabaseJobWorker
+(executado por worker.py, em um ou mais processos) reserva lotes de linhas com um
+único UPDATE ... RETURNING, executa os handlers em um pool de threads e apaga a linha
+ao concluir ou a reagenda com backoff exponencial. No PostgreSQL a reserva usa
+FOR UPDATE SKIP LOCKED, então vários workers não disputam as mesmas linhas.
+
+Um trabalho reservado por um worker que parou sem concluí-lo volta a ser elegível
+depois de `lease_seconds`; por isso um trabalho pode rodar mais de uma vez.
+"""
+import datetime
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+import sqlalchemy as sa
+from core.ports.job_dispatcher import JobDispatcher
+from infrastructure.database.sqlalchemy_models import JobORM
+from infrastructure.jobs.handlers import JOBS, JobHandler, jobs_for, logger, retry_delay, run_job
+
+jobs_table = JobORM.__table__
+
+MAX_ERROR_LENGTH = 2000
+
+
+def _claim_statement(limit: int, now: datetime.datetime, lease_seconds: float):
+    expired = now - datetime.timedelta(seconds=lease_seconds)
+    candidates = (
+        sa.select(jobs_table.c.id)
+        .where(sa.or_(
+            sa.and_(jobs_table.c.status == 'pending', jobs_table.c.run_at <= now),
+            sa.and_(jobs_table.c.status == 'running', jobs_table.c.locked_at < expired)
+        ))
+        .order_by(jobs_table.c.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        sa.update(jobs_table)
+        .where(jobs_table.c.id.in_(candidates.scalar_subquery()))
+        .values(status='running', locked_at=now, attempts=jobs_table.c.attempts + 1)
+        .returning(jobs_table.c.id, jobs_table.c.name, jobs_table.c.event, jobs_table.c.payload,
+                   jobs_table.c.attempts)
+    )
+
+
+def _owned(job_id: int, attempts: int):
+    # Só quem fez a reserva corrente conclui o trabalho (outro worker pode tê-lo retomado após o lease)
+    return sa.and_(jobs_table.c.id == job_id, jobs_table.c.attempts == attempts, jobs_table.c.status == 'running')
+
+
+def _job_rows(events: Sequence[Tuple[str, dict]], now: datetime.datetime) -> List[dict]:
+    return [
+        {'name': name, 'event': event, 'payload': json.dumps(payload, default=str), 'status': 'pending',
+         'attempts': 0, 'run_at': now, 'created_at': now}
+        for event, payload in events for name in jobs_for(event)
+    ]
+
+
+class DatabaseJobDispatcher(JobDispatcher):
+    """
+    Grava os trabalhos na tabela jobs em uma transação própria, logo depois do commit
+    da gravação que os originou. Os handlers rodam no worker (worker.py), não na API.
+    Se o INSERT falhar, o serviço registra os eventos no log e a gravação segue confirmada.
+    """
+
+    def __init__(self, engine: sa.engine.Engine):
+        self.engine = engine
+
+    def enqueue(self, event: str, payload: dict) -> None:
+        self.enqueue_many([(event, payload)])
+
+    def enqueue_many(self, events: Sequence[Tuple[str, dict]]) -> None:
+        rows = _job_rows(events, datetime.datetime.utcnow())
+        if rows:
+            with self.engine.begin() as connection:
+                connection.execute(sa.insert(jobs_table), rows)
+
+    def stats(self) -> dict:
+        with self.engine.connect() as connection:
+            counts = dict(connection.execute(
+                sa.select(jobs_table.c.status, sa.func.count()).group_by(jobs_table.c.status)
+            ).all())
+            oldest = connection.execute(
+                sa.select(sa.func.min(jobs_table.c.run_at)).where(jobs_table.c.status == 'pending')
+            ).scalar()
+        lag = (datetime.datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        return {
+            'backend': 'database',
+            'pending': counts.get('pending', 0),
+            'running': counts.get('running', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_seconds': max(lag, 0.0)
+        }
+
+
+class DatabaseJobWorker:
+    """
+    Consome a tabela jobs com até `concurrency` trabalhos em paralelo. Cada trabalho
+    tem até `max_attempts` tentativas; depois da última falha fica com status
+    'failed' e o erro em last_error.
+    """
+
+    def __init__(self, engine: sa.engine.Engine, jobs: Dict[str, JobHandler] = JOBS, concurrency: int = 4,
+                 max_attempts: int = 5, backoff: float = 1.0, max_backoff: float = 300.0,
+                 poll_interval: float = 1.0, lease_seconds: float = 300.0):
+        self.engine = engine
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+    def claim(self, limit: int) -> list:
+        """
+        Reserva até `limit` trabalhos prontos para rodar (status running, attempts + 1).
+        """
+        with self.engine.begin() as connection:
+            return connection.execute(_claim_statement(limit, datetime.datetime.utcnow(), self.lease_seconds)).all()
+
+    def process(self, job) -> bool:
+        """
+        Executa um trabalho reservado e registra o resultado. Retorna se ele concluiu.
+        """
+        try:
+            run_job(self.jobs, job.name, job.event, json.loads(job.payload))
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'[:MAX_ERROR_LENGTH]
+            if job.attempts >= self.max_attempts:
+                logger.exception("Trabalho %s (%s) falhou após %s tentativas.", job.id, job.name, job.attempts)
+                values = {'status': 'failed', 'locked_at': None, 'last_error': error}
+            else:
+                delay = retry_delay(job.attempts, self.backoff, self.max_backoff)
+                logger.warning("Trabalho %s (%s) falhou (tentativa %s); nova tentativa em %.1f s: %s",
+                               job.id, job.name, job.attempts, delay, error)
+                values = {'status': 'pending', 'locked_at': None, 'last_error': error,
+                          'run_at': datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)}
+            with self.engine.begin() as connection:
+                connection.execute(sa.update(jobs_table).where(_owned(job.id, job.attempts)).values(**values))
+            return False
+        with self.engine.begin() as connection:
+            connection.execute(sa.delete(jobs_table).where(_owned(job.id, job.attempts)))
+        return True
+
+    def run(self, stop: threading.Event) -> None:
+        """
+        Processa a fila até `stop` ser sinalizado; então para de reservar e espera os
+        trabalhos em andamento terminarem.
+        """
+        slots = threading.Semaphore(self.concurrency)
+
+        def finished(future):
+            slots.release()
+            if future.exception() is not None:
+                # Falha ao registrar o resultado: o trabalho volta a ser elegível quando o lease vencer
+                logger.error("Falha ao registrar o resultado de um trabalho.", exc_info=future.exception())
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job-worker') as executor:
+            while not stop.is_set():
+                if not slots.acquire(timeout=self.poll_interval):
+                    continue
+                free = 1
+                while free < self.concurrency and slots.acquire(blocking=False):
+                    free += 1
+                try:
+                    claimed = self.claim(free)
+                except sa.exc.OperationalError:
+                    logger.exception("Falha ao reservar trabalhos; nova tentativa em %.1f s.", self.poll_interval)
+                    claimed = []
+                for _ in range(free - len(claimed)):
+                    slots.release()
+                for job in claimed:
+                    executor.submit(self.process, job).add_done_callback(finished)
+                if not claimed:
+                    stop.wait(self.poll_interval)
@@ -0,0 +1,60 @@
+"""
+Trabalhos em segundo plano e os eventos em que cada um está inscrito. Um handler é
+registrado com @job(nome, *eventos) e recebe (evento, payload); o mesmo registro é
+usado pelo pool de threads da API e pelo worker da fila no banco (worker.py).
+
+Os trabalhos podem rodar mais de uma vez (nova tentativa depois de uma falha, ou um
+worker que caiu no meio da execução), então precisam tolerar repetição.
+"""
+import json
+import logging
+import random
+from typing import Callable, Dict, List
+
+JobHandler = Callable[[str, dict], None]
+
+JOBS: Dict[str, JobHandler] = {}
+SUBSCRIPTIONS: Dict[str, List[str]] = {}
+
+logger = logging.getLogger('jobs')
+audit_logger = logging.getLogger('audit')
+
+
+def job(name: str, *events: str):
+    def register(fn):
+        JOBS[name] = fn
+        for event in events:
+            SUBSCRIPTIONS.setdefault(event, []).append(name)
+        return fn
+    return register
+
+
+def jobs_for(event: str) -> List[str]:
+    return SUBSCRIPTIONS.get(event, [])
+
+
+def run_job(jobs: Dict[str, JobHandler], name: str, event: str, payload: dict) -> None:
+    handler = jobs.get(name)
+    if handler is None:
+        raise LookupError(f"Trabalho desconhecido: {name!r}.")
+    handler(event, payload)
+
+
+def retry_delay(attempt: int, backoff: float, max_backoff: float) -> float:
+    """
+    Espera antes da tentativa seguinte à `attempt` (a primeira é 1): backoff exponencial
+    limitado a max_backoff, com jitter para não repetir juntos os trabalhos que falharam juntos.
+    """
+    return random.uniform(0.5, 1.0) * min(max_backoff, backoff * 2 ** (attempt - 1))
+
+
+@job('notify_assignee', 'task_assigned')
+def notify_assignee(event: str, payload: dict) -> None:
+    # Ponto de integração com o envio (e-mail, push...); por enquanto a notificação é registrada no log
+    logger.info("Notificação: tarefa %s (%s) atribuída ao usuário %s",
+                payload['task_id'], payload.get('title'), payload['assigned_to_id'])
+
+
+@job('audit_task', 'task_created', 'task_updated', 'task_deleted')
+def audit_task(event: str, payload: dict) -> None:
+    audit_logger.info(json.dumps({'event': event, **payload}, ensure_ascii=False, default=str))
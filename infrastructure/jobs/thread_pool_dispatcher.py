@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Sequence, Tuple
+from core.ports.job_dispatcher import JobDispatcher
+from infrastructure.jobs.handlers import JOBS, JobHandler, jobs_for, logger, retry_delay, run_job
+
+
+class ThreadPoolJobDispatcher(JobDispatcher):
+    """
+    Executa os trabalhos em um pool de threads do próprio processo da API. Não é
+    durável: o que estiver na fila ou aguardando nova tentativa se perde se o processo
+    parar. Com `max_pending` trabalhos pendentes (na fila, rodando ou aguardando nova
+    tentativa) os seguintes são descartados e contados em 'dropped', para que a
+    requisição, que já gravou, não falhe nem espere.
+    """
+
+    def __init__(self, jobs: Dict[str, JobHandler] = JOBS, max_workers: int = 4, max_pending: int = 1000,
+                 max_attempts: int = 5, backoff: float = 1.0, max_backoff: float = 300.0):
+        self.jobs = jobs
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jobs')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counts = {'enqueued': 0, 'succeeded': 0, 'retried': 0, 'failed': 0, 'dropped': 0}
+
+    def _count(self, outcome: str, pending_delta: int = 0) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+            self._pending += pending_delta
+
+    def enqueue(self, event: str, payload: dict) -> None:
+        self.enqueue_many([(event, payload)])
+
+    def enqueue_many(self, events: Sequence[Tuple[str, dict]]) -> None:
+        for event, payload in events:
+            for name in jobs_for(event):
+                with self._lock:
+                    accepted = self._pending < self.max_pending
+                    if accepted:
+                        self._pending += 1
+                        self._counts['enqueued'] += 1
+                    else:
+                        self._counts['dropped'] += 1
+                if accepted:
+                    self._submit(name, event, payload, 1)
+                else:
+                    logger.warning("Fila de trabalhos cheia; %s do evento %s descartado.", name, event)
+
+    def _submit(self, name: str, event: str, payload: dict, attempt: int) -> None:
+        try:
+            self._executor.submit(self._run, name, event, payload, attempt)
+        except RuntimeError:
+            # Pool já encerrado (shutdown)
+            self._count('failed', -1)
+
+    def _run(self, name: str, event: str, payload: dict, attempt: int) -> None:
+        try:
+            run_job(self.jobs, name, event, payload)
+        except Exception:
+            if attempt < self.max_attempts:
+                self._count('retried')
+                timer = threading.Timer(retry_delay(attempt, self.backoff, self.max_backoff),
+                                        self._submit, (name, event, payload, attempt + 1))
+                timer.daemon = True
+                timer.start()
+                return
+            logger.exception("Trabalho %s do evento %s falhou após %s tentativas.", name, event, attempt)
+            self._count('failed', -1)
+            return
+        self._count('succeeded', -1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, backend='thread', pending=self._pending, max_pending=self.max_pending)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,395 @@
+"""
+Adaptadores de repositório em memória (dicionários + índices secundários), úteis para
+testes, para medir o custo dos serviços sem banco e como prova de que as portas de
+core/ports permitem trocar o armazenamento.
+
+Os dois repositórios compartilham um InMemoryStore, que faz o papel do banco: guarda
+usuários e tarefas, mantém os índices (username → id, responsável → ids de tarefas) e
+as contagens por (responsável, status), e aplica as mesmas regras do schema (username único, chave estrangeira do responsável e
+remoção em cascata das tarefas de um usuário).
+
+O feed de mudanças guarda só a última seq de cada tarefa (o que o feed do SQLAlchemy
+devolve), em ordem de seq; não há descarte de histórico, então nenhum cursor expira.
+"""
+import bisect
+import collections
+import copy
+import datetime
+import threading
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from core.domain.entities import User as DomainUser, Task as DomainTask, TaskChange
+from core.domain.exceptions import ConcurrentModificationException
+from core.domain.task_query import TaskQuery
+from core.ports.user_repository import UserRepository
+from core.ports.task_repository import TaskRepository
+from core.ports.change_notifier import ChangeNotifier
+
+
+class InMemoryStore:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users: Dict[int, DomainUser] = {}
+        self.user_ids: List[int] = []
+        self.user_id_by_username: Dict[str, int] = {}
+        self.tasks: Dict[int, DomainTask] = {}
+        self.task_ids: List[int] = []
+        self.task_ids_by_assignee: Dict[int, List[int]] = {}
+        self.task_counts: collections.Counter = collections.Counter()
+        self.next_user_id = 1
+        self.next_task_id = 1
+        # task_id → seq da última mudança, na ordem das seqs (a tarefa mudada vai para o fim)
+        self.task_change_seqs: Dict[int, int] = {}
+        self.last_change_seq = 0
+
+
+def _remove_sorted(ids: List[int], item_id: int) -> None:
+    index = bisect.bisect_left(ids, item_id)
+    if index < len(ids) and ids[index] == item_id:
+        del ids[index]
+
+
+def _record_change(store: InMemoryStore, task_id: int) -> None:
+    # Chamado com o lock adquirido
+    store.task_change_seqs.pop(task_id, None)
+    store.last_change_seq += 1
+    store.task_change_seqs[task_id] = store.last_change_seq
+
+
+def _notify_change(change_notifier: Optional[ChangeNotifier], store: InMemoryStore) -> None:
+    # Chamado depois de soltar o lock; o notificador ignora seqs que já conhece
+    if change_notifier is not None:
+        change_notifier.notify(store.last_change_seq)
+
+
+def _page(ids: List[int], after_id: Optional[int]) -> List[int]:
+    # Paginação keyset sobre a lista ordenada de ids
+    if after_id is None:
+        return ids
+    return ids[bisect.bisect_right(ids, after_id):]
+
+
+def _id_range(ids: List[int], query: TaskQuery) -> List[int]:
+    start = bisect.bisect_left(ids, query.min_id) if query.min_id is not None else 0
+    end = bisect.bisect_right(ids, query.max_id) if query.max_id is not None else len(ids)
+    return ids[start:end]
+
+
+def _matches(task: DomainTask, query: TaskQuery) -> bool:
+    if query.statuses and task.status not in query.statuses:
+        return False
+    if query.search_terms:
+        # Mesma regra da busca por LIKE do adaptador SQLAlchemy: todo termo, sem diferenciar maiúsculas
+        text = f'{task.title} {task.description or ""}'.casefold()
+        return all(term.casefold() in text for term in query.search_terms)
+    return True
+
+
+def _is_after(values: tuple, after: tuple, sort_keys: tuple) -> bool:
+    # Equivalente à condição de keyset do adaptador SQLAlchemy, com direções mistas
+    for value, bound, (_, descending) in zip(values, after, sort_keys):
+        if value != bound:
+            return value < bound if descending else value > bound
+    return False
+
+
+def _next_version(entity, current) -> int:
+    # Mesma regra do version_id_col do ORM: a gravação precisa partir da versão atual
+    if current is None:
+        return 1
+    if entity.version is not None and entity.version != current.version:
+        raise ConcurrentModificationException(
+            f"O registro {entity.id} foi alterado por outra requisição (versão {current.version}, "
+            f"esperada {entity.version})."
+        )
+    return current.version + 1
+
+
+def _fingerprint(entities) -> tuple:
+    # Os mesmos agregados do adaptador SQLAlchemy: count, sum(id), sum(version), max(updated_at)
+    return (
+        len(entities),
+        sum(entity.id for entity in entities),
+        sum(entity.version for entity in entities),
+        max((entity.updated_at for entity in entities), default=None)
+    )
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self, store: InMemoryStore, change_notifier: Optional[ChangeNotifier] = None):
+        self.store = store
+        self.change_notifier = change_notifier
+
+    def save(self, user: DomainUser) -> DomainUser:
+        saved = self._save(user)
+        _notify_change(self.change_notifier, self.store)
+        return saved
+
+    def _save(self, user: DomainUser) -> DomainUser:
+        store = self.store
+        with store.lock:
+            owner_id = store.user_id_by_username.get(user.username)
+            if owner_id is not None and owner_id != user.id:
+                raise ValueError("Username já existe.")
+
+            if user.id is None:
+                user = copy.copy(user)
+                user.id = store.next_user_id
+                user.version = 1
+                store.next_user_id += 1
+                store.user_ids.append(user.id)
+            else:
+                current = store.users.get(user.id)
+                if not current:
+                    raise ValueError("Usuário não encontrado para atualização.")
+                version = _next_version(user, current)
+                del store.user_id_by_username[current.username]
+                if current.nome != user.nome:
+                    # O nome do responsável faz parte das tarefas dele no feed
+                    for task_id in store.task_ids_by_assignee.get(user.id, []):
+                        _record_change(store, task_id)
+                user = copy.copy(user)
+                user.version = version
+            user.updated_at = datetime.datetime.utcnow()
+
+            store.users[user.id] = user
+            store.user_id_by_username[user.username] = user.id
+            return copy.copy(user)
+
+    def patch(self, user_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainUser]:
+        with self.store.lock:
+            current = self.store.users.get(user_id)
+            if not current:
+                return None
+            user = copy.copy(current)
+            for field, value in changes.items():
+                setattr(user, field, value)
+            if expected_version is not None:
+                user.version = expected_version
+            return self.save(user)
+
+    def find_by_id(self, user_id: int) -> Optional[DomainUser]:
+        user = self.store.users.get(user_id)
+        return copy.copy(user) if user else None
+
+    def find_by_ids(self, user_ids: List[int]) -> List[DomainUser]:
+        users = self.store.users
+        return [copy.copy(users[user_id]) for user_id in set(user_ids) if user_id in users]
+
+    def find_by_username(self, username: str) -> Optional[DomainUser]:
+        with self.store.lock:
+            user_id = self.store.user_id_by_username.get(username)
+            return self.find_by_id(user_id) if user_id is not None else None
+
+    def find_all(self, limit: Optional[int] = None, after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainUser]:
+        with self.store.lock:
+            ids = _page(self.store.user_ids, after_id)[:limit]
+            return [copy.copy(self.store.users[user_id]) for user_id in ids]
+
+    def fingerprint(self, limit: Optional[int] = None, after_id: Optional[int] = None) -> tuple:
+        with self.store.lock:
+            ids = _page(self.store.user_ids, after_id)[:limit]
+            return _fingerprint([self.store.users[user_id] for user_id in ids])
+
+    def delete_by_id(self, user_id: int) -> bool:
+        store = self.store
+        with store.lock:
+            user = store.users.pop(user_id, None)
+            if not user:
+                return False
+            _remove_sorted(store.user_ids, user_id)
+            del store.user_id_by_username[user.username]
+            # Remoção em cascata, como o cascade="all, delete-orphan" do UserORM
+            for task_id in store.task_ids_by_assignee.pop(user_id, []):
+                task = store.tasks.pop(task_id)
+                store.task_counts[task.assigned_to_id, task.status] -= 1
+                _remove_sorted(store.task_ids, task_id)
+                _record_change(store, task_id)
+        _notify_change(self.change_notifier, store)
+        return True
+
+
+class InMemoryTaskRepository(TaskRepository):
+    def __init__(self, store: InMemoryStore, change_notifier: Optional[ChangeNotifier] = None):
+        self.store = store
+        self.change_notifier = change_notifier
+
+    def _with_assignee(self, task: DomainTask) -> DomainTask:
+        task = copy.copy(task)
+        assignee = self.store.users.get(task.assigned_to_id)
+        task.assignee_name = assignee.nome if assignee else None
+        return task
+
+    def _store_task(self, task: DomainTask) -> DomainTask:
+        # Chamado com o lock adquirido; valida a chave estrangeira e atualiza os índices
+        store = self.store
+        if task.assigned_to_id not in store.users:
+            raise ValueError(f"Usuário atribuído com ID {task.assigned_to_id} não encontrado.")
+
+        current = None
+        if task.id is not None:
+            current = store.tasks.get(task.id)
+            if not current:
+                raise ValueError("Tarefa não encontrada para atualização.")
+        version = _next_version(task, current)
+
+        task = copy.copy(task)
+        task.assignee_name = None
+        task.version = version
+        task.updated_at = datetime.datetime.utcnow()
+        store.task_counts[task.assigned_to_id, task.status] += 1
+        if current is None:
+            task.id = store.next_task_id
+            store.next_task_id += 1
+            store.task_ids.append(task.id)
+        _record_change(store, task.id)
+        if current is not None:
+            store.task_counts[current.assigned_to_id, current.status] -= 1
+            if current.assigned_to_id == task.assigned_to_id:
+                store.tasks[task.id] = task
+                return task
+            _remove_sorted(store.task_ids_by_assignee[current.assigned_to_id], task.id)
+
+        bisect.insort(store.task_ids_by_assignee.setdefault(task.assigned_to_id, []), task.id)
+        store.tasks[task.id] = task
+        return task
+
+    def _unstore_task(self, task_id: int) -> bool:
+        store = self.store
+        task = store.tasks.pop(task_id, None)
+        if not task:
+            return False
+        _remove_sorted(store.task_ids, task_id)
+        _remove_sorted(store.task_ids_by_assignee[task.assigned_to_id], task_id)
+        store.task_counts[task.assigned_to_id, task.status] -= 1
+        _record_change(store, task_id)
+        return True
+
+    def _candidate_ids(self, assigned_to_id: Optional[int]) -> List[int]:
+        if assigned_to_id:
+            return self.store.task_ids_by_assignee.get(assigned_to_id, [])
+        return self.store.task_ids
+
+    def save(self, task: DomainTask) -> DomainTask:
+        with self.store.lock:
+            saved = self._with_assignee(self._store_task(task))
+        _notify_change(self.change_notifier, self.store)
+        return saved
+
+    def patch(self, task_id: int, changes: dict, expected_version: Optional[int] = None) -> Optional[DomainTask]:
+        with self.store.lock:
+            current = self.store.tasks.get(task_id)
+            if not current:
+                return None
+            task = copy.copy(current)
+            for field, value in changes.items():
+                setattr(task, field, value)
+            if expected_version is not None:
+                task.version = expected_version
+            saved = self._with_assignee(self._store_task(task))
+        _notify_change(self.change_notifier, self.store)
+        return saved
+
+    def find_by_id(self, task_id: int) -> Optional[DomainTask]:
+        with self.store.lock:
+            task = self.store.tasks.get(task_id)
+            return self._with_assignee(task) if task else None
+
+    def find_by_ids(self, task_ids: List[int]) -> List[DomainTask]:
+        with self.store.lock:
+            tasks = self.store.tasks
+            return [self._with_assignee(tasks[task_id]) for task_id in set(task_ids) if task_id in tasks]
+
+    def find_all(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        return self.find_all_with_assignees(query=query, limit=limit, fields=fields)
+
+    def find_all_with_assignees(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None,
+                                fields: Optional[Sequence[str]] = None) -> List[DomainTask]:
+        query = query or TaskQuery()
+        tasks = self.store.tasks
+        with self.store.lock:
+            ids = _id_range(self._candidate_ids(query.assigned_to_id), query)
+            if query.is_default_sort:
+                # Os ids já estão em ordem: pagina por bisect e para ao completar a página
+                result = []
+                for task_id in _page(ids, query.after[0] if query.after else None):
+                    if _matches(tasks[task_id], query):
+                        result.append(self._with_assignee(tasks[task_id]))
+                        if limit is not None and len(result) == limit:
+                            break
+                return result
+
+            matching = [tasks[task_id] for task_id in ids if _matches(tasks[task_id], query)]
+            # Ordenações estáveis da última chave para a primeira
+            for field, descending in reversed(query.sort_keys):
+                matching.sort(key=attrgetter(field), reverse=descending)
+            if query.after is not None:
+                matching = [task for task in matching if _is_after(query.keyset(task), query.after, query.sort_keys)]
+            return [self._with_assignee(task) for task in matching[:limit]]
+
+    def iter_all(self, query: Optional[TaskQuery] = None, batch_size: int = 1000) -> Iterator[DomainTask]:
+        # Percorre em lotes para não segurar o lock durante toda a iteração
+        query = query or TaskQuery()
+        while True:
+            batch = self.find_all_with_assignees(query=query, limit=batch_size)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            query = query.after_keyset(query.keyset(batch[-1]))
+
+    def fingerprint(self, query: Optional[TaskQuery] = None, limit: Optional[int] = None) -> tuple:
+        with self.store.lock:
+            tasks = self.find_all_with_assignees(query=query, limit=limit)
+            users = self.store.users
+            assignee_versions = sum(users[task.assigned_to_id].version for task in tasks)
+            return _fingerprint(tasks) + (assignee_versions,)
+
+    def count_by_assignee_and_status(self) -> Dict[Tuple[int, str], int]:
+        with self.store.lock:
+            return {key: count for key, count in self.store.task_counts.items() if count > 0}
+
+    def delete_by_id(self, task_id: int) -> bool:
+        with self.store.lock:
+            deleted = self._unstore_task(task_id)
+        _notify_change(self.change_notifier, self.store)
+        return deleted
+
+    def save_many(self, tasks: List[DomainTask]) -> List[DomainTask]:
+        with self.store.lock:
+            # Valida o lote inteiro antes de gravar, como a transação única do SQLAlchemy
+            for task in tasks:
+                if task.assigned_to_id not in self.store.users:
+                    raise ValueError(f"Usuário atribuído com ID {task.assigned_to_id} não encontrado.")
+                if task.id is not None:
+                    if task.id not in self.store.tasks:
+                        raise ValueError("Tarefa não encontrada para atualização.")
+                    _next_version(task, self.store.tasks[task.id])
+            saved = [self._store_task(task) for task in tasks]
+        _notify_change(self.change_notifier, self.store)
+        return saved
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        with self.store.lock:
+            deleted = [task_id for task_id in task_ids if self._unstore_task(task_id)]
+        _notify_change(self.change_notifier, self.store)
+        return deleted
+
+    def find_changes(self, since: int, limit: int) -> List[TaskChange]:
+        with self.store.lock:
+            # Percorre do fim (mudanças mais recentes) até alcançar o cursor
+            recent = []
+            for task_id in reversed(self.store.task_change_seqs):
+                seq = self.store.task_change_seqs[task_id]
+                if seq <= since:
+                    break
+                recent.append((seq, task_id))
+            changes = []
+            for seq, task_id in reversed(recent[-limit:] if limit else []):
+                task = self.store.tasks.get(task_id)
+                changes.append(TaskChange(seq, task_id, self._with_assignee(task) if task else None))
+            return changes
+
+    def last_change_seq(self) -> int:
+        return self.store.last_change_seq
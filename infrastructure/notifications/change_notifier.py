@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from typing import List, Tuple
+from core.ports.change_notifier import ChangeNotifier
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+class InProcessChangeNotifier(ChangeNotifier):
+    """
+    Guarda a maior sequência confirmada por este processo; quem espera dorme em uma
+    Condition até ela passar do seu cursor, sem consultar o banco. Como a condição é
+    "maior que o cursor" (e não "houve um aviso"), um aviso entre a última consulta e
+    o início da espera não se perde.
+
+    No modo ASGI a espera é wait_async, um Future do event loop acordado por notify,
+    sem ocupar uma thread por cliente esperando.
+
+    Só enxerga as gravações feitas neste processo: com vários workers, as mudanças
+    gravadas pelos outros chegam pela consulta periódica do serviço
+    (TASK_CHANGES_POLL_INTERVAL) ou na próxima requisição do cliente.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._latest = 0
+        self._async_waiters: List[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def notify(self, seq: int) -> None:
+        with self._condition:
+            if seq <= self._latest:
+                return
+            self._latest = seq
+            self._condition.notify_all()
+            ready = [waiter for waiter in self._async_waiters if seq > waiter[0]]
+            self._async_waiters = [waiter for waiter in self._async_waiters if seq <= waiter[0]]
+        for _, loop, future in ready:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def wait(self, since: int, timeout: float) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._latest > since, timeout)
+
+    async def wait_async(self, since: int, timeout: float) -> bool:
+        """
+        Como wait, mas esperando no event loop corrente em vez de bloquear a thread.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (since, loop, future)
+        with self._condition:
+            if self._latest > since:
+                return True
+            self._async_waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._condition:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
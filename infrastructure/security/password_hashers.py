@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from core.domain.exceptions import PasswordHasherBusyException
+from core.ports.password_hasher import PasswordHasher
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+
+class ScryptPasswordHasher(PasswordHasher):
+    """
+    Hash de senhas com scrypt (hashlib). O custo é controlado por n (CPU/memória),
+    r (tamanho do bloco) e p (paralelismo). Formato: scrypt$n$r$p$salt$hash.
+
+    Valores que não estão nesse formato são tratados como senhas legadas em texto
+    puro: verify compara em tempo constante e needs_rehash pede a migração.
+    """
+
+    PREFIX = 'scrypt'
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, salt_size: int = 16, key_size: int = 32):
+        if n < 2 or n & (n - 1):
+            raise ValueError("n deve ser uma potência de 2 maior que 1.")
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+        self.key_size = key_size
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int, key_size: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+            maxmem=256 * n * r * p + 1024 * 1024, dklen=key_size
+        )
+
+    def _parse(self, hashed: str):
+        parts = hashed.split('$')
+        if len(parts) != 6 or parts[0] != self.PREFIX:
+            return None
+        try:
+            return int(parts[1]), int(parts[2]), int(parts[3]), _b64decode(parts[4]), _b64decode(parts[5])
+        except ValueError:
+            return None
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self.salt_size)
+        key = self._derive(password, salt, self.n, self.r, self.p, self.key_size)
+        return f'{self.PREFIX}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(key)}'
+
+    def verify(self, password: str, hashed: str) -> bool:
+        parsed = self._parse(hashed)
+        if parsed is None:
+            return hmac.compare_digest(password.encode('utf-8'), hashed.encode('utf-8'))
+        n, r, p, salt, key = parsed
+        return hmac.compare_digest(self._derive(password, salt, n, r, p, len(key)), key)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        parsed = self._parse(hashed)
+        if parsed is None:
+            return True
+        n, r, p, _, key = parsed
+        return (n, r, p, len(key)) != (self.n, self.r, self.p, self.key_size)
+
+
+class PooledPasswordHasher(PasswordHasher):
+    """
+    Executa hash/verify de outro PasswordHasher em um pool limitado de threads
+    (o scrypt do hashlib libera o GIL). No máximo `max_workers` cálculos rodam ao
+    mesmo tempo e no máximo `max_pending` esperam na fila; além disso a chamada
+    desiste após `acquire_timeout` segundos com PasswordHasherBusyException, em vez
+    de prender o worker enquanto uma rajada de logins consome toda a CPU.
+    """
+
+    def __init__(self, inner: PasswordHasher, max_workers: int = None, max_pending: int = 32,
+                 acquire_timeout: float = 2.0):
+        self.inner = inner
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.acquire_timeout = acquire_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(self.max_workers + max_pending)
+
+    def submit(self, fn, *args, acquire_timeout: float = None) -> Future:
+        """
+        Agenda fn(*args) no pool e devolve o Future. `acquire_timeout` sobrescreve o
+        tempo de espera por uma vaga (0 desiste na hora, útil dentro de um event loop).
+        """
+        timeout = self.acquire_timeout if acquire_timeout is None else acquire_timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PasswordHasherBusyException("Serviço de autenticação sobrecarregado, tente novamente.")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, password: str) -> str:
+        return self.submit(self.inner.hash, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.submit(self.inner.verify, password, hashed).result()
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self.inner.needs_rehash(hashed)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,139 @@
+"""
+Coalescência de leituras idênticas simultâneas (single-flight): quando várias
+requisições com a mesma chave (método, rota, query string, If-None-Match e escopo de
+autorização) chegam juntas, só a primeira executa a rota; as demais esperam e recebem
+uma cópia da mesma resposta, com o mesmo corpo já serializado.
+
+Com `micro_cache_ttl` > 0 a resposta pronta continua servindo a mesma chave por esse
+tempo (só 200 e 304). Uma escrita bem-sucedida neste processo descarta as respostas
+guardadas e impede que novas leituras se juntem às que já estavam em andamento, então
+quem escreveu lê o próprio resultado. Cada processo coalesce sozinho.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+from flask import Response, request
+
+CACHEABLE_STATUSES = (200, 304)
+
+
+class FrozenResponse(NamedTuple):
+    body: bytes
+    status: int
+    headers: List[Tuple[str, str]]
+
+    @classmethod
+    def from_response(cls, response: Response) -> 'FrozenResponse':
+        return cls(response.get_data(), response.status_code, list(response.headers.items()))
+
+    def to_response(self) -> Response:
+        # Um objeto novo por requisição: os hooks seguintes (compressão, Vary, métricas) o alteram
+        return Response(self.body, self.status, self.headers)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'generation')
+
+    def __init__(self, generation: int):
+        self.done = threading.Event()
+        self.result: Optional[FrozenResponse] = None
+        self.error: Optional[BaseException] = None
+        self.generation = generation
+
+
+def request_key(scope: Hashable) -> tuple:
+    """
+    Chave da requisição corrente. A query string entra como veio, já que ela faz parte
+    da ETag das listagens; If-None-Match entra porque decide entre 200 e 304.
+    """
+    return (request.method, request.path, request.query_string, request.headers.get('If-None-Match'), scope)
+
+
+class RequestCoalescer:
+    """
+    Registro das execuções em andamento por chave e, opcionalmente, das respostas
+    recentes (LRU limitado a `max_keys` chaves).
+    """
+
+    def __init__(self, micro_cache_ttl: float = 0, max_keys: int = 10000):
+        self.micro_cache_ttl = micro_cache_ttl  # segundos; 0 só compartilha execuções simultâneas
+        self.max_keys = max_keys
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._recent: "OrderedDict[Hashable, Tuple[FrozenResponse, float]]" = OrderedDict()  # chave -> (resposta, expira em)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counts = {'requests': 0, 'executions': 0, 'coalesced': 0, 'micro_cache_hits': 0, 'invalidations': 0}
+
+    def run(self, key: Hashable, compute: Callable[[], FrozenResponse]) -> FrozenResponse:
+        """
+        Retorna a resposta de `key`: a guardada, a da execução em andamento (esperando
+        por ela) ou a de `compute()`, executada aqui. Uma exceção de compute é
+        propagada a todas as requisições que esperavam por ela.
+        """
+        with self._lock:
+            self._counts['requests'] += 1
+            recent = self._recent.get(key)
+            if recent is not None:
+                if recent[1] > time.monotonic():
+                    self._counts['micro_cache_hits'] += 1
+                    return recent[0]
+                del self._recent[key]
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call(self._generation)
+                self._counts['executions'] += 1
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = compute()
+            except BaseException as e:
+                call.error = e
+            finally:
+                self._finish(key, call)
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is call:
+                del self._in_flight[key]
+            # Uma escrita durante a execução pode tê-la deixado desatualizada: não é guardada
+            if (self.micro_cache_ttl > 0 and call.error is None and call.generation == self._generation
+                    and call.result.status in CACHEABLE_STATUSES):
+                self._recent[key] = (call.result, time.monotonic() + self.micro_cache_ttl)
+                self._recent.move_to_end(key)
+                while len(self._recent) > self.max_keys:
+                    self._recent.popitem(last=False)
+        call.done.set()
+
+    def invalidate(self) -> None:
+        """
+        Chamado depois de uma escrita: descarta as respostas guardadas, e as leituras
+        que chegarem daqui em diante não esperam pelas execuções já em andamento.
+        """
+        with self._lock:
+            self._generation += 1
+            self._recent.clear()
+            self._in_flight.clear()
+            self._counts['invalidations'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            in_flight, cached = len(self._in_flight), len(self._recent)
+        shared = counts['coalesced'] + counts['micro_cache_hits']
+        return dict(
+            counts,
+            coalesce_ratio=shared / counts['requests'] if counts['requests'] else 0.0,
+            in_flight=in_flight,
+            micro_cache_size=cached,
+            micro_cache_ttl_ms=self.micro_cache_ttl * 1000,
+            max_keys=self.max_keys
+        )
@@ -0,0 +1,122 @@
+"""
+Compressão negociada (Accept-Encoding) das respostas do blueprint da API:
+brotli, se o pacote opcional `brotli` estiver instalado e o cliente aceitar, ou gzip.
+
+Respostas comuns só são comprimidas a partir de `min_size` bytes; respostas em
+streaming (ex.: /tasks/export) são comprimidas incrementalmente, bloco a bloco,
+sem acumular o corpo inteiro.
+"""
+import zlib
+from typing import Iterable, Iterator, Optional, Sequence
+from flask import request
+from infrastructure.web.instrumentation import phase
+
+try:
+    import brotli
+except ImportError:  # dependência opcional: sem ela só gzip é oferecido
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/plain', 'text/html')
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        # wbits=31: formato gzip (cabeçalho + CRC), não zlib puro
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # Z_SYNC_FLUSH: entrega ao cliente tudo o que já foi comprimido sem fechar o stream
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ResponseCompressor:
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_level: int = 4,
+                 flush_size: int = 16384, mimetypes: Sequence[str] = COMPRESSIBLE_MIMETYPES):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+        # Em streaming, força um flush a cada `flush_size` bytes de entrada: limita
+        # quanto o cliente espera sem dar flush a cada linha (o que arruinaria a taxa).
+        self.flush_size = flush_size
+        self.mimetypes = set(mimetypes)
+
+    def _choose_encoding(self) -> Optional[str]:
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _stream(self, encoding: str):
+        return _BrotliStream(self.brotli_level) if encoding == 'br' else _GzipStream(self.gzip_level)
+
+    def _compress_iter(self, chunks: Iterable, encoding: str) -> Iterator[bytes]:
+        stream = self._stream(encoding)
+        pending = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = stream.compress(chunk)
+                pending += len(chunk)
+                if pending >= self.flush_size:
+                    data += stream.flush()
+                    pending = 0
+                if data:
+                    yield data
+            yield stream.finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def compress_response(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self._choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_iter(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            with phase('compress'):
+                stream = self._stream(encoding)
+                response.set_data(stream.compress(data) + stream.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        # Como o nginx: o corpo comprimido é outra sequência de bytes, então a ETag
+        # deixa de ser forte. If-None-Match (comparação fraca) continua dando 304.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,85 @@
+"""
+Requisições condicionais: ETags fortes calculadas a partir de versões e
+fingerprints dos repositórios (sem serializar o corpo), 304 para If-None-Match /
+If-Modified-Since e conferência de If-Match para concorrência otimista.
+Também define a política de cache HTTP (Cache-Control / Vary) de cada rota.
+"""
+import hashlib
+import re
+from functools import wraps
+from typing import Optional, Sequence
+from flask import current_app, make_response, request
+from werkzeug.http import is_resource_modified
+
+
+def make_etag(*parts) -> str:
+    """
+    ETag forte a partir de valores que mudam sempre que a representação muda
+    (versões, fingerprints, query string).
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def task_etag(task) -> str:
+    # O nome do responsável faz parte da representação da tarefa. O id e a versão ficam
+    # legíveis no início, para que If-Match vire a versão esperada do UPDATE (if_match_version)
+    return f"{task.id}.{task.version}-{make_etag('task', task.id, task.version, task.assignee_name)}"
+
+
+def user_etag(user) -> str:
+    return make_etag('user', user.id, user.version)
+
+
+def collection_etag(name: str, fingerprint: tuple) -> str:
+    # A query string (filtros, página, fields) também muda a representação
+    return make_etag(name, request.query_string, fingerprint)
+
+
+def not_modified(etag: str, last_modified=None):
+    """
+    Retorna uma resposta 304 se o cliente já tem esta versão do recurso, None caso contrário.
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = current_app.response_class(status=304)
+    return with_validators(response, etag, last_modified)
+
+
+def if_match_version(task_id: int) -> Optional[int]:
+    """
+    Versão da tarefa exigida pelo If-Match, lida das ETags enviadas (ver task_etag),
+    para ser conferida pelo próprio UPDATE no primário em vez de uma leitura prévia.
+    Retorna None se nenhuma ETag forte enviada é desta tarefa ou se elas citam versões
+    diferentes (o UPDATE confere uma só). Para If-Match o nome do responsável não conta:
+    só uma gravação da tarefa invalida a versão que o cliente viu.
+    """
+    versions = set()
+    for etag in request.if_match.as_set():
+        match = re.fullmatch(r'(\d+)\.(\d+)-[0-9a-f]+', etag)
+        if match and int(match.group(1)) == task_id:
+            versions.add(int(match.group(2)))
+    return versions.pop() if len(versions) == 1 else None
+
+
+def with_validators(response, etag: str, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def cache_policy(cache_control: str, vary: Sequence[str] = ()):
+    """
+    Decorador de rota que define Cache-Control e acrescenta cabeçalhos a Vary em
+    todas as respostas da rota (inclusive 304 e erros).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            response = make_response(f(*args, **kwargs))
+            response.headers['Cache-Control'] = cache_control
+            for header in vary:
+                response.vary.add(header)
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,40 @@
+"""
+Dependências das rotas, montadas pela fábrica da aplicação (create_app em app.py,
+create_asgi_app em asgi.py) e guardadas em app.extensions['api'].
+
+Os adaptadores web as usam por meio de proxies resolvidos a cada acesso no app da
+requisição corrente, então vários apps com configurações diferentes (ex.: um por
+teste ou por cenário de benchmark) convivem no mesmo processo.
+"""
+from werkzeug.local import LocalProxy
+
+EXTENSION = 'api'
+
+
+class ApiDependencies:
+    def __init__(self, user_service, task_service, secret_key: str, principal_cache=None, password_hasher=None,
+                 job_dispatcher=None, request_metrics=None, compressor=None, rate_limiter=None,
+                 coalescer=None, pool_status_provider=None):
+        self.user_service = user_service
+        self.task_service = task_service
+        self.secret_key = secret_key
+        self.principal_cache = principal_cache
+        self.password_hasher = password_hasher
+        self.job_dispatcher = job_dispatcher
+        self.request_metrics = request_metrics
+        self.compressor = compressor
+        self.rate_limiter = rate_limiter
+        self.coalescer = coalescer
+        self.pool_status_provider = pool_status_provider
+
+    def init_app(self, app, blueprint) -> None:
+        app.extensions[EXTENSION] = self
+        app.register_blueprint(blueprint)
+
+
+def dependency(current_app, name: str):
+    """
+    Proxy para o atributo `name` das ApiDependencies do app corrente (`current_app`
+    do Flask ou do Quart). Um componente desligado (None) é falso no proxy também.
+    """
+    return LocalProxy(lambda: getattr(current_app.extensions[EXTENSION], name))
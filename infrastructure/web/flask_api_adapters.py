@@ -1,20 +1,90 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 import jwt
 import datetime
 import os
+import time
 from functools import wraps
 from application.user_service_impl import UserServiceImpl
 from application.task_service_impl import TaskServiceImpl
 from core.domain.entities import User, Task
-from core.domain.exceptions import UserNotFoundException, InvalidCredentialsException, UsernameAlreadyExistsException, TaskNotFoundException, DomainError
+from core.ports.principal_cache import PrincipalCache
+from core.ports.job_dispatcher import JobDispatcher
+from infrastructure.web.listing import parse_changes_args, parse_listing_args, parse_task_query_args, listing_payload
+from infrastructure.web.instrumentation import RequestInstrumentation, phase
+from infrastructure.web.rate_limit import RateLimiter
+from infrastructure.web.compression import ResponseCompressor
+from infrastructure.web.coalescing import FrozenResponse, RequestCoalescer, request_key
+from infrastructure.web.dependencies import dependency
+from infrastructure.web.conditional import (
+    cache_policy, collection_etag, if_match_version, not_modified, task_etag, user_etag, with_validators,
+)
+from core.domain.exceptions import UserNotFoundException, InvalidCredentialsException, UsernameAlreadyExistsException, TaskNotFoundException, DomainError, PasswordHasherBusyException, ConcurrentModificationException, ChangesExpiredException
 
 
 api_bp = Blueprint('api', __name__)
 
 
-user_service: UserServiceImpl = None
-task_service: TaskServiceImpl = None
-secret_key: str = None
+# Montadas por create_app (app.py) em app.extensions['api']; resolvidas no app da requisição
+user_service: UserServiceImpl = dependency(current_app, 'user_service')
+task_service: TaskServiceImpl = dependency(current_app, 'task_service')
+secret_key: str = dependency(current_app, 'secret_key')
+principal_cache: PrincipalCache = dependency(current_app, 'principal_cache')
+pool_status_provider = dependency(current_app, 'pool_status_provider')
+request_metrics: RequestInstrumentation = dependency(current_app, 'request_metrics')
+compressor: ResponseCompressor = dependency(current_app, 'compressor')
+rate_limiter: RateLimiter = dependency(current_app, 'rate_limiter')
+job_dispatcher: JobDispatcher = dependency(current_app, 'job_dispatcher')
+coalescer: RequestCoalescer = dependency(current_app, 'coalescer')
+
+MAX_BULK_ITEMS = 1000
+
+# Leituras autenticadas: só o cache do próprio cliente pode guardar, e sempre
+# revalidando pela ETag (o que costuma render um 304 barato). A resposta depende do token.
+private_revalidate = cache_policy('private, no-cache', vary=('x-access-token',))
+
+
+@api_bp.after_request
+def default_cache_policy(response):
+    # Rotas sem cache_policy (escritas, login, métricas, exportação) não são guardadas por caches
+    response.headers.setdefault('Cache-Control', 'no-store')
+    return response
+
+
+# Os componentes opcionais são do app, não do blueprint (que é registrado em vários
+# apps), então os hooks são fixos e delegam ao que o app corrente tiver ligado.
+@api_bp.before_request
+def before_api_request():
+    if request_metrics:
+        request_metrics.before_request()
+
+
+@api_bp.after_request
+def after_api_request(response):
+    # Roda antes de default_cache_policy. A vaga do limitador é liberada no fim do
+    # envio; a instrumentação fecha por último, para que o total inclua a compressão.
+    if coalescer and request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+        coalescer.invalidate()
+    if rate_limiter:
+        response = rate_limiter.after_request(response)
+    if compressor:
+        response = compressor.compress_response(response)
+    if request_metrics:
+        response = request_metrics.after_request(response)
+    return response
+
+
+@api_bp.teardown_request
+def teardown_api_request(exception=None):
+    if rate_limiter:
+        rate_limiter.teardown_request(exception)
+
+
+def _admit(client: str):
+    # Resposta 429 se o cliente passou dos limites; None se pode seguir (ou sem limitador)
+    if not rate_limiter:
+        return None
+    with phase('rate_limit'):
+        return rate_limiter.admit(client)
 
 
 def token_required(f):
@@ -24,30 +94,110 @@ def token_required(f):
         if 'x-access-token' in request.headers:
             token = request.headers['x-access-token']
 
+        # Token já verificado e ainda em cache: dispensa jwt.decode e a consulta ao banco
+        current_user_domain = principal_cache.get(token) if token and principal_cache else None
+        if current_user_domain is None:
+            # A verificação custa jwt.decode e uma consulta: limitada pelo IP antes de
+            # acontecer, para que tokens inválidos ou expirados não escapem do limitador
+            rejected = _admit(f'ip:{request.remote_addr}')
+            if rejected is not None:
+                return rejected
+
         if not token:
             return jsonify({'message': 'Token de autenticação está faltando!'}), 401
 
         try:
-            data = jwt.decode(token, secret_key, algorithms=["HS256"])
-            current_user_domain = user_service.get_user_by_id(data['user_id'])
-            if not current_user_domain:
-                return jsonify({'message': 'Token inválido ou usuário não encontrado!'}), 401
+            with phase('auth'):
+                if current_user_domain is None:
+                    data = jwt.decode(token, secret_key, algorithms=["HS256"])
+                    current_user_domain = user_service.get_user_by_id(data['user_id'])
+                    if not current_user_domain:
+                        return jsonify({'message': 'Token inválido ou usuário não encontrado!'}), 401
+                    if principal_cache:
+                        principal_cache.put(token, current_user_domain, data['exp'])
         except Exception as e:
             return jsonify({'message': 'Token é inválido ou expirado!', 'error': str(e)}), 401
 
+        rejected = _admit(f'user:{current_user_domain.id}')
+        if rejected is not None:
+            return rejected
         return f(current_user_domain, *args, **kwargs)
     return decorated
 
+def authenticated_scope(current_user: User):
+    # As listagens são as mesmas para qualquer usuário autenticado (token_required já validou o token)
+    return 'authenticated'
+
+
+def coalesced(scope=authenticated_scope):
+    """
+    Decorador (abaixo de token_required) de leituras caras: requisições idênticas
+    simultâneas do mesmo escopo de autorização compartilham uma execução da rota e o
+    corpo serializado. `scope(current_user)` deve distinguir quem pode ver respostas
+    diferentes. Só para respostas que não são streaming.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            if not coalescer:
+                return f(current_user, *args, **kwargs)
+
+            def compute():
+                return FrozenResponse.from_response(current_app.make_response(f(current_user, *args, **kwargs)))
+
+            with phase('coalesce'):
+                frozen = coalescer.run(request_key(scope(current_user)), compute)
+            return frozen.to_response()
+        return decorated
+    return decorator
+
+def _listing_response(entities, limit, fields, keyset=None):
+    return jsonify(listing_payload(entities, limit, fields, keyset))
+
+def _bulk_payload():
+    """
+    Lê o corpo de uma operação em lote: uma lista JSON não vazia de até MAX_BULK_ITEMS itens.
+    Lança ValueError se o corpo for inválido.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        raise ValueError("O corpo deve ser uma lista JSON não vazia.")
+    if len(data) > MAX_BULK_ITEMS:
+        raise ValueError(f"O lote aceita no máximo {MAX_BULK_ITEMS} itens.")
+    return data
+
+
+def _bulk_response(results, success_status):
+    """
+    Monta a resposta de um lote com o resultado de cada item, na ordem da entrada.
+    Responde 207 (Multi-Status) se algum item falhou.
+    """
+    items = []
+    failed = 0
+    for index, result in enumerate(results):
+        if isinstance(result, Task):
+            items.append({'index': index, 'status': success_status, 'task': result.to_dict()})
+        else:
+            failed += 1
+            status = 404 if isinstance(result, TaskNotFoundException) else 400
+            items.append({'index': index, 'status': status, 'erro': str(result)})
+    body = {'results': items, 'succeeded': len(items) - failed, 'failed': failed}
+    return jsonify(body), 207 if failed else success_status
+
 # Rotas de Autenticação
 @api_bp.route('/auth/login', methods=['POST'])
 def login():
+    # Sem usuário ainda: o cliente é o IP (o hash de senha é o que mais pesa aqui)
+    rejected = _admit(f'ip:{request.remote_addr}')
+    if rejected is not None:
+        return rejected
     auth = request.get_json()
     if not auth or not auth.get('username') or not auth.get('password'):
         return jsonify({'message': 'Credenciais de login inválidas!'}), 401
 
     try:
-        user_domain = user_service.get_user_by_username(auth['username'])
-        if not user_domain or user_domain.password != auth['password']: 
+        user_domain = user_service.authenticate(auth['username'], auth['password'])
+        if not user_domain: 
             raise InvalidCredentialsException("Nome de usuário ou senha incorretos!")
 
         token = jwt.encode({
@@ -58,6 +208,8 @@ def login():
         return jsonify({'token': token})
     except InvalidCredentialsException as e:
         return jsonify({'message': str(e)}), 401
+    except PasswordHasherBusyException as e:
+        return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({"erro": "Erro interno ao tentar login."}), 500
 
@@ -66,19 +218,77 @@ def login():
 def logout(current_user):
     return jsonify({'message': 'Logout realizado com sucesso (token descartado pelo cliente).'})
 
+@api_bp.route('/auth/principal-cache/stats', methods=['GET'])
+@token_required
+def principal_cache_stats(current_user: User):
+    if not principal_cache:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **principal_cache.stats()})
+
+# Rotas de Métricas
+@api_bp.route('/metrics/db-pool', methods=['GET'])
+@token_required
+def db_pool_metrics(current_user: User):
+    if not pool_status_provider:
+        return jsonify({"erro": "Métricas do pool indisponíveis."}), 404
+    return jsonify(pool_status_provider())
+
+@api_bp.route('/metrics', methods=['GET'])
+@token_required
+def request_metrics_route(current_user: User):
+    if not request_metrics:
+        return jsonify({"erro": "Instrumentação de requisições desativada."}), 404
+    return jsonify(request_metrics.snapshot())
+
+@api_bp.route('/metrics/rate-limit', methods=['GET'])
+@token_required
+def rate_limit_metrics(current_user: User):
+    if not rate_limiter:
+        return jsonify({"erro": "Limite de requisições desativado."}), 404
+    return jsonify(rate_limiter.stats())
+
+@api_bp.route('/metrics/coalescing', methods=['GET'])
+@token_required
+def coalescing_metrics(current_user: User):
+    if not coalescer:
+        return jsonify({"erro": "Coalescência de requisições desativada."}), 404
+    return jsonify(coalescer.stats())
+
+@api_bp.route('/metrics/jobs', methods=['GET'])
+@token_required
+def job_metrics(current_user: User):
+    if not job_dispatcher:
+        return jsonify({"erro": "Trabalhos em segundo plano desativados."}), 404
+    return jsonify(job_dispatcher.stats())
+
 # Rotas de Usuários
 @api_bp.route('/users', methods=['GET'])
+@private_revalidate
 @token_required
+@coalesced()
 def get_all_users(current_user: User):
-    users = user_service.get_all_users()
-    return jsonify([user.to_dict() for user in users])
+    try:
+        limit, after_id, fields = parse_listing_args(request.args, User.FIELDS)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    window = limit + 1 if limit else None
+
+    # A ETag vem de um agregado barato; só se ela mudou a página é lida e serializada
+    etag = collection_etag('users', user_service.get_users_fingerprint(limit=window, after_id=after_id))
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    users = user_service.get_all_users(limit=window, after_id=after_id, fields=fields)
+    return with_validators(_listing_response(users, limit, fields), etag)
 
 @api_bp.route('/users/<int:user_id>', methods=['GET'])
+@private_revalidate
 @token_required
 def get_user_by_id(current_user: User, user_id: int):
     user = user_service.get_user_by_id(user_id)
     if user:
-        return jsonify(user.to_dict())
+        etag = user_etag(user)
+        return not_modified(etag, user.updated_at) or with_validators(jsonify(user.to_dict()), etag, user.updated_at)
     return jsonify({"erro": "Usuário não encontrado"}), 404
 
 @api_bp.route('/users', methods=['POST'])
@@ -90,23 +300,29 @@ def create_user(current_user: User):
         return jsonify(new_user.to_dict()), 201
     except (ValueError, UsernameAlreadyExistsException) as e:
         return jsonify({"erro": str(e)}), 400
+    except PasswordHasherBusyException as e:
+        return jsonify({"erro": str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({"erro": "Erro interno ao criar usuário."}), 500
 
-@api_bp.route('/users/<int:user_id>', methods=['PUT'])
+@api_bp.route('/users/<int:user_id>', methods=['PUT', 'PATCH'])
 @token_required
 def update_user(current_user: User, user_id: int):
     data = request.get_json()
     try:
         updated_user = user_service.update_user(user_id, data)
         if updated_user:
-            return jsonify(updated_user.to_dict())
+            return with_validators(jsonify(updated_user.to_dict()), user_etag(updated_user), updated_user.updated_at)
         
         return jsonify({"erro": "Usuário não encontrado"}), 404
     except (ValueError, UsernameAlreadyExistsException) as e:
         return jsonify({"erro": str(e)}), 400
     except UserNotFoundException as e:
         return jsonify({"erro": str(e)}), 404
+    except ConcurrentModificationException as e:
+        return jsonify({"erro": str(e)}), 409
+    except PasswordHasherBusyException as e:
+        return jsonify({"erro": str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         
         return jsonify({"erro": "Erro interno ao atualizar usuário."}), 500
@@ -125,18 +341,113 @@ def delete_user(current_user: User, user_id: int):
 
 # Rotas de Tarefas
 @api_bp.route('/tasks', methods=['GET'])
+@private_revalidate
 @token_required
+@coalesced()
 def get_all_tasks(current_user: User):
-    assigned_to_username = request.args.get('assignedTo')
-    tasks = task_service.get_all_tasks(assigned_to_username=assigned_to_username)
-    return jsonify([task.to_dict() for task in tasks])
+    try:
+        limit, after, fields = parse_listing_args(request.args, Task.FIELDS, keyset=True)
+        query = task_service.build_task_query(after=after, **parse_task_query_args(request.args))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    window = limit + 1 if limit else None
+
+    # query None: o responsável pedido não existe, então a listagem é vazia
+    etag = collection_etag('tasks', task_service.get_tasks_fingerprint(query, limit=window) if query else ())
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    tasks = task_service.get_all_tasks(query, limit=window, fields=fields) if query else []
+    return with_validators(_listing_response(tasks, limit, fields, query.keyset if query else None), etag)
+
+@api_bp.route('/tasks/export', methods=['GET'])
+@token_required
+def export_tasks(current_user: User):
+    try:
+        query = task_service.build_task_query(**parse_task_query_args(request.args))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+
+    def generate():
+        if query is None:
+            return
+        # Uma tarefa por linha (NDJSON): nada além do lote corrente fica em memória
+        for task in task_service.iter_all_tasks(query):
+            yield current_app.json.dumps(task.to_dict()) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api_bp.route('/tasks/stats', methods=['GET'])
+@token_required
+@coalesced()
+def get_task_stats(current_user: User):
+    return jsonify(task_service.get_task_stats())
+
+# Feed de mudanças: ?since=<cursor>&limit=<n>&wait=<segundos>. Sem since devolve só o
+# cursor atual; com wait segura a requisição até haver mudança (long-poll); com
+# "Accept: text/event-stream" responde SSE. 410 se o histórico não alcança o cursor.
+@api_bp.route('/tasks/changes', methods=['GET'])
+@token_required
+def get_task_changes(current_user: User):
+    stream = request.accept_mimetypes.best_match(['application/json', 'text/event-stream']) == 'text/event-stream'
+    try:
+        since, limit, wait = parse_changes_args(request.args, current_app.config['TASK_CHANGES_MAX_WAIT'],
+                                                request.headers.get('Last-Event-ID') if stream else None)
+        # No SSE a primeira leitura é feita aqui, para que o 410 saia antes do stream começar
+        changes, cursor, has_more = task_service.get_task_changes(since, limit, 0 if stream else wait)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    except ChangesExpiredException as e:
+        return jsonify({"erro": str(e)}), 410
+    if stream:
+        return _task_changes_stream(changes, cursor, has_more, limit)
+    return jsonify({'changes': [change.to_dict() for change in changes], 'cursor': cursor, 'has_more': has_more})
+
+def _sse_event(event: str, data: dict, event_id=None) -> str:
+    lines = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{lines}event: {event}\ndata: {current_app.json.dumps(data)}\n\n'
+
+def _task_changes_stream(changes, cursor, has_more, limit):
+    """
+    Stream SSE do feed a partir do cursor já lido pela rota: um evento "changes" por
+    lote (com id = cursor, que o EventSource reenvia em Last-Event-ID ao reconectar),
+    comentários de keepalive a cada TASK_CHANGES_SSE_HEARTBEAT segundos sem mudança, e
+    fim após TASK_CHANGES_SSE_MAX_SECONDS (o cliente reconecta de onde parou).
+    """
+    heartbeat = current_app.config['TASK_CHANGES_SSE_HEARTBEAT']
+    deadline = time.monotonic() + current_app.config['TASK_CHANGES_SSE_MAX_SECONDS']
+
+    def generate():
+        nonlocal changes, cursor, has_more
+        # Primeiro evento sempre sai, com o cursor de partida (útil quando a conexão veio sem since)
+        yield _sse_event('changes', {'changes': [change.to_dict() for change in changes], 'cursor': cursor}, cursor)
+        while time.monotonic() < deadline:
+            wait = 0 if has_more else min(heartbeat, deadline - time.monotonic())
+            try:
+                changes, cursor, has_more = task_service.get_task_changes(cursor, limit, wait)
+            except ChangesExpiredException as e:
+                yield _sse_event('expired', {'erro': str(e)})
+                return
+            if changes:
+                yield _sse_event('changes', {'changes': [change.to_dict() for change in changes], 'cursor': cursor},
+                                 cursor)
+            else:
+                yield ': keepalive\n\n'
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Sem buffer em proxies (nginx), para que cada evento chegue assim que gravado
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @api_bp.route('/tasks/<int:task_id>', methods=['GET'])
+@private_revalidate
 @token_required
 def get_task_by_id(current_user: User, task_id: int):
     task = task_service.get_task_by_id(task_id)
     if task:
-        return jsonify(task.to_dict())
+        etag = task_etag(task)
+        return (not_modified(etag, task.updated_at)
+                or with_validators(jsonify(task.to_dict()), etag, task.updated_at))
     return jsonify({"erro": "Tarefa não encontrada"}), 404
 
 @api_bp.route('/tasks', methods=['POST'])
@@ -151,23 +462,84 @@ def create_task(current_user: User):
     except Exception as e:
         return jsonify({"erro": "Erro interno ao criar tarefa."}), 500
 
-@api_bp.route('/tasks/<int:task_id>', methods=['PUT'])
+@api_bp.route('/tasks/<int:task_id>', methods=['PUT', 'PATCH'])
 @token_required
 def update_task_route(current_user: User, task_id: int):
     data = request.get_json()
     try:
-        updated_task = task_service.update_task(task_id, data)
+        expected_version = None
+        if request.if_match and not request.if_match.star_tag:
+            # If-Match: só atualiza se o cliente viu a versão atual. A versão vem da ETag
+            # e é conferida pelo UPDATE no primário (412 via ConcurrentModificationException),
+            # sem ler antes a tarefa de uma réplica ou do cache, que podem estar atrasados.
+            expected_version = if_match_version(task_id)
+            if expected_version is None:
+                return jsonify({"erro": "A tarefa foi alterada desde a última leitura."}), 412
+
+        updated_task = task_service.update_task(task_id, data, expected_version=expected_version)
         if updated_task:
-            return jsonify(updated_task.to_dict())
+            return with_validators(jsonify(updated_task.to_dict()), task_etag(updated_task), updated_task.updated_at)
         
         return jsonify({"erro": "Tarefa não encontrada"}), 404
     except (ValueError, UserNotFoundException) as e:
         return jsonify({"erro": str(e)}), 400
     except TaskNotFoundException as e: 
         return jsonify({"erro": str(e)}), 404
+    except ConcurrentModificationException as e:
+        return jsonify({"erro": str(e)}), 412 if request.if_match else 409
     except Exception as e:
         return jsonify({"erro": "Erro interno ao atualizar tarefa."}), 500
 
+@api_bp.route('/tasks/bulk', methods=['POST'])
+@token_required
+def create_tasks_bulk(current_user: User):
+    try:
+        data = _bulk_payload()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    try:
+        return _bulk_response(task_service.create_tasks(data), 201)
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao criar tarefas em lote."}), 500
+
+@api_bp.route('/tasks/bulk', methods=['PATCH'])
+@token_required
+def update_tasks_bulk(current_user: User):
+    try:
+        data = _bulk_payload()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    try:
+        return _bulk_response(task_service.update_tasks(data), 200)
+    except ConcurrentModificationException as e:
+        return jsonify({"erro": str(e)}), 409
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao atualizar tarefas em lote."}), 500
+
+@api_bp.route('/tasks/bulk', methods=['DELETE'])
+@token_required
+def delete_tasks_bulk(current_user: User):
+    try:
+        task_ids = _bulk_payload()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    try:
+        deleted = task_service.delete_tasks(task_ids)
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao deletar tarefas em lote."}), 500
+
+    items = []
+    failed = 0
+    for index, (task_id, result) in enumerate(zip(task_ids, deleted)):
+        if result is True:
+            items.append({'index': index, 'id': task_id, 'status': 200})
+        else:
+            failed += 1
+            status = 404 if isinstance(result, TaskNotFoundException) else 400
+            items.append({'index': index, 'id': task_id, 'status': status, 'erro': str(result)})
+    body = {'results': items, 'succeeded': len(items) - failed, 'failed': failed}
+    return jsonify(body), 207 if failed else 200
+
 @api_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @token_required
 def delete_task_route(current_user: User, task_id: int):
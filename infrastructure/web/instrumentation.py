@@ -0,0 +1,256 @@
+"""
+Instrumentação opcional por requisição (INSTRUMENTATION_ENABLED=true).
+
+Mede, para cada requisição do blueprint, o número e o tempo das consultas SQL
+(eventos do SQLAlchemy), o tempo de cada método dos serviços, da autenticação e
+da serialização JSON. O resultado volta no cabeçalho Server-Timing e alimenta os
+histogramas expostos em /metrics. Com um diretório de perfis configurado, um
+profiler por amostragem grava as pilhas das requisições lentas no formato
+"folded" (uma pilha por linha + contagem), pronto para flamegraph.pl ou speedscope.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, Optional
+from flask import g, has_request_context, request
+from flask.json.provider import JSONProvider
+
+# Limites superiores (ms) dos buckets dos histogramas; o último bucket é +Inf
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+
+    def to_dict(self) -> dict:
+        # Buckets cumulativos, como nos histogramas do Prometheus
+        buckets = {}
+        total = 0
+        for bound, count in zip(BUCKETS_MS + ('+Inf',), self.counts):
+            total += count
+            buckets[str(bound)] = total
+        return {'count': self.count, 'sum_ms': self.sum_ms, 'buckets': buckets}
+
+
+class RequestTimings:
+    """Tempos acumulados durante uma requisição (guardado em flask.g)."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return g.get('request_timings') if has_request_context() else None
+
+
+@contextmanager
+def phase(name: str):
+    """Mede o bloco como uma fase da requisição corrente; sem instrumentação não faz nada."""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+class TimedService:
+    """
+    Proxy que mede cada método público do serviço envolvido como a fase
+    "<nome>.<método>". Geradores são medidos só na criação.
+    """
+
+    def __init__(self, inner, name: str):
+        self._inner = inner
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._inner, attr)
+        if attr.startswith('_') or not callable(value):
+            return value
+        phase_name = f'{self._name}.{attr}'
+
+        @wraps(value)
+        def timed(*args, **kwargs):
+            with phase(phase_name):
+                return value(*args, **kwargs)
+        return timed
+
+
+class TimingJSONProvider(JSONProvider):
+    """Envolve o provider JSON do app e mede a serialização como a fase "serialize"."""
+
+    def __init__(self, app, inner: JSONProvider):
+        super().__init__(app)
+        self.inner = inner
+
+    def dumps(self, obj, **kwargs) -> str:
+        with phase('serialize'):
+            return self.inner.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return self.inner.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        with phase('serialize'):
+            return self.inner.response(*args, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Mede a execução no driver; o fetch das linhas e a conversão em entidades
+    # entram no tempo do método de serviço que fez a consulta.
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    timings = current_timings()
+    if timings is not None:
+        timings.sql_count += 1
+        timings.sql_seconds += elapsed
+
+
+def _folded_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SlowRequestProfiler:
+    """
+    Profiler por amostragem: uma thread em segundo plano lê a pilha das threads
+    que estão atendendo requisições a cada `interval` segundos. Ao fim da
+    requisição as amostras são descartadas, ou gravadas em `output_dir` se ela foi lenta.
+    """
+
+    def __init__(self, output_dir: str, interval: float = 0.005):
+        self.output_dir = output_dir
+        self.interval = interval
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start_request(self) -> None:
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+                self._thread.start()
+
+    def stop_request(self) -> Counter:
+        with self._lock:
+            return self._active.pop(threading.get_ident(), Counter())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[_folded_stack(frame)] += 1
+
+    def dump(self, samples: Counter, label: str) -> Optional[str]:
+        if not samples:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = ''.join(c if c.isalnum() else '_' for c in label).strip('_')
+        path = os.path.join(self.output_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{safe_label}-{os.getpid()}.folded')
+        with open(path, 'w') as file:
+            for stack, count in samples.most_common():
+                file.write(f'{stack} {count}\n')
+        return path
+
+
+class RequestInstrumentation:
+    """
+    Mede as requisições da API e as consultas dos engines (o principal e as réplicas
+    de leitura) e agrega os histogramas por rota
+    (duração total e tempo de SQL) e por fase (auth, métodos dos serviços, serialize).
+    """
+
+    def __init__(self, slow_request_ms: float = 500.0, profiler: Optional[SlowRequestProfiler] = None):
+        self.slow_request_ms = slow_request_ms
+        self.profiler = profiler
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Histogram]] = {}
+        self._phases: Dict[str, Histogram] = {}
+        self._sql_queries = 0
+        self._slow_requests = 0
+
+    def init_app(self, app, engines: Iterable = ()) -> None:
+        # before_request/after_request são chamados pelos hooks do blueprint da API
+        from sqlalchemy import event
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        app.json = TimingJSONProvider(app, app.json)
+
+    def before_request(self):
+        g.request_timings = RequestTimings()
+        if self.profiler:
+            self.profiler.start_request()
+
+    def after_request(self, response):
+        timings: RequestTimings = g.pop('request_timings', None)
+        if timings is None:
+            return response
+        total_ms = (time.perf_counter() - timings.start) * 1000
+        route = f'{request.method} {request.url_rule.rule if request.url_rule else "<desconhecida>"}'
+
+        server_timing = [f'sql;dur={timings.sql_seconds * 1000:.2f};desc="{timings.sql_count} queries"']
+        server_timing += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.phases.items()]
+        server_timing.append(f'total;dur={total_ms:.2f}')
+        response.headers['Server-Timing'] = ', '.join(server_timing)
+
+        slow = total_ms >= self.slow_request_ms
+        with self._lock:
+            histograms = self._routes.setdefault(route, {'duration': Histogram(), 'sql': Histogram()})
+            histograms['duration'].observe(total_ms)
+            histograms['sql'].observe(timings.sql_seconds * 1000)
+            for name, seconds in timings.phases.items():
+                self._phases.setdefault(name, Histogram()).observe(seconds * 1000)
+            self._sql_queries += timings.sql_count
+            self._slow_requests += slow
+
+        if self.profiler:
+            samples = self.profiler.stop_request()
+            if slow:
+                self.profiler.dump(samples, route)
+        return response
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'slow_request_ms': self.slow_request_ms,
+                'slow_requests': self._slow_requests,
+                'sql_queries': self._sql_queries,
+                'routes': {route: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                           for route, histograms in self._routes.items()},
+                'phases': {name: histogram.to_dict() for name, histogram in self._phases.items()}
+            }
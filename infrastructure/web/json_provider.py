@@ -0,0 +1,45 @@
+"""
+Provider JSON do Flask baseado no orjson (JSON_PROVIDER=orjson, padrão quando o
+pacote está instalado). O orjson serializa em C direto para bytes, sem a string
+intermediária do módulo json da biblioteca padrão.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: sem ela o app usa o DefaultJSONProvider
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Usa orjson em dumps/loads/response. O que o orjson não sabe serializar
+    (Decimal, UUID, objetos com __html__...) passa pelo `default` do Flask.
+    Diferença de formato: datetimes saem em ISO 8601, não no formato HTTP-date.
+    """
+
+    # As entidades já montam os dicionários em ordem fixa; ordenar só custaria tempo
+    sort_keys = False
+
+    def _option(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
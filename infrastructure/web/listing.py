@@ -0,0 +1,154 @@
+"""
+Paginação por cursor, projeção de campos e critérios de busca das listagens, comuns
+aos adaptadores web síncrono (Flask) e assíncrono (Quart).
+"""
+import base64
+import binascii
+import datetime
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _is_digits(value: str) -> bool:
+    # str.isdigit aceita caracteres como "²", que int() recusa; só dígitos ASCII
+    return value.isascii() and value.isdigit()
+
+
+def encode_cursor(values: tuple) -> str:
+    """
+    Cursor opaco com os valores de ordenação da última entidade da página. Na
+    ordenação padrão (só id) continua sendo o próprio id, como antes.
+    """
+    if len(values) == 1 and isinstance(values[0], int):
+        return str(values[0])
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime.datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    if _is_digits(cursor):
+        return (int(cursor),)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise ValueError("cursor inválido.")
+    if not isinstance(values, list):
+        raise ValueError("cursor inválido.")
+    return tuple(values)
+
+
+def parse_listing_args(args, allowed_fields, keyset: bool = False):
+    """
+    Lê limit, cursor e fields da query string (`args`) de uma listagem.
+    Retorna (limit, after, fields); limit é None quando a listagem não é paginada.
+    after é o id do cursor ou, com keyset=True, a tupla de valores de decode_cursor.
+    Lança ValueError se algum parâmetro for inválido.
+    """
+    limit = args.get('limit')
+    cursor = args.get('cursor')
+    fields = args.get('fields')
+
+    if limit is not None:
+        if not _is_digits(limit) or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit deve ser um inteiro entre 1 e {MAX_PAGE_SIZE}.")
+        limit = int(limit)
+
+    after = None
+    if cursor:
+        if keyset:
+            after = decode_cursor(cursor)
+        elif not _is_digits(cursor):
+            raise ValueError("cursor inválido.")
+        else:
+            after = int(cursor)
+        if limit is None:
+            limit = DEFAULT_PAGE_SIZE
+
+    if fields is not None:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        invalid = [field for field in fields if field not in allowed_fields]
+        if not fields:
+            raise ValueError("fields não pode ser vazio.")
+        if invalid:
+            raise ValueError(f"fields inválidos: {', '.join(invalid)}. Permitidos: {', '.join(allowed_fields)}.")
+
+    return limit, after, fields
+
+
+def parse_task_query_args(args) -> dict:
+    """
+    Lê os filtros, a busca e a ordenação de uma listagem de tarefas:
+        assignedTo=<username>  status=pending,done  minId=10  maxId=500
+        q=<termos buscados em título e descrição>  sort=-updated_at,title
+    Retorna os argumentos nomeados de TaskServiceImpl.build_task_query (que valida
+    o conteúdo). Lança ValueError se algum parâmetro for malformado.
+    """
+    criteria = {'assigned_to_username': args.get('assignedTo')}
+    status = args.get('status')
+    if status:
+        criteria['statuses'] = [value.strip() for value in status.split(',') if value.strip()]
+    for name, key in (('minId', 'min_id'), ('maxId', 'max_id')):
+        value = args.get(name)
+        if value is not None:
+            if not _is_digits(value):
+                raise ValueError(f"{name} deve ser um inteiro não negativo.")
+            criteria[key] = int(value)
+    if args.get('q') is not None:
+        criteria['search'] = args.get('q')
+    sort = args.get('sort')
+    if sort is not None:
+        keys = [key.strip() for key in sort.split(',') if key.strip()]
+        if not keys:
+            raise ValueError("sort não pode ser vazio.")
+        # "-campo" ordena de forma decrescente
+        criteria['sort'] = [(key[1:], True) if key.startswith('-') else (key, False) for key in keys]
+    return criteria
+
+
+def parse_changes_args(args, max_wait: float, last_event_id=None):
+    """
+    Lê since, limit e wait do feed de mudanças (GET /tasks/changes). since é None
+    quando o cliente ainda não tem cursor; o cabeçalho Last-Event-ID (reconexão de um
+    EventSource) vale como since. wait, em segundos, é limitado a `max_wait`.
+    Retorna (since, limit, wait). Lança ValueError se algum parâmetro for inválido.
+    """
+    since = last_event_id or args.get('since')
+    if since is not None:
+        if not _is_digits(since):
+            raise ValueError("since deve ser um inteiro não negativo.")
+        since = int(since)
+
+    limit = args.get('limit')
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    elif not _is_digits(limit) or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit deve ser um inteiro entre 1 e {MAX_PAGE_SIZE}.")
+    limit = int(limit)
+
+    wait = args.get('wait', '0')
+    try:
+        wait = float(wait)
+    except ValueError:
+        raise ValueError("wait deve ser um número de segundos.")
+    if not 0 <= wait < float('inf'):
+        raise ValueError("wait deve ser um número de segundos.")
+    return since, limit, min(wait, max_wait)
+
+
+def listing_payload(entities, limit, fields, keyset=None):
+    """
+    Sem paginação devolve a lista simples; com paginação devolve items + next_cursor.
+    Espera receber até limit + 1 entidades para saber se existe próxima página.
+    `keyset` extrai da última entidade os valores do cursor (padrão: só o id).
+    """
+    if limit is None:
+        return [entity.to_dict(fields) for entity in entities]
+
+    has_more = len(entities) > limit
+    page = entities[:limit]
+    return {
+        'items': [entity.to_dict(fields) for entity in page],
+        'next_cursor': encode_cursor(keyset(page[-1]) if keyset else (page[-1].id,)) if has_more else None
+    }
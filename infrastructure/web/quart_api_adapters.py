@@ -0,0 +1,262 @@
+"""
+Adaptador web assíncrono (Quart/ASGI). Expõe as rotas principais de flask_api_adapters
+com handlers async; a lógica continua nos mesmos serviços, executados por run_service().
+"""
+from quart import Blueprint, Response, current_app, jsonify, request
+import jwt
+import datetime
+import time
+from functools import wraps
+from application.user_service_impl import UserServiceImpl
+from application.task_service_impl import TaskServiceImpl
+from core.domain.entities import User, Task
+from core.ports.principal_cache import PrincipalCache
+from core.domain.exceptions import UserNotFoundException, InvalidCredentialsException, UsernameAlreadyExistsException, TaskNotFoundException, PasswordHasherBusyException, ConcurrentModificationException, ChangesExpiredException
+from infrastructure.async_bridge import run_service
+from infrastructure.web.listing import parse_changes_args, parse_listing_args, parse_task_query_args, listing_payload
+from infrastructure.web.dependencies import dependency
+
+
+async_api_bp = Blueprint('async_api', __name__)
+
+
+# Montadas por create_asgi_app (asgi.py) em app.extensions['api']
+user_service: UserServiceImpl = dependency(current_app, 'user_service')
+task_service: TaskServiceImpl = dependency(current_app, 'task_service')
+secret_key: str = dependency(current_app, 'secret_key')
+principal_cache: PrincipalCache = dependency(current_app, 'principal_cache')
+
+
+def token_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        token = request.headers.get('x-access-token')
+        if not token:
+            return jsonify({'message': 'Token de autenticação está faltando!'}), 401
+
+        try:
+            current_user_domain = principal_cache.get(token) if principal_cache else None
+            if current_user_domain is None:
+                data = jwt.decode(token, secret_key, algorithms=["HS256"])
+                current_user_domain = await run_service(user_service.get_user_by_id, data['user_id'])
+                if not current_user_domain:
+                    return jsonify({'message': 'Token inválido ou usuário não encontrado!'}), 401
+                if principal_cache:
+                    principal_cache.put(token, current_user_domain, data['exp'])
+        except Exception as e:
+            return jsonify({'message': 'Token é inválido ou expirado!', 'error': str(e)}), 401
+
+        return await f(current_user_domain, *args, **kwargs)
+    return decorated
+
+# Rotas de Autenticação
+@async_api_bp.route('/auth/login', methods=['POST'])
+async def login():
+    auth = await request.get_json()
+    if not auth or not auth.get('username') or not auth.get('password'):
+        return jsonify({'message': 'Credenciais de login inválidas!'}), 401
+
+    try:
+        user_domain = await run_service(user_service.authenticate, auth['username'], auth['password'])
+        if not user_domain:
+            raise InvalidCredentialsException("Nome de usuário ou senha incorretos!")
+
+        token = jwt.encode({
+            'user_id': user_domain.id,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(minutes=30)
+        }, secret_key, algorithm="HS256")
+
+        return jsonify({'token': token})
+    except InvalidCredentialsException as e:
+        return jsonify({'message': str(e)}), 401
+    except PasswordHasherBusyException as e:
+        return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao tentar login."}), 500
+
+# Rotas de Usuários
+@async_api_bp.route('/users', methods=['GET'])
+@token_required
+async def get_all_users(current_user: User):
+    try:
+        limit, after_id, fields = parse_listing_args(request.args, User.FIELDS)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    users = await run_service(user_service.get_all_users, limit=limit + 1 if limit else None,
+                              after_id=after_id, fields=fields)
+    return jsonify(listing_payload(users, limit, fields))
+
+@async_api_bp.route('/users/<int:user_id>', methods=['GET'])
+@token_required
+async def get_user_by_id(current_user: User, user_id: int):
+    user = await run_service(user_service.get_user_by_id, user_id)
+    if user:
+        return jsonify(user.to_dict())
+    return jsonify({"erro": "Usuário não encontrado"}), 404
+
+@async_api_bp.route('/users', methods=['POST'])
+@token_required
+async def create_user(current_user: User):
+    data = await request.get_json()
+    try:
+        new_user = await run_service(user_service.create_user, data)
+        return jsonify(new_user.to_dict()), 201
+    except (ValueError, UsernameAlreadyExistsException) as e:
+        return jsonify({"erro": str(e)}), 400
+    except PasswordHasherBusyException as e:
+        return jsonify({"erro": str(e)}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao criar usuário."}), 500
+
+@async_api_bp.route('/users/<int:user_id>', methods=['PUT', 'PATCH'])
+@token_required
+async def update_user(current_user: User, user_id: int):
+    data = await request.get_json()
+    try:
+        updated_user = await run_service(user_service.update_user, user_id, data)
+        if updated_user:
+            return jsonify(updated_user.to_dict())
+        return jsonify({"erro": "Usuário não encontrado"}), 404
+    except (ValueError, UsernameAlreadyExistsException) as e:
+        return jsonify({"erro": str(e)}), 400
+    except UserNotFoundException as e:
+        return jsonify({"erro": str(e)}), 404
+    except ConcurrentModificationException as e:
+        return jsonify({"erro": str(e)}), 409
+    except PasswordHasherBusyException as e:
+        return jsonify({"erro": str(e)}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao atualizar usuário."}), 500
+
+@async_api_bp.route('/users/<int:user_id>', methods=['DELETE'])
+@token_required
+async def delete_user(current_user: User, user_id: int):
+    try:
+        if await run_service(user_service.delete_user, user_id):
+            return jsonify({"mensagem": f"Usuário {user_id} removido com sucesso"})
+        return jsonify({"erro": "Usuário não encontrado"}), 404
+    except UserNotFoundException as e:
+        return jsonify({"erro": str(e)}), 404
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao deletar usuário."}), 500
+
+# Rotas de Tarefas
+@async_api_bp.route('/tasks', methods=['GET'])
+@token_required
+async def get_all_tasks(current_user: User):
+    try:
+        limit, after, fields = parse_listing_args(request.args, Task.FIELDS, keyset=True)
+        query = await run_service(task_service.build_task_query, after=after, **parse_task_query_args(request.args))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    if query is None:
+        return jsonify(listing_payload([], limit, fields))
+    tasks = await run_service(task_service.get_all_tasks, query, limit=limit + 1 if limit else None, fields=fields)
+    return jsonify(listing_payload(tasks, limit, fields, query.keyset))
+
+@async_api_bp.route('/tasks/stats', methods=['GET'])
+@token_required
+async def get_task_stats(current_user: User):
+    return jsonify(await run_service(task_service.get_task_stats))
+
+# Mesmo contrato de flask_api_adapters.get_task_changes. A espera (long-poll / SSE) é a
+# do serviço, com o AwaitingChangeNotifier montado em asgi.py: suspende a requisição sem
+# bloquear o event loop, e as gravações deste app a acordam.
+@async_api_bp.route('/tasks/changes', methods=['GET'])
+@token_required
+async def get_task_changes(current_user: User):
+    stream = request.accept_mimetypes.best_match(['application/json', 'text/event-stream']) == 'text/event-stream'
+    try:
+        since, limit, wait = parse_changes_args(request.args, current_app.config['TASK_CHANGES_MAX_WAIT'],
+                                                request.headers.get('Last-Event-ID') if stream else None)
+        changes, cursor, has_more = await run_service(task_service.get_task_changes, since, limit,
+                                                      0 if stream else wait)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    except ChangesExpiredException as e:
+        return jsonify({"erro": str(e)}), 410
+    if stream:
+        return _task_changes_stream(changes, cursor, has_more, limit)
+    return jsonify({'changes': [change.to_dict() for change in changes], 'cursor': cursor, 'has_more': has_more})
+
+def _task_changes_stream(changes, cursor, has_more, limit):
+    # Mesmo stream SSE de flask_api_adapters._task_changes_stream
+    heartbeat = current_app.config['TASK_CHANGES_SSE_HEARTBEAT']
+    max_seconds = current_app.config['TASK_CHANGES_SSE_MAX_SECONDS']
+    dumps = current_app.json.dumps
+    service = task_service._get_current_object()
+
+    def event(name: str, data: dict, event_id=None) -> bytes:
+        lines = f'id: {event_id}\n' if event_id is not None else ''
+        return f'{lines}event: {name}\ndata: {dumps(data)}\n\n'.encode()
+
+    async def generate():
+        nonlocal changes, cursor, has_more
+        deadline = time.monotonic() + max_seconds
+        yield event('changes', {'changes': [change.to_dict() for change in changes], 'cursor': cursor}, cursor)
+        while time.monotonic() < deadline:
+            wait = 0 if has_more else min(heartbeat, deadline - time.monotonic())
+            try:
+                changes, cursor, has_more = await run_service(service.get_task_changes, cursor, limit, wait)
+            except ChangesExpiredException as e:
+                yield event('expired', {'erro': str(e)})
+                return
+            if changes:
+                yield event('changes', {'changes': [change.to_dict() for change in changes], 'cursor': cursor}, cursor)
+            else:
+                yield b': keepalive\n\n'
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None  # o stream termina sozinho em TASK_CHANGES_SSE_MAX_SECONDS
+    return response
+
+@async_api_bp.route('/tasks/<int:task_id>', methods=['GET'])
+@token_required
+async def get_task_by_id(current_user: User, task_id: int):
+    task = await run_service(task_service.get_task_by_id, task_id)
+    if task:
+        return jsonify(task.to_dict())
+    return jsonify({"erro": "Tarefa não encontrada"}), 404
+
+@async_api_bp.route('/tasks', methods=['POST'])
+@token_required
+async def create_task(current_user: User):
+    data = await request.get_json()
+    try:
+        new_task = await run_service(task_service.create_task, data)
+        return jsonify(new_task.to_dict()), 201
+    except (ValueError, UserNotFoundException) as e:
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao criar tarefa."}), 500
+
+@async_api_bp.route('/tasks/<int:task_id>', methods=['PUT', 'PATCH'])
+@token_required
+async def update_task_route(current_user: User, task_id: int):
+    data = await request.get_json()
+    try:
+        updated_task = await run_service(task_service.update_task, task_id, data)
+        if updated_task:
+            return jsonify(updated_task.to_dict())
+        return jsonify({"erro": "Tarefa não encontrada"}), 404
+    except (ValueError, UserNotFoundException) as e:
+        return jsonify({"erro": str(e)}), 400
+    except TaskNotFoundException as e:
+        return jsonify({"erro": str(e)}), 404
+    except ConcurrentModificationException as e:
+        return jsonify({"erro": str(e)}), 409
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao atualizar tarefa."}), 500
+
+@async_api_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
+@token_required
+async def delete_task_route(current_user: User, task_id: int):
+    try:
+        if await run_service(task_service.delete_task, task_id):
+            return jsonify({"mensagem": f"Tarefa {task_id} removida com sucesso"})
+        return jsonify({"erro": "Tarefa não encontrada"}), 404
+    except TaskNotFoundException as e:
+        return jsonify({"erro": str(e)}), 404
+    except Exception as e:
+        return jsonify({"erro": "Erro interno ao deletar tarefa."}), 500
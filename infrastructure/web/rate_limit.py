@@ -0,0 +1,219 @@
+"""
+Controle de admissão da API: limite de taxa por cliente (token bucket) e limite de
+requisições simultâneas por cliente, ambos respondendo 429 com Retry-After.
+
+O cliente é o usuário autenticado (token_required) ou o IP de origem: no login e,
+antes de verificar o token, em toda requisição cujo token não está no cache de tokens
+já verificados (tokens inválidos ou expirados também consomem o balde do IP). Atrás
+de um proxy reverso o IP vem de X-Forwarded-For (TRUSTED_PROXY_COUNT em app.py). Uma
+rota pode ter o seu próprio limite; as demais compartilham o balde padrão do cliente.
+O estado fica em um RateLimitStore: InMemoryRateLimitStore vale por processo (cada
+worker aplica os limites sozinho); um backend compartilhado entre processos (ex.:
+Redis) só precisa implementar a interface.
+"""
+import math
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+from flask import g, jsonify, request
+
+
+class Limit(NamedTuple):
+    rate: float  # fichas repostas por segundo
+    burst: int   # capacidade do balde: quantas requisições seguidas um cliente parado pode fazer
+
+
+PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60, 'h': 3600, 'hour': 3600}
+
+
+def parse_limit(spec: str) -> Limit:
+    """
+    Lê "20/s", "600/min" ou "5/min:10" (capacidade explícita; por padrão igual à quantidade).
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*([a-z]+)\s*(?::\s*(\d+))?\s*', spec)
+    if not match or match.group(2) not in PERIODS or int(match.group(1)) == 0 or match.group(3) == '0':
+        raise ValueError(f"Limite de taxa inválido: {spec!r} (use, por exemplo, '20/s' ou '600/min:50').")
+    count = int(match.group(1))
+    return Limit(count / PERIODS[match.group(2)], int(match.group(3) or count))
+
+
+def parse_route_limits(spec: str) -> Dict[str, Limit]:
+    """
+    Lê "POST /auth/login=10/min; GET /tasks=10/s:20" como {rota: Limit}. A rota usa o
+    formato "MÉTODO regra" do Flask, como nas métricas (ex.: "GET /tasks/<int:task_id>").
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(';'))):
+        route, separator, limit = item.rpartition('=')
+        if not separator or not route.strip():
+            raise ValueError(f"Limite por rota inválido: {item!r} (use 'MÉTODO /rota=20/s').")
+        limits[' '.join(route.split())] = parse_limit(limit)
+    return limits
+
+
+class RateLimitStore(ABC):
+    """
+    Estado dos limites: os baldes de fichas e as requisições em andamento por chave.
+    """
+
+    @abstractmethod
+    def take(self, key: str, limit: Limit) -> float:
+        """
+        Retira uma ficha do balde `key` (que começa cheio).
+        Retorna 0 se havia ficha, ou quantos segundos faltam para a próxima.
+        """
+        pass
+
+    @abstractmethod
+    def acquire(self, key: str, max_in_flight: int) -> bool:
+        """
+        Ocupa uma vaga de requisição simultânea de `key`.
+        Retorna False, sem ocupar, se ela já tem max_in_flight em andamento.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """
+        Libera a vaga ocupada por acquire.
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Retorna contadores do estado guardado.
+        """
+        pass
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Baldes em um dicionário LRU limitado a `max_keys` chaves. Esquecer o balde menos
+    usado equivale a considerá-lo cheio, o que só favorece clientes inativos há tempo.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # chave -> [fichas, instante da última leitura]
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(limit.burst), now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(limit.burst), bucket[0] + (now - bucket[1]) * limit.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / limit.rate
+
+    def acquire(self, key: str, max_in_flight: int) -> bool:
+        with self._lock:
+            current = self._in_flight.get(key, 0)
+            if current >= max_in_flight:
+                return False
+            self._in_flight[key] = current + 1
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            current = self._in_flight.get(key, 0)
+            if current <= 1:
+                self._in_flight.pop(key, None)
+            else:
+                self._in_flight[key] = current - 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'buckets': len(self._buckets),
+                'max_keys': self.max_keys,
+                'evictions': self.evictions,
+                'in_flight': sum(self._in_flight.values())
+            }
+
+
+class RateLimiter:
+    """
+    Aplica os limites às requisições da API. admit() é chamado quando o cliente já é
+    conhecido (depois da autenticação); a vaga de concorrência ocupada é liberada
+    quando a resposta termina de ser enviada (call_on_close, registrado por
+    after_request), o que numa resposta em streaming só ocorre depois do último trecho.
+    """
+
+    def __init__(self, store: RateLimitStore, default_limit: Optional[Limit] = None,
+                 route_limits: Optional[Dict[str, Limit]] = None, max_in_flight: int = 0):
+        self.store = store
+        self.default_limit = default_limit
+        self.route_limits = route_limits or {}
+        self.max_in_flight = max_in_flight  # 0 desativa o limite de concorrência
+        self._lock = threading.Lock()
+        self._counts = {'allowed': 0, 'rejected_rate': 0, 'rejected_concurrency': 0}
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def admit(self, client: str):
+        """
+        Aplica os limites da rota corrente ao cliente (ex.: "user:7", "ip:10.0.0.1").
+        Retorna None se a requisição pode seguir, ou a resposta 429 a devolver.
+        """
+        route = f'{request.method} {request.url_rule.rule}' if request.url_rule else None
+        limit = self.route_limits.get(route)
+        key = f'{route}|{client}'
+        if limit is None:
+            # Rotas sem limite próprio consomem do mesmo balde do cliente
+            limit, key = self.default_limit, client
+
+        if limit is not None:
+            wait = self.store.take(key, limit)
+            if wait:
+                self._count('rejected_rate')
+                return _too_many_requests("Limite de requisições excedido.", wait)
+        if self.max_in_flight:
+            if not self.store.acquire(client, self.max_in_flight):
+                self._count('rejected_concurrency')
+                return _too_many_requests("Requisições simultâneas demais para este cliente.", 1)
+            g.setdefault('rate_limit_clients', []).append(client)
+        self._count('allowed')
+        return None
+
+    def _release(self, clients) -> None:
+        for client in clients:
+            self.store.release(client)
+
+    def after_request(self, response):
+        # Uma requisição pode ocupar mais de uma vaga (ex.: a do IP antes da autenticação e a do usuário)
+        clients = g.pop('rate_limit_clients', None)
+        if clients:
+            response.call_on_close(lambda: self._release(clients))
+        return response
+
+    def teardown_request(self, exception=None) -> None:
+        # Se a requisição falhou antes de haver uma resposta, as vagas são liberadas aqui
+        self._release(g.pop('rate_limit_clients', ()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return dict(counts, max_in_flight=self.max_in_flight, store=self.store.stats())
+
+
+def _too_many_requests(message: str, wait: float):
+    retry_after = max(1, math.ceil(wait))
+    return jsonify({"erro": f"{message} Tente novamente em {retry_after} s."}), 429, {'Retry-After': str(retry_after)}
@@ -0,0 +1,102 @@
+import datetime
+import os
+
+import jwt
+import pytest
+
+from app import create_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SECRET_KEY = 'chave-de-teste-com-pelo-menos-32-bytes!!'
+
+# Hash barato e sem pool de threads sobrando: o custo do scrypt não é o que se testa
+BASE_CONFIG = {
+    'SECRET_KEY': SECRET_KEY,
+    'PASSWORD_HASH_N': 1024,
+    'PASSWORD_HASH_WORKERS': 1,
+    'JOB_DISPATCHER': 'none',
+    'COMPRESSION_ENABLED': False,
+}
+
+
+def build_app(backend: str = 'memory', tmp_path=None, **config):
+    """
+    App de teste. Com backend 'sqlalchemy' o banco é um SQLite em `tmp_path`, já com
+    todas as migrações aplicadas.
+    """
+    settings = dict(BASE_CONFIG, REPOSITORY_BACKEND=backend, **config)
+    if backend == 'sqlalchemy':
+        settings.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'api.db'}")
+    app = create_app(settings)
+    if backend == 'sqlalchemy':
+        from infrastructure.database.migrations import upgrade
+        from infrastructure.database.sqlalchemy_models import db
+        with app.app_context():
+            upgrade(db.engine)
+    return app
+
+
+def token_for(app, user_id: int, minutes: int = 5) -> str:
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=minutes)
+    return jwt.encode({'user_id': user_id, 'exp': expires}, app.config['SECRET_KEY'], algorithm='HS256')
+
+
+class Api:
+    """
+    Cliente de teste já autenticado como o primeiro usuário criado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+        services = app.extensions['api']
+        self.user_service = services.user_service
+        self.task_service = services.task_service
+        with app.app_context():
+            self.user = self.user_service.create_user({'nome': 'Vasco', 'username': 'vasco', 'password': 'senha123'})
+        self.headers = {'x-access-token': token_for(app, self.user.id)}
+
+    def create_user(self, username: str, nome: str = None):
+        with self.app.app_context():
+            return self.user_service.create_user({'nome': nome or username.title(), 'username': username,
+                                                  'password': 'senha123'})
+
+    def create_task(self, title: str = 'Tarefa', status: str = 'pending', assigned_to_id: int = None, **extra):
+        with self.app.app_context():
+            return self.task_service.create_task(dict(title=title, status=status,
+                                                      assigned_to_id=assigned_to_id or self.user.id, **extra))
+
+    def request(self, method: str, path: str, headers: dict = None, **kwargs):
+        return self.client.open(path, method=method, headers={**self.headers, **(headers or {})}, **kwargs)
+
+    def get(self, path: str, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path: str, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def patch(self, path: str, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+
+@pytest.fixture(params=['memory', 'sqlalchemy'])
+def api(request, tmp_path):
+    """Os mesmos testes nos dois backends de repositório."""
+    return Api(build_app(request.param, tmp_path))
+
+
+@pytest.fixture
+def memory_api():
+    return Api(build_app('memory'))
+
+
+@pytest.fixture
+def sql_api(tmp_path):
+    return Api(build_app('sqlalchemy', tmp_path))
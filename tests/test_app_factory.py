@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+from app import create_app
+from tests.conftest import BASE_CONFIG, ROOT, Api, build_app
+
+
+def test_importing_app_builds_nothing_and_memory_apps_skip_sqlalchemy():
+    code = ("import sys, app; assert 'sqlalchemy' not in sys.modules; "
+            "app.create_app({'REPOSITORY_BACKEND': 'memory', 'SECRET_KEY': 'x' * 32}); "
+            "assert 'sqlalchemy' not in sys.modules; print('ok')")
+    env = dict(os.environ, DATABASE_URL='postgresql://ninguem@localhost:1/nada')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.stdout.strip() == 'ok', result.stderr
+
+
+def test_apps_in_one_process_are_isolated(tmp_path):
+    first, second = Api(build_app('memory')), Api(build_app('sqlalchemy', tmp_path))
+    first.create_task('Só no primeiro')
+    assert [task['title'] for task in first.get('/tasks').get_json()] == ['Só no primeiro']
+    assert second.get('/tasks').get_json() == []
+    # O token de um app não vale no outro se as chaves forem diferentes
+    other_key = Api(build_app('memory', SECRET_KEY='outra-chave-com-pelo-menos-32-bytes!!'))
+    assert other_key.client.get('/tasks', headers=first.headers).status_code == 401
+
+
+def test_init_db_command_migrates_and_seeds(tmp_path):
+    app = create_app(dict(BASE_CONFIG, REPOSITORY_BACKEND='sqlalchemy',
+                          SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'api.db'}"))
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+    assert 'Migração 0001 aplicada' in result.output
+
+    with app.app_context():
+        users = app.extensions['api'].user_service.get_all_users()
+    assert {user.username for user in users} == {'vasco', 'lucca'}
+    rerun = app.test_cli_runner().invoke(args=['init-db'])
+    assert rerun.exit_code == 0 and 'Migração' not in rerun.output
@@ -0,0 +1,104 @@
+import asyncio
+import datetime
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytest.importorskip('quart')
+pytest.importorskip('aiosqlite')
+
+from asgi import create_asgi_app
+from infrastructure.database.sqlalchemy_repository_adapters import SQLAlchemyTaskRepository
+from tests.conftest import BASE_CONFIG, ROOT, Api, build_app, token_for
+
+
+@pytest.fixture
+def asgi_app(tmp_path):
+    config = dict(BASE_CONFIG, REPOSITORY_BACKEND='sqlalchemy',
+                  SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'api.db'}")
+    wsgi_app = build_app('sqlalchemy', tmp_path)  # aplica as migrações no mesmo arquivo
+    with wsgi_app.app_context():
+        user = wsgi_app.extensions['api'].user_service.create_user(
+            {'nome': 'Vasco', 'username': 'vasco', 'password': 'senha123'})
+    app = create_asgi_app(config)
+    return app, {'x-access-token': token_for(app, user.id)}, user
+
+
+def test_asgi_task_crud_and_listing(asgi_app):
+    app, headers, user = asgi_app
+
+    async def scenario():
+        client = app.test_client()
+        created = await client.post('/tasks', json={'title': 'Async', 'status': 'pending', 'assigned_to_id': user.id},
+                                    headers=headers)
+        assert created.status_code == 201
+        listing = await client.get('/tasks', headers=headers)
+        assert [task['title'] for task in await listing.get_json()] == ['Async']
+
+    asyncio.run(scenario())
+
+
+def test_asgi_long_poll_wakes_on_write(asgi_app):
+    app, headers, user = asgi_app
+
+    async def scenario():
+        client = app.test_client()
+        cursor = (await (await client.get('/tasks/changes', headers=headers)).get_json())['cursor']
+
+        async def write_later():
+            await asyncio.sleep(0.2)
+            await client.post('/tasks', json={'title': 'Nova', 'status': 'pending', 'assigned_to_id': user.id},
+                              headers=headers)
+
+        started = time.monotonic()
+        response, _ = await asyncio.gather(
+            client.get(f'/tasks/changes?since={cursor}&wait=10', headers=headers), write_later())
+        body = await response.get_json()
+        return time.monotonic() - started, body
+
+    elapsed, body = asyncio.run(scenario())
+    assert [change['task']['title'] for change in body['changes']] == ['Nova']
+    assert elapsed < 5
+
+
+def test_importing_asgi_does_not_build_the_app():
+    # Em um processo novo, com um DATABASE_URL que nem poderia conectar
+    code = "import asgi; assert 'app' not in vars(asgi); print('ok')"
+    env = dict(os.environ, DATABASE_URL='postgresql://ninguem@localhost:1/nada')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.stdout.strip() == 'ok', result.stderr
+
+
+def test_async_change_feed_reads_return_the_connection_to_the_pool(tmp_path):
+    from sqlalchemy.ext.asyncio import async_scoped_session, async_sessionmaker, create_async_engine
+    from core.domain.exceptions import ChangesExpiredException
+    from infrastructure.database.sqlalchemy_async_repository_adapters import AsyncSQLAlchemyTaskRepository
+
+    api = Api(build_app('sqlalchemy', tmp_path))
+    for title in ('A', 'B', 'C'):
+        api.create_task(title)
+    with api.app.app_context():
+        SQLAlchemyTaskRepository().prune_changes(datetime.datetime.utcnow() + datetime.timedelta(days=1))
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+        sessions = async_scoped_session(async_sessionmaker(engine, expire_on_commit=False),
+                                        scopefunc=asyncio.current_task)
+        repository = AsyncSQLAlchemyTaskRepository(sessions)
+        try:
+            # Como no long-poll: entre uma leitura e a seguinte a sessão continua viva
+            latest = await repository.last_change_seq()
+            assert engine.pool.checkedout() == 0
+            assert await repository.find_changes(latest, 10) == []
+            assert engine.pool.checkedout() == 0
+            with pytest.raises(ChangesExpiredException):
+                await repository.find_changes(0, 10)
+            assert engine.pool.checkedout() == 0
+        finally:
+            await sessions.remove()
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+def test_bulk_create_reports_each_invalid_item(api):
+    response = api.post('/tasks/bulk', json=[
+        {'title': 'Válida', 'status': 'pending', 'assigned_to_id': api.user.id},
+        {'title': 5, 'status': 'pending', 'assigned_to_id': api.user.id},
+        {'title': 'Status', 'status': ['pending'], 'assigned_to_id': api.user.id},
+        {'title': 'Booleano', 'status': 'pending', 'assigned_to_id': True},
+        {'title': 'Sem responsável', 'status': 'pending', 'assigned_to_id': 999},
+    ])
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [item['status'] for item in body['results']] == [201, 400, 400, 400, 400]
+    assert body['succeeded'] == 1 and body['failed'] == 4
+    assert body['results'][0]['task']['assigned_to_id'] == api.user.id
+    assert [task['title'] for task in api.get('/tasks').get_json()] == ['Válida']
+
+
+def test_bool_assignee_is_rejected_on_single_create_and_update(api):
+    response = api.post('/tasks', json={'title': 'T', 'status': 'pending', 'assigned_to_id': True})
+    assert response.status_code == 400
+
+    task = api.create_task()
+    assert api.put(f'/tasks/{task.id}', json={'assigned_to_id': True}).status_code == 400
+    assert api.put(f'/tasks/{task.id}', json={'title': 7}).status_code == 400
+
+
+def test_bulk_update_reports_invalid_fields_per_item(api):
+    first, second = api.create_task('Primeira'), api.create_task('Segunda')
+    response = api.patch('/tasks/bulk', json=[
+        {'id': first.id, 'status': 'done'},
+        {'id': second.id, 'title': 42},
+        {'id': True, 'status': 'done'},
+    ])
+
+    assert response.status_code == 207
+    assert [item['status'] for item in response.get_json()['results']] == [200, 400, 400]
+    assert api.get(f'/tasks/{second.id}').get_json()['title'] == 'Segunda'
+
+
+def test_bulk_delete_validates_ids_and_repeats(api):
+    task = api.create_task()
+    response = api.delete('/tasks/bulk', json=[task.id, task.id, 'x', 999])
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [item['status'] for item in body['results']] == [200, 404, 400, 404]
+    assert body['succeeded'] == 1 and body['failed'] == 3
+    assert api.get(f'/tasks/{task.id}').status_code == 404
+
+
+def test_bulk_delete_all_found(api):
+    ids = [api.create_task(f'T{i}').id for i in range(3)]
+    response = api.delete('/tasks/bulk', json=ids)
+    assert response.status_code == 200
+    assert response.get_json()['succeeded'] == 3
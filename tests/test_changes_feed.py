@@ -0,0 +1,64 @@
+import datetime
+import threading
+import time
+
+from infrastructure.database.sqlalchemy_repository_adapters import SQLAlchemyTaskRepository
+
+
+def _feed(api, since, **params):
+    query = '&'.join(f'{name}={value}' for name, value in dict(since=since, **params).items())
+    return api.get(f'/tasks/changes?{query}')
+
+
+def test_feed_returns_the_latest_state_of_each_changed_task(api):
+    kept = api.create_task('Mantida')
+    cursor = api.get('/tasks/changes').get_json()['cursor']
+
+    created = api.create_task('Nova')
+    removed = api.create_task('Removida')
+    api.patch(f'/tasks/{kept.id}', json={'status': 'done'})
+    api.delete(f'/tasks/{removed.id}')
+
+    body = _feed(api, cursor).get_json()
+    changes = {change['task_id']: change for change in body['changes']}
+    assert set(changes) == {kept.id, created.id, removed.id}
+    assert changes[kept.id]['task']['status'] == 'done'
+    assert changes[removed.id]['op'] == 'deleted' and changes[removed.id]['task'] is None
+    assert not body['has_more'] and _feed(api, body['cursor']).get_json()['changes'] == []
+
+    first_page = _feed(api, cursor, limit=2).get_json()
+    assert len(first_page['changes']) == 2 and first_page['has_more']
+
+
+def test_long_poll_returns_as_soon_as_a_task_changes(api):
+    cursor = api.get('/tasks/changes').get_json()['cursor']
+    writer = threading.Timer(0.2, api.create_task, ('Enquanto espera',))
+    writer.start()
+    started = time.monotonic()
+    body = _feed(api, cursor, wait=10).get_json()
+    writer.join()
+
+    assert time.monotonic() - started < 5
+    assert [change['task']['title'] for change in body['changes']] == ['Enquanto espera']
+
+
+def test_sse_stream_sends_batches_and_keepalives(memory_api):
+    memory_api.app.config.update(TASK_CHANGES_SSE_HEARTBEAT=0.05, TASK_CHANGES_SSE_MAX_SECONDS=0.2)
+    memory_api.create_task('Antes')
+    response = memory_api.get('/tasks/changes?since=0', headers={'Accept': 'text/event-stream'})
+
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.startswith('id: ') and 'event: changes' in body and '"Antes"' in body
+    assert ': keepalive' in body
+
+
+def test_pruned_history_expires_old_cursors(sql_api):
+    for title in ('A', 'B', 'C'):
+        sql_api.create_task(title)
+    with sql_api.app.app_context():
+        SQLAlchemyTaskRepository().prune_changes(datetime.datetime.utcnow() + datetime.timedelta(days=1))
+
+    assert _feed(sql_api, 0).status_code == 410
+    cursor = sql_api.get('/tasks/changes').get_json()['cursor']
+    assert _feed(sql_api, cursor).status_code == 200
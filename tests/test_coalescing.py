@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from infrastructure.web.coalescing import FrozenResponse, RequestCoalescer
+from tests.conftest import Api, build_app
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_concurrent_identical_reads_share_one_execution():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        release.wait(5)
+        return FrozenResponse(b'[]', 200, [])
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescer.run('chave', compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    assert _wait_for(lambda: coalescer.stats()['coalesced'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(executions) == 1 and len(results) == 5 and len({id(result) for result in results}) == 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    coalescer = RequestCoalescer(micro_cache_ttl=60)
+
+    def failing():
+        raise RuntimeError('falhou')
+
+    with pytest.raises(RuntimeError):
+        coalescer.run('chave', failing)
+    assert coalescer.run('chave', lambda: FrozenResponse(b'ok', 200, [])).body == b'ok'
+
+
+def test_writes_invalidate_the_micro_cache():
+    api = Api(build_app(COALESCING_ENABLED=True, COALESCING_MICRO_CACHE_MS=60000))
+    api.create_task('Antes')
+    assert len(api.get('/tasks').get_json()) == 1
+    assert len(api.get('/tasks').get_json()) == 1
+    assert api.get('/metrics/coalescing').get_json()['micro_cache_hits'] == 1
+
+    assert api.post('/tasks', json={'title': 'Depois', 'status': 'pending', 'assigned_to_id': api.user.id}).status_code == 201
+    assert [task['title'] for task in api.get('/tasks').get_json()] == ['Antes', 'Depois']
+
+
+def test_responses_are_not_shared_across_authorization_scopes():
+    api = Api(build_app(COALESCING_ENABLED=True, COALESCING_MICRO_CACHE_MS=60000))
+    assert api.get('/tasks').status_code == 200
+    assert api.client.get('/tasks').status_code == 401
+    assert api.client.get('/tasks', headers={'x-access-token': 'invalido'}).status_code == 401
@@ -0,0 +1,49 @@
+import gzip
+import json
+
+import pytest
+
+from tests.conftest import Api, build_app
+
+
+@pytest.fixture
+def compressed_api():
+    api = Api(build_app(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=512))
+    for i in range(50):
+        api.create_task(f'Tarefa {i}', description='texto repetido ' * 5)
+    return api
+
+
+def test_large_listings_are_gzipped_and_revalidate(compressed_api):
+    plain = compressed_api.get('/tasks').get_json()
+    response = compressed_api.get('/tasks', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.get_data())) == plain
+    assert {'Accept-Encoding', 'x-access-token'} <= set(response.vary)
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert compressed_api.get('/tasks', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+
+
+def test_small_bodies_and_unaccepted_encodings_are_sent_as_is(compressed_api):
+    small = compressed_api.get('/tasks?limit=1', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    identity = compressed_api.get('/tasks', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers and len(identity.get_json()) == 50
+
+
+def test_streamed_export_is_compressed_incrementally(compressed_api):
+    response = compressed_api.get('/tasks/export', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip' and 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.get_data()).decode().splitlines()
+    assert len(lines) == 50 and json.loads(lines[0])['title'] == 'Tarefa 0'
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_brotli_is_preferred_when_available(compressed_api):
+    brotli = pytest.importorskip('brotli')
+    response = compressed_api.get('/tasks', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert len(json.loads(brotli.decompress(response.get_data()))) == 50
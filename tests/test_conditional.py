@@ -0,0 +1,49 @@
+from infrastructure.web.conditional import task_etag
+from tests.conftest import Api, build_app
+
+
+def test_task_read_sets_validators_and_answers_conditionals(api):
+    task = api.create_task()
+    response = api.get(f'/tasks/{task.id}')
+    etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+
+    assert api.get(f'/tasks/{task.id}', headers={'If-None-Match': etag}).status_code == 304
+    assert api.get(f'/tasks/{task.id}', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert api.get(f'/tasks/{task.id}', headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}).status_code == 200
+
+
+def test_if_match_protects_task_updates(api):
+    task = api.create_task()
+    etag = api.get(f'/tasks/{task.id}').headers['ETag']
+
+    updated = api.put(f'/tasks/{task.id}', json={'status': 'done'}, headers={'If-Match': etag})
+    assert updated.status_code == 200
+    assert updated.headers['ETag'] != etag and updated.headers['Last-Modified']
+
+    # A ETag antiga não é mais a atual; uma ETag de outra tarefa ou inventada também não
+    assert api.put(f'/tasks/{task.id}', json={'status': 'x'}, headers={'If-Match': etag}).status_code == 412
+    assert api.put(f'/tasks/{task.id}', json={'status': 'x'}, headers={'If-Match': '"abc"'}).status_code == 412
+    assert api.put(f'/tasks/{task.id}', json={'status': 'x'}, headers={'If-Match': '*'}).status_code == 200
+    assert api.get(f'/tasks/{task.id}').get_json()['status'] == 'x'
+
+
+def test_if_match_is_checked_against_the_primary_not_the_cache(tmp_path):
+    api = Api(build_app('sqlalchemy', tmp_path, REPOSITORY_CACHE_ENABLED=True))
+    task = api.create_task()
+    api.get(f'/tasks/{task.id}')  # guarda a versão 1 no cache
+
+    # Gravação que o cache deste processo não viu (ex.: feita por outro worker)
+    with api.app.app_context():
+        current = api.task_service.task_repository.inner.patch(task.id, {'status': 'done'})
+    current.assignee_name = 'Vasco'
+    etag = api.get(f'/tasks/{task.id}').headers['ETag']
+    assert etag.startswith(f'"{task.id}.1-') and current.version == 2  # o cache ainda devolve a versão 1
+
+    response = api.put(f'/tasks/{task.id}', json={'title': 'Nova'}, headers={'If-Match': f'"{task_etag(current)}"'})
+    assert response.status_code == 200
+    assert api.put(f'/tasks/{task.id}', json={'title': 'Velha'}, headers={'If-Match': etag}).status_code == 412
+
+
+def test_user_read_is_conditional(api):
+    response = api.get(f'/users/{api.user.id}')
+    assert api.get(f'/users/{api.user.id}', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
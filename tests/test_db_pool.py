@@ -0,0 +1,30 @@
+import pytest
+import sqlalchemy as sa
+
+from infrastructure.database.pool_metrics import InstrumentedQueuePool, build_engine_options, pool_status
+
+
+def test_engine_options_size_the_pool_except_for_in_memory_sqlite(tmp_path):
+    options = build_engine_options(f"sqlite:///{tmp_path / 'a.db'}", 3, 1, 0.1, 60, True)
+    assert options['poolclass'] is InstrumentedQueuePool and options['pool_size'] == 3
+    assert 'poolclass' not in build_engine_options('sqlite://', 3, 1, 0.1, 60, True)
+
+
+def test_pool_status_counts_checkouts_and_timeouts(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'a.db'}",
+                              **build_engine_options(f"sqlite:///{tmp_path / 'a.db'}", 1, 0, 0.05, 60, True))
+    with engine.connect():
+        assert pool_status(engine)['checked_out'] == 1
+        with pytest.raises(sa.exc.TimeoutError):
+            engine.connect()
+
+    status = pool_status(engine)
+    assert status['checked_out'] == 0 and status['size'] == 1
+    assert status['checkouts'] == 2 and status['timeouts'] == 1
+    assert status['wait_seconds_max'] >= 0.05
+
+
+def test_pool_metrics_route(sql_api, memory_api):
+    response = sql_api.get('/metrics/db-pool')
+    assert response.status_code == 200 and response.get_json()['pool_class'] == 'InstrumentedQueuePool'
+    assert memory_api.get('/metrics/db-pool').status_code == 404
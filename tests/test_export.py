@@ -0,0 +1,20 @@
+import json
+
+
+def test_export_streams_one_task_per_line(api):
+    ids = [api.create_task(f'T{i}', status='done' if i % 2 else 'pending').id for i in range(4)]
+
+    response = api.get('/tasks/export')
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    tasks = [json.loads(line) for line in lines]
+    assert [task['id'] for task in tasks] == ids
+    assert tasks[0]['assigned_to_name'] == 'Vasco'
+
+
+def test_export_applies_the_listing_filters(api):
+    api.create_task('A', status='pending')
+    api.create_task('B', status='done')
+    body = api.get('/tasks/export?status=done').get_data(as_text=True)
+    assert [json.loads(line)['title'] for line in body.splitlines()] == ['B']
+    assert api.get('/tasks/export?minId=x').status_code == 400
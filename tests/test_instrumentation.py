@@ -0,0 +1,44 @@
+import re
+import time
+
+from infrastructure.web.instrumentation import SlowRequestProfiler
+from tests.conftest import Api, build_app
+
+
+def _sql_queries(response) -> int:
+    return int(re.search(r'sql;dur=[\d.]+;desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+
+def test_server_timing_reports_phases_and_queries(tmp_path):
+    api = Api(build_app('sqlalchemy', tmp_path, INSTRUMENTATION_ENABLED=True))
+    response = api.get('/tasks')
+
+    assert _sql_queries(response) > 0
+    assert 'auth;dur=' in response.headers['Server-Timing'] and 'total;dur=' in response.headers['Server-Timing']
+    metrics = api.get('/metrics').get_json()
+    assert metrics['routes']['GET /tasks']['duration']['count'] == 1
+
+
+def test_queries_on_read_replicas_are_timed(tmp_path):
+    # A "réplica" é o mesmo arquivo SQLite, por outro engine
+    api = Api(build_app('sqlalchemy', tmp_path, INSTRUMENTATION_ENABLED=True,
+                        DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'api.db'}"]))
+    api.create_task()
+    api.get('/tasks')  # guarda o usuário no cache de tokens
+
+    response = api.get('/tasks')  # agora só as leituras da listagem, todas na réplica
+    assert api.app.extensions['read_replicas'].stats()['replicas'][0]['picks'] > 0
+    assert _sql_queries(response) == 2
+
+
+
+def test_profiler_samples_the_request_thread_into_folded_stacks(tmp_path):
+    profiler = SlowRequestProfiler(str(tmp_path), interval=0.001)
+    profiler.start_request()
+    time.sleep(0.05)
+    samples = profiler.stop_request()
+
+    assert samples and any('test_profiler_samples_the_request_thread' in stack for stack in samples)
+    path = profiler.dump(samples, 'GET /tasks')
+    lines = open(path).read().splitlines()
+    assert path.endswith('.folded') and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
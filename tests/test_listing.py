@@ -0,0 +1,70 @@
+import pytest
+
+
+def test_task_listing_pages_with_cursor_and_fields(api):
+    ids = [api.create_task(f'T{i}').id for i in range(5)]
+
+    first = api.get('/tasks?limit=2&fields=id,title').get_json()
+    assert first['items'] == [{'id': ids[0], 'title': 'T0'}, {'id': ids[1], 'title': 'T1'}]
+    second = api.get(f"/tasks?limit=2&cursor={first['next_cursor']}").get_json()
+    assert [task['id'] for task in second['items']] == ids[2:4]
+    last = api.get(f"/tasks?limit=2&cursor={second['next_cursor']}").get_json()
+    assert [task['id'] for task in last['items']] == ids[4:] and last['next_cursor'] is None
+
+
+def test_task_listing_sorts_descending(api):
+    ids = [api.create_task(f'T{i}').id for i in range(3)]
+    assert [task['id'] for task in api.get('/tasks?sort=-id').get_json()] == ids[::-1]
+
+
+@pytest.mark.parametrize('query', [
+    'limit=0', 'limit=abc', 'limit=²', 'limit=1001', 'cursor=²&limit=1', 'fields=senha',
+    'minId=²', 'maxId=-1', 'sort=--id', 'sort=,',
+])
+def test_task_listing_rejects_invalid_args(api, query):
+    response = api.get(f'/tasks?{query}')
+    assert response.status_code == 400
+    assert 'invalid literal' not in response.get_json()['erro']
+
+
+@pytest.mark.parametrize('query', ['since=²', 'since=-1', 'limit=²', 'wait=nan'])
+def test_changes_feed_rejects_invalid_args(api, query):
+    response = api.get(f'/tasks/changes?{query}')
+    assert response.status_code == 400
+    assert 'invalid literal' not in response.get_json()['erro']
+
+
+def test_task_listing_query_count_does_not_grow_with_assignees(tmp_path):
+    import sqlalchemy as sa
+    from infrastructure.database.sqlalchemy_models import db
+    from tests.conftest import Api, build_app
+
+    api = Api(build_app('sqlalchemy', tmp_path))
+    api.get('/tasks')  # guarda o usuário no cache de tokens
+    with api.app.app_context():
+        engine = db.engine
+    statements = []
+    sa.event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    def listing_queries():
+        statements.clear()
+        assert api.get('/tasks').status_code == 200
+        return len(statements)
+
+    api.create_task('Primeira')
+    few = listing_queries()
+    for i in range(5):
+        api.create_task(f'T{i}', assigned_to_id=api.create_user(f'usuario{i}').id)
+    assert listing_queries() == few
+    assert {task['assigned_to_name'] for task in api.get('/tasks').get_json()} >= {'Vasco', 'Usuario0'}
+
+
+def test_user_listing_pages_with_cursor_and_fields(api):
+    ids = [api.user.id] + [api.create_user(f'usuario{i}').id for i in range(2)]
+
+    first = api.get('/users?limit=2&fields=id,username').get_json()
+    assert first['items'] == [{'id': ids[0], 'username': 'vasco'}, {'id': ids[1], 'username': 'usuario0'}]
+    second = api.get(f"/users?limit=2&cursor={first['next_cursor']}").get_json()
+    assert [user['id'] for user in second['items']] == ids[2:] and second['next_cursor'] is None
+    assert all('password' not in user for user in api.get('/users').get_json())
+    assert api.get('/users?fields=password').status_code == 400
@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.load_test import parse_mix, percentile
+from tests.conftest import ROOT
+
+
+def test_parse_mix_validates_operations_and_weights():
+    assert parse_mix('list=3,create=1') == {'list': 3.0, 'create': 1.0}
+    for bad in ('listar=1', 'list=x', 'list=-1', 'list=0'):
+        with pytest.raises(ValueError):
+            parse_mix(bad)
+
+
+def test_percentile_picks_the_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 0.5) == 51 and percentile(samples, 0.99) == 99 and percentile(samples, 1) == 100
+
+
+def test_short_run_reports_every_operation_without_errors(tmp_path):
+    output = tmp_path / 'carga.json'
+    subprocess.run([sys.executable, 'benchmarks/load_test.py', '--workers', '1', '--concurrency', '2',
+                    '--processes', '1', '--duration', '0.5', '--warmup', '0.1', '--users', '2', '--tasks', '10',
+                    '--mix', 'list=1,create=1,update=1,delete=1', '--output', str(output)],
+                   cwd=ROOT, check=True, capture_output=True, timeout=120)
+    stage, = json.loads(output.read_text())['stages']
+    assert stage['concurrency'] == 2 and stage['requests'] > 0 and stage['errors'] == 0
+    assert set(stage['operations']) == {'list', 'create', 'update', 'delete'}
@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+from tests.conftest import ROOT, Api, build_app
+
+
+def _scenario(api):
+    """Mesma sequência de chamadas; devolve o que um cliente veria."""
+    other = api.create_user('outro')
+    api.create_task('A')
+    api.create_task('B', status='done', assigned_to_id=other.id)
+    api.create_task('C', status='done')
+    return [
+        api.post('/users', json={'nome': 'X', 'username': 'outro', 'password': 'senha123'}).status_code,
+        api.post('/tasks', json={'title': 'D', 'status': 'pending', 'assigned_to_id': 999}).status_code,
+        api.get('/tasks?status=done&sort=-id&fields=title,assigned_to_name').get_json(),
+        api.get('/tasks/stats').get_json(),
+        api.delete(f'/users/{other.id}').status_code,
+        api.get('/tasks?fields=title').get_json(),
+    ]
+
+
+def test_memory_backend_behaves_like_sqlalchemy(tmp_path):
+    memory = _scenario(Api(build_app('memory')))
+    sql = _scenario(Api(build_app('sqlalchemy', tmp_path)))
+    assert memory == sql
+    # Remoção em cascata das tarefas do usuário removido
+    assert memory[-1] == [{'title': 'A'}, {'title': 'C'}]
+
+
+def test_service_benchmark_runs_both_backends(tmp_path):
+    output = tmp_path / 'resultados.json'
+    subprocess.run([sys.executable, 'benchmarks/service_benchmark.py', '--requests', '3', '--tasks', '5',
+                    '--users', '2', '--output', str(output)], cwd=ROOT, check=True, capture_output=True)
+    results = json.loads(output.read_text())
+    assert set(results) == {'sqlalchemy', 'memory'}
+    assert all(result['p50_ms'] >= 0 for backend in results.values() for result in backend.values())
@@ -0,0 +1,39 @@
+import sqlalchemy as sa
+
+from infrastructure.database.migrations import MIGRATIONS, upgrade
+
+
+def test_upgrade_applies_each_migration_once_and_keeps_old_rows(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    assert [m.version for m in upgrade(engine, target=1)] == [1]
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO users (nome, username, password) VALUES ('Vasco', 'vasco', 'x')"))
+        connection.execute(sa.text("INSERT INTO tasks (title, status, assigned_to_id) VALUES ('T', 'pending', 1)"))
+
+    assert [m.version for m in upgrade(engine)] == [m.version for m in MIGRATIONS][1:]
+    assert upgrade(engine) == []
+    with engine.connect() as connection:
+        assert connection.execute(sa.text('SELECT title FROM tasks')).scalars().all() == ['T']
+
+
+def test_task_filter_indexes_serve_the_hot_filters(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    upgrade(engine)
+    indexes = {index['name'] for index in sa.inspect(engine).get_indexes('tasks')}
+    assert {'ix_tasks_assigned_to_id_status', 'ix_tasks_assigned_to_id_id'} <= indexes
+
+    with engine.connect() as connection:
+        plan = connection.execute(sa.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE assigned_to_id = 1 AND status = 'done'")).all()
+    assert 'ix_tasks_assigned_to_id_status' in ' '.join(str(row) for row in plan)
+
+
+def test_listing_filters_by_assignee_and_status(api):
+    other = api.create_user('outro')
+    api.create_task('Minha pendente')
+    api.create_task('Minha feita', status='done')
+    api.create_task('Dele', status='done', assigned_to_id=other.id)
+
+    titles = [task['title'] for task in api.get('/tasks?assignedTo=vasco&status=done').get_json()]
+    assert titles == ['Minha feita']
+    assert api.get('/tasks?assignedTo=ninguem').get_json() == []
@@ -0,0 +1,54 @@
+import pytest
+import sqlalchemy as sa
+
+from core.domain.exceptions import ConcurrentModificationException
+from infrastructure.database.sqlalchemy_models import db
+
+
+def test_patch_changes_only_the_sent_fields(api):
+    other = api.create_user('outro')
+    task = api.create_task('Original', description='mantida')
+
+    response = api.patch(f'/tasks/{task.id}', json={'status': 'done', 'assigned_to_id': other.id})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['title'], body['description'], body['status']) == ('Original', 'mantida', 'done')
+    assert body['assigned_to_name'] == 'Outro'
+
+    assert api.patch(f'/tasks/{task.id}', json={'assigned_to_id': 999}).status_code == 400
+    assert api.patch('/tasks/999', json={'status': 'done'}).status_code == 404
+    assert api.get(f'/tasks/{task.id}').get_json()['assigned_to_id'] == other.id
+
+
+def test_user_patch_and_unique_username(api):
+    api.create_user('outro')
+    response = api.patch(f'/users/{api.user.id}', json={'nome': 'Novo Nome'})
+    assert response.status_code == 200 and response.get_json()['username'] == 'vasco'
+    assert api.patch(f'/users/{api.user.id}', json={'username': 'outro'}).status_code == 400
+    assert api.patch('/users/999', json={'nome': 'X'}).status_code == 404
+
+
+def test_patch_checks_the_expected_version(api):
+    task = api.create_task()
+    repository = api.task_service.task_repository
+    with api.app.app_context():
+        updated = repository.patch(task.id, {'status': 'done'}, expected_version=task.version)
+        assert updated.version == task.version + 1
+        with pytest.raises(ConcurrentModificationException):
+            repository.patch(task.id, {'status': 'pending'}, expected_version=task.version)
+
+
+def test_task_patch_is_a_single_statement(sql_api):
+    task = sql_api.create_task()
+    with sql_api.app.app_context():
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        sa.event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            sql_api.task_service.task_repository.patch(task.id, {'title': 'Nova'})
+        finally:
+            sa.event.remove(db.engine, 'before_cursor_execute', listener)
+
+    updates = [statement for statement in statements if statement.lstrip().upper().startswith('UPDATE TASKS')]
+    assert len(updates) == 1 and 'RETURNING' in updates[0].upper()
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]
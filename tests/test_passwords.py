@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from core.domain.entities import User
+from core.domain.exceptions import PasswordHasherBusyException
+from infrastructure.security.password_hashers import PooledPasswordHasher, ScryptPasswordHasher
+
+
+def test_scrypt_hash_verifies_and_asks_for_rehash_when_cost_changes():
+    hasher = ScryptPasswordHasher(n=1024)
+    hashed = hasher.hash('senha123')
+
+    assert hashed.startswith('scrypt$1024$') and 'senha123' not in hashed
+    assert hasher.verify('senha123', hashed) and not hasher.verify('senha124', hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert ScryptPasswordHasher(n=2048).needs_rehash(hashed)
+    # Senha legada em texto puro: ainda confere, mas precisa migrar
+    assert hasher.verify('antiga', 'antiga') and hasher.needs_rehash('antiga')
+
+
+def test_login_returns_a_token_and_rejects_wrong_passwords(api):
+    response = api.client.post('/auth/login', json={'username': 'vasco', 'password': 'senha123'})
+    assert response.status_code == 200
+    token = response.get_json()['token']
+    assert api.client.get('/tasks', headers={'x-access-token': token}).status_code == 200
+
+    assert api.client.post('/auth/login', json={'username': 'vasco', 'password': 'errada'}).status_code == 401
+    assert api.client.post('/auth/login', json={'username': 'ninguem', 'password': 'x'}).status_code == 401
+
+
+def test_login_migrates_legacy_plaintext_passwords(api):
+    with api.app.app_context():
+        legacy = api.user_service.user_repository.save(User(nome='Antigo', username='antigo', password='legada'))
+    assert api.client.post('/auth/login', json={'username': 'antigo', 'password': 'legada'}).status_code == 200
+
+    with api.app.app_context():
+        stored = api.user_service.user_repository.find_by_id(legacy.id).password
+    assert stored.startswith('scrypt$')
+    assert api.client.post('/auth/login', json={'username': 'antigo', 'password': 'legada'}).status_code == 200
+
+
+class BlockingHasher(ScryptPasswordHasher):
+    def __init__(self):
+        super().__init__(n=1024)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def verify(self, password, hashed):
+        self.started.set()
+        self.release.wait(5)
+        return True
+
+
+def test_pooled_hasher_gives_up_when_the_pool_is_full():
+    inner = BlockingHasher()
+    hasher = PooledPasswordHasher(inner, max_workers=1, max_pending=0, acquire_timeout=0)
+    try:
+        running = hasher.submit(inner.verify, 'a', 'b')
+        assert inner.started.wait(5)
+        with pytest.raises(PasswordHasherBusyException):
+            hasher.verify('a', 'b')
+        inner.release.set()
+        assert running.result(5) is True
+    finally:
+        inner.release.set()
+        hasher.shutdown()
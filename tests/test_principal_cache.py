@@ -0,0 +1,36 @@
+import time
+
+from core.domain.entities import User
+from infrastructure.cache.principal_cache import InMemoryPrincipalCache
+from tests.conftest import token_for
+
+
+def test_verified_token_is_served_from_the_cache(api):
+    for _ in range(3):
+        assert api.get('/tasks').status_code == 200
+    stats = api.get('/auth/principal-cache/stats').get_json()
+    assert stats['enabled'] and stats['misses'] == 1 and stats['hits'] == 3 and stats['size'] == 1
+
+
+def test_deleted_user_token_stops_working(api):
+    other = api.create_user('outro')
+    headers = {'x-access-token': token_for(api.app, other.id)}
+    assert api.get('/tasks', headers=headers).status_code == 200
+
+    assert api.delete(f'/users/{other.id}').status_code == 200
+    assert api.get('/tasks', headers=headers).status_code == 401
+
+
+def test_entries_expire_with_the_token_and_evict_the_oldest():
+    cache = InMemoryPrincipalCache(max_size=2, ttl=60)
+    user = User(id=1, nome='Vasco', username='vasco')
+    cache.put('expirado', user, time.time() - 1)
+    assert cache.get('expirado') is None
+
+    for token in ('a', 'b', 'c'):
+        cache.put(token, user, time.time() + 60)
+    assert cache.get('a') is None and cache.get('c') is user
+    assert cache.stats()['evictions'] == 1
+
+    cache.invalidate_user(1)
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,51 @@
+from tests.conftest import Api, build_app, token_for
+
+
+def _login(api, ip, forwarded_for=None):
+    headers = {'X-Forwarded-For': forwarded_for} if forwarded_for else {}
+    return api.client.post('/auth/login', json={'username': 'vasco', 'password': 'errada'},
+                           headers=headers, environ_base={'REMOTE_ADDR': ip})
+
+
+def test_login_is_limited_per_client_ip_behind_a_trusted_proxy():
+    api = Api(build_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_ROUTES='POST /auth/login=10/min:2',
+                        TRUSTED_PROXY_COUNT=1))
+    # Todos chegam pelo mesmo proxy; o cliente é o último endereço de X-Forwarded-For
+    assert [_login(api, '10.0.0.1', '203.0.113.7').status_code for _ in range(3)] == [401, 401, 429]
+    assert _login(api, '10.0.0.1', '203.0.113.8').status_code == 401
+
+
+def test_forwarded_header_is_ignored_without_trusted_proxies():
+    api = Api(build_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_ROUTES='POST /auth/login=10/min:2'))
+    codes = [_login(api, '10.0.0.1', f'203.0.113.{i}').status_code for i in range(3)]
+    assert codes == [401, 401, 429]
+
+
+def test_invalid_tokens_consume_the_ip_bucket():
+    api = Api(build_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_DEFAULT='1/min:3', RATE_LIMIT_ROUTES=''))
+    codes = [api.client.get('/tasks', headers={'x-access-token': 'invalido'}).status_code for _ in range(4)]
+    assert codes == [401, 401, 401, 429]
+    assert 'Retry-After' in api.client.get('/tasks').headers
+
+
+def test_authenticated_requests_are_limited_per_user():
+    api = Api(build_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_DEFAULT='1/min:3', RATE_LIMIT_ROUTES=''))
+    # O primeiro acesso verifica o token (balde do IP e do usuário); depois o token vem do cache
+    codes = [api.get('/tasks').status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+    # Outro usuário no mesmo IP tem o seu próprio balde
+    other = api.create_user('outro')
+    assert api.get('/tasks', headers={'x-access-token': token_for(api.app, other.id)}).status_code == 200
+
+
+def test_in_flight_slots_of_ip_and_user_are_released():
+    api = Api(build_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_DEFAULT='', RATE_LIMIT_ROUTES='',
+                        RATE_LIMIT_MAX_IN_FLIGHT=1))
+    store = api.app.extensions['api'].rate_limiter.store
+    # Só o limite de simultâneas vale; as vagas (do IP e do usuário) voltam quando a resposta é fechada
+    expected = [{'ip:127.0.0.1': 1, f'user:{api.user.id}': 1}] + [{f'user:{api.user.id}': 1}] * 2
+    for in_flight in expected:
+        with api.get('/tasks') as response:
+            assert response.status_code == 200
+            assert store._in_flight == in_flight
+        assert store._in_flight == {}
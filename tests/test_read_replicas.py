@@ -0,0 +1,56 @@
+import shutil
+
+import pytest
+import sqlalchemy as sa
+
+from infrastructure.database.read_replicas import ReadReplicaRouter
+from tests.conftest import Api, build_app
+
+
+@pytest.fixture
+def replica_api(tmp_path):
+    """Primário e uma "réplica" que é uma cópia parada dele (uma réplica atrasada)."""
+    app = build_app('sqlalchemy', tmp_path, DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replica.db'}"])
+    replica = app.extensions['read_replicas'].engines[0]
+
+    def replicate():
+        replica.dispose()
+        shutil.copy(tmp_path / 'api.db', tmp_path / 'replica.db')
+
+    replicate()
+    api = Api(app)
+    replicate()
+    api.create_task('Replicada')
+    replicate()
+    api.create_task('Só no primário')
+    return api
+
+
+def test_listings_are_read_from_the_replica(replica_api):
+    assert [task['title'] for task in replica_api.get('/tasks').get_json()] == ['Replicada']
+    assert replica_api.app.extensions['read_replicas'].stats()['replicas'][0]['picks'] >= 1
+
+
+def test_reads_after_a_write_in_the_same_request_use_the_primary(replica_api):
+    # A tarefa só existe no primário: a resposta da gravação precisa lê-la de lá
+    response = replica_api.post('/tasks', json={'title': 'Nova', 'status': 'pending',
+                                                'assigned_to_id': replica_api.user.id})
+    assert response.status_code == 201 and response.get_json()['assigned_to_name'] == 'Vasco'
+    task_id = response.get_json()['id']
+
+    updated = replica_api.put(f'/tasks/{task_id}', json={'status': 'done'})
+    assert updated.status_code == 200 and updated.get_json()['status'] == 'done'
+    # Entre requisições não há essa garantia: a leitura seguinte vai à réplica atrasada
+    assert replica_api.get(f'/tasks/{task_id}').status_code == 404
+
+
+def test_balancing_strategies(tmp_path):
+    engines = [sa.create_engine(f"sqlite:///{tmp_path / f'r{i}.db'}") for i in range(3)]
+    router = ReadReplicaRouter(engines)
+    assert [router.choose() for _ in range(4)] == [0, 1, 2, 0]
+
+    least = ReadReplicaRouter(engines, balancing='least_connections')
+    with engines[0].connect(), engines[1].connect():
+        assert least.choose() == 2
+    with pytest.raises(ValueError):
+        ReadReplicaRouter(engines, balancing='aleatorio')
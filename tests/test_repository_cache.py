@@ -0,0 +1,61 @@
+import pytest
+
+from core.domain.entities import Task, User
+from infrastructure.cache.backends import InMemoryCacheBackend
+from infrastructure.cache.caching_repository_adapters import CachingTaskRepository, CachingUserRepository
+from infrastructure.memory.in_memory_repository_adapters import (
+    InMemoryStore, InMemoryTaskRepository, InMemoryUserRepository)
+from tests.conftest import Api, build_app
+
+
+class CountingTaskRepository(InMemoryTaskRepository):
+    def __init__(self, store):
+        super().__init__(store)
+        self.reads = 0
+
+    def find_by_id(self, task_id):
+        self.reads += 1
+        return super().find_by_id(task_id)
+
+
+@pytest.fixture
+def repositories():
+    store = InMemoryStore()
+    backend = InMemoryCacheBackend(max_size=100, ttl=60)
+    inner_tasks = CountingTaskRepository(store)
+    tasks = CachingTaskRepository(inner_tasks, backend)
+    users = CachingUserRepository(InMemoryUserRepository(store), backend, task_cache=tasks)
+    return users, tasks, inner_tasks
+
+
+def test_task_reads_are_served_from_cache_as_copies(repositories):
+    users, tasks, inner_tasks = repositories
+    user = users.save(User(nome='Vasco', username='vasco', password='x'))
+    task = tasks.save(Task(title='T', status='pending', assigned_to_id=user.id))
+
+    first = tasks.find_by_id(task.id)
+    first.title = 'alterada sem salvar'
+    assert tasks.find_by_id(task.id).title == 'T'
+    assert inner_tasks.reads == 1
+
+    tasks.patch(task.id, {'status': 'done'})
+    assert tasks.find_by_id(task.id).status == 'done' and inner_tasks.reads == 2
+
+
+def test_renamed_username_is_not_served_from_the_old_key(repositories):
+    users, _, _ = repositories
+    user = users.save(User(nome='Vasco', username='vasco', password='x'))
+    assert users.find_by_username('vasco').id == user.id
+
+    users.patch(user.id, {'username': 'vasco2'})
+    assert users.find_by_username('vasco') is None
+    assert users.find_by_username('vasco2').id == user.id
+
+
+def test_user_writes_refresh_cached_tasks(tmp_path):
+    api = Api(build_app('sqlalchemy', tmp_path, REPOSITORY_CACHE_ENABLED=True))
+    task = api.create_task()
+    assert api.get(f'/tasks/{task.id}').get_json()['assigned_to_name'] == 'Vasco'
+
+    assert api.put(f'/users/{api.user.id}', json={'nome': 'Vasco da Gama'}).status_code == 200
+    assert api.get(f'/tasks/{task.id}').get_json()['assigned_to_name'] == 'Vasco da Gama'
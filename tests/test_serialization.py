@@ -0,0 +1,31 @@
+import decimal
+
+import pytest
+
+from core.domain.entities import Task, User
+from tests.conftest import Api, build_app
+
+orjson = pytest.importorskip('orjson')
+
+
+def test_entities_have_no_instance_dict():
+    task = Task(id=1, title='T', status='pending', assigned_to_id=1, assignee_name='Vasco')
+    assert not hasattr(task, '__dict__') and not hasattr(User(id=1), '__dict__')
+    assert task.to_dict(['id', 'assigned_to_name']) == {'id': 1, 'assigned_to_name': 'Vasco'}
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlalchemy'])
+def test_orjson_provider_returns_the_same_documents(tmp_path, backend):
+    bodies = {}
+    for provider in ('default', 'orjson'):
+        (tmp_path / provider).mkdir()
+        api = Api(build_app(backend, tmp_path / provider, JSON_PROVIDER=provider))
+        for i in range(3):
+            api.create_task(f'Tarefa {i} ç', description=None if i else 'descrição')
+        bodies[provider] = [api.get(path).get_json() for path in ('/tasks', '/users', '/tasks?limit=2')]
+    assert bodies['orjson'] == bodies['default']
+
+
+def test_orjson_provider_falls_back_for_unsupported_types():
+    app = build_app('memory', JSON_PROVIDER='orjson')
+    assert orjson.loads(app.json.dumps({'valor': decimal.Decimal('1.5')})) == {'valor': '1.5'}
@@ -0,0 +1,38 @@
+def _titles(response):
+    body = response.get_json()
+    return [task['title'] for task in (body['items'] if isinstance(body, dict) else body)]
+
+
+def test_search_matches_every_term_in_title_or_description(api):
+    api.create_task('Comprar pão', description='padaria da esquina')
+    api.create_task('Comprar leite')
+    api.create_task('Pagar conta', description='comprar selo')
+
+    assert _titles(api.get('/tasks?q=comprar')) == ['Comprar pão', 'Comprar leite', 'Pagar conta']
+    assert _titles(api.get('/tasks?q=comprar padaria')) == ['Comprar pão']
+    assert _titles(api.get('/tasks?q=inexistente')) == []
+
+
+def test_filters_by_status_list_and_id_range(api):
+    ids = [api.create_task(f'T{i}', status=('pending', 'doing', 'done')[i % 3]).id for i in range(6)]
+    assert _titles(api.get('/tasks?status=done,doing')) == ['T1', 'T2', 'T4', 'T5']
+    assert _titles(api.get(f'/tasks?minId={ids[1]}&maxId={ids[3]}')) == ['T1', 'T2', 'T3']
+
+
+def test_sorted_pages_follow_the_keyset_cursor(api):
+    for title, status in (('b', 'done'), ('a', 'pending'), ('c', 'done'), ('a', 'done')):
+        api.create_task(title, status=status)
+
+    seen = []
+    response = api.get('/tasks?sort=status,-title&limit=1')
+    while True:
+        seen += [(task['status'], task['title']) for task in response.get_json()['items']]
+        cursor = response.get_json()['next_cursor']
+        if cursor is None:
+            break
+        response = api.get(f'/tasks?sort=status,-title&limit=1&cursor={cursor}')
+    assert seen == [('done', 'c'), ('done', 'b'), ('done', 'a'), ('pending', 'a')]
+
+
+def test_invalid_sort_field_is_rejected(api):
+    assert api.get('/tasks?sort=password').status_code == 400
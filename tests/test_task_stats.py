@@ -0,0 +1,40 @@
+import pytest
+import sqlalchemy as sa
+
+from infrastructure.database.sqlalchemy_models import db
+
+from tests.conftest import Api, build_app
+
+
+def _write_mix(api):
+    other = api.create_user('outro')
+    gone = api.create_user('removido')
+    first = api.create_task('A')
+    api.create_task('B', status='done', assigned_to_id=other.id)
+    api.create_task('C', assigned_to_id=gone.id)
+    api.patch(f'/tasks/{first.id}', json={'status': 'done', 'assigned_to_id': other.id})
+    created = api.post('/tasks/bulk', json=[{'title': f'L{i}', 'status': 'doing', 'assigned_to_id': api.user.id}
+                                            for i in range(3)]).get_json()['results']
+    api.delete('/tasks/bulk', json=[created[0]['task']['id']])
+    api.delete(f"/tasks/{created[1]['task']['id']}")
+    api.delete(f'/users/{gone.id}')
+    return api.get('/tasks/stats').get_json()
+
+
+def test_stats_group_by_status_and_assignee(memory_api):
+    stats = _write_mix(memory_api)
+    assert stats['total'] == 3 and stats['by_status'] == {'done': 2, 'doing': 1}
+    by_assignee = {entry['assigned_to_name']: entry for entry in stats['by_assignee']}
+    assert by_assignee['Outro']['by_status'] == {'done': 2}
+    assert by_assignee['Vasco']['total'] == 1 and 'Removido' not in by_assignee
+
+
+@pytest.mark.parametrize('counters', [False, True])
+def test_sqlalchemy_stats_match_the_memory_backend(tmp_path, counters):
+    expected = _write_mix(Api(build_app('memory')))
+    api = Api(build_app('sqlalchemy', tmp_path, TASK_STATS_COUNTERS=counters))
+    assert _write_mix(api) == expected
+    if counters:
+        with api.app.app_context():
+            total = db.session.execute(sa.text('SELECT SUM(count) FROM task_counters')).scalar()
+        assert total == expected['total']
@@ -0,0 +1,58 @@
+"""
+Worker da fila de trabalhos em segundo plano (JOB_DISPATCHER=database).
+
+Processa em paralelo os trabalhos que a API grava na tabela jobs (notificações,
+auditoria), com novas tentativas e backoff exponencial. Pode rodar em vários
+processos ou máquinas ao mesmo tempo: cada trabalho é reservado por um só worker.
+SIGINT/SIGTERM param a reserva de novos trabalhos e esperam os que estão rodando.
+
+Lê o mesmo ambiente da API (DATABASE_URL, JOB_WORKERS, JOB_MAX_ATTEMPTS,
+JOB_RETRY_BACKOFF, JOB_RETRY_BACKOFF_MAX), mais JOB_POLL_INTERVAL (segundos entre
+consultas com a fila vazia) e JOB_LEASE_SECONDS (após quanto tempo um trabalho
+reservado por um worker que parou volta para a fila). As tabelas são criadas pelas
+migrações da API ("flask db-upgrade").
+
+Execução:
+    python worker.py
+"""
+import logging
+import os
+import signal
+import threading
+import sqlalchemy as sa
+from dotenv import load_dotenv
+from infrastructure.database.pool_metrics import build_engine_options
+from infrastructure.jobs.database_queue import DatabaseJobWorker
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'), format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    database_url = os.environ.get('DATABASE_URL')
+    concurrency = int(os.environ.get('JOB_WORKERS', 4))
+    # Uma conexão por thread de trabalho, mais a do laço que reserva os trabalhos
+    engine = sa.create_engine(database_url, **build_engine_options(
+        database_url, pool_size=concurrency + 1, max_overflow=0, pool_timeout=30,
+        pool_recycle=int(os.environ.get('DB_POOL_RECYCLE', 1800)), pool_pre_ping=True
+    ))
+    worker = DatabaseJobWorker(
+        engine,
+        concurrency=concurrency,
+        max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', 5)),
+        backoff=float(os.environ.get('JOB_RETRY_BACKOFF', 1)),
+        max_backoff=float(os.environ.get('JOB_RETRY_BACKOFF_MAX', 300)),
+        poll_interval=float(os.environ.get('JOB_POLL_INTERVAL', 1)),
+        lease_seconds=float(os.environ.get('JOB_LEASE_SECONDS', 300))
+    )
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    logging.getLogger('jobs').info("Worker iniciado com %s threads.", concurrency)
+    worker.run(stop)
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()